@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+停止答题耗时测试
+让答题会话分别停在获取题目、流式/非流式模型请求、提交后的等待和 GUI 验证码输入上（替身服务延迟 10 秒），
+调用 stop() 后测量答题线程结束的耗时，任一阶段超过预算（默认 100ms）时以返回码 1 退出
+
+用法：
+    python -m benchmarks.cancel
+    python -m benchmarks.cancel --runs 5 --budget 0.05
+"""
+
+import argparse
+import os
+import threading
+import time
+from contextlib import ExitStack
+from unittest import mock
+from benchmarks.quiz_pipeline import BenchmarkSession, StaticRegistry
+from benchmarks.stats import format_table, summarize
+from benchmarks.stubs import BiliStubServer, MockLLMServer, QuestionBank
+from client import senior
+from tools.LLM.deepseek import DeepSeekAPI
+from tools.LLM.strategy import create_strategy
+from tools.logger import logger
+
+# 替身服务在被测阶段的延迟，远大于预算
+SLOW = 10.0
+
+# 阶段 -> (B站接口延迟, 模型延迟, 提交等待, 流式请求, 需要验证码)
+PHASES = {
+    'question_get': (SLOW, 0, 0, True, False),
+    'llm_stream': (0, SLOW, 0, True, False),
+    'llm_blocking': (0, SLOW, 0, False, False),
+    'submit_wait': (0, 0, SLOW, True, False),
+    'captcha_input': (0, 0, 0, True, True),
+}
+
+
+def _prepare(session, llm, stream):
+    registry = StaticRegistry({'1': DeepSeekAPI(base_url=llm.url + '/v1', model='mock-chat', api_key='bench')})
+    session.llm_registry = registry
+    session.strategy = create_strategy('single', registry, '1')
+    session.save_metrics = False
+    return mock.patch('tools.LLM.strategy.LLM_STREAM', stream)
+
+
+def _session_runner(phase):
+    """返回 (session, start, stop, join)；join(timeout) 返回答题线程是否已结束"""
+    session = BenchmarkSession(None, PHASES[phase][2])
+    if phase == 'captcha_input':
+        # 与 GUI 的 QuizThread 一样等待输入事件，不会有人输入
+        never = threading.Event()
+        session.input_handler = lambda kind, payload: session.cancel_token.wait_event(never, SLOW) and ''
+    else:
+        session.input_handler = lambda kind, payload: '1'
+    thread = threading.Thread(target=session.start, daemon=True)
+
+    def join(timeout):
+        thread.join(timeout)
+        return not thread.is_alive()
+    return session, thread.start, session.stop, join
+
+
+def _gui_runner():
+    """使用 GUI 的 QuizThread，验证 stop() 不再依赖 terminate()"""
+    from PySide6.QtCore import QCoreApplication
+    from gui.threads import QuizThread
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    _gui_runner.app = app
+    thread = QuizThread()
+
+    def join(timeout):
+        finished = thread.wait(int(timeout * 1000))
+        # 处理 finished_signal 排队调用的 LogPump.stop
+        app.processEvents()
+        return finished
+    return thread.quiz_session, thread.start, thread.stop, join
+
+
+def measure(phase, settle, gui=False):
+    """返回 stop() 到答题线程结束的耗时，超过 SLOW 秒仍未结束时返回 None"""
+    bili_latency, llm_latency, _, stream, captcha = PHASES[phase]
+    bank = QuestionBank(total=100)
+    with ExitStack() as stack:
+        bili = stack.enter_context(BiliStubServer(bank, require_captcha=captcha, latency=f'const:{bili_latency}'))
+        llm = stack.enter_context(MockLLMServer(bank, latency=f'const:{llm_latency}'))
+        stack.enter_context(mock.patch.object(senior, 'base_url', bili.senior_url))
+
+        session, start, stop, join = _gui_runner() if gui else _session_runner(phase)
+        stack.enter_context(_prepare(session, llm, stream))
+        start()
+
+        time.sleep(settle)
+        started = time.perf_counter()
+        stop()
+        finished = join(SLOW)
+        elapsed = time.perf_counter() - started
+    return elapsed if finished else None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='停止答题耗时测试')
+    parser.add_argument('--runs', type=int, default=3, help='每个阶段的测量次数')
+    parser.add_argument('--settle', type=float, default=0.5, help='启动答题后等待多久再停止（秒）')
+    parser.add_argument('--budget', type=float, default=0.1, help='停止耗时预算（秒）')
+    parser.add_argument('--no-gui', action='store_true', help='跳过 QuizThread 的测量')
+    parser.add_argument('--verbose', action='store_true', help='输出答题日志')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        for name in ('scripts', 'tools', 'client', 'gui'):
+            logger.disable(name)
+
+    cases = [(phase, False) for phase in PHASES]
+    if not args.no_gui:
+        try:
+            import PySide6  # noqa: F401
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+            cases.append(('captcha_input', True))
+        except ImportError:
+            print('未安装 PySide6，跳过 QuizThread 的测量')
+
+    stages = {}
+    failed = []
+    for phase, gui in cases:
+        name = 'gui_captcha' if gui else phase
+        samples = []
+        for _ in range(args.runs):
+            elapsed = measure(phase, args.settle, gui)
+            if elapsed is None:
+                failed.append(f'{name}: {SLOW:.0f}秒内未结束')
+                break
+            samples.append(elapsed)
+        if samples:
+            stages[name] = summarize(samples)
+            if max(samples) > args.budget:
+                failed.append(f'{name}: 最长 {max(samples) * 1000:.1f}ms，超出预算 {args.budget * 1000:.0f}ms')
+
+    print(format_table(stages))
+    for message in failed:
+        print(f'未通过 - {message}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP/2 传输基准测试
+分别以 HTTP/1.1 和 HTTP/2 连接模型接口替身（每个新连接增加 --connect-latency 的耗时），比较：
+    complete  逐题发送流式请求，回复只有序号，读完整个响应
+    stream    逐题发送流式请求，回复的第一行是序号，之后是解析，拿到答案后提前结束
+    race      每题同时发送 3 个流式请求（与竞速、对冲相同），等待全部返回
+
+HTTP/1.1 的连接在读完响应后复用，提前结束的流式请求在后台读完剩余输出后放回连接池
+（题目之间没有间隔，读完之前的下一题仍会新建连接）；HTTP/2 只关闭对应的流
+输出各情况的耗时分布和新建的连接数；请求失败、读完的流式响应没有复用 HTTP/1.1 连接，
+提前结束的流式请求有一半以上新建了连接，或 HTTP/2 新建了多于一个连接时以返回码 1 退出
+
+用法：
+    python -m benchmarks.http2
+    python -m benchmarks.http2 --questions 50 --connect-latency 0.2
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stats import format_table, summarize
+from benchmarks.stubs import MockLLMServer, QuestionBank
+from client.senior import Answer
+from tools.LLM import transport
+from tools.LLM.deepseek import DeepSeekAPI
+from tools.LLM.prompt import format_question
+from tools.logger import logger
+
+SCENARIOS = ('complete', 'stream', 'race')
+RACE_WIDTH = 3
+
+
+def make_prompt(bank, number):
+    """按答题时的格式生成第 number 题的提示词"""
+    question, answers = bank.make(number)
+    return format_question(question, [Answer.from_data(answer) for answer in answers])
+
+
+def run(scenario, http2, args):
+    """返回 (每题耗时列表, 失败次数, 新建连接数)，不含预热请求"""
+    bank = QuestionBank(total=args.questions)
+    transport.close_all()
+    explanation_tokens = 0 if scenario == 'complete' else 40
+    with MockLLMServer(bank, latency=args.llm_latency, token_interval=0.005, explanation_tokens=explanation_tokens,
+                       connect_latency=args.connect_latency, http2=http2) as llm, \
+            ThreadPoolExecutor(max_workers=RACE_WIDTH) as executor:
+        api = DeepSeekAPI(base_url=llm.url + '/v1', model='mock-chat', api_key='bench', http2=http2)
+        width = RACE_WIDTH if scenario == 'race' else 1
+
+        def ask(prompt):
+            try:
+                return api.ask_stream(prompt, 4)
+            except Exception as e:
+                logger.error(f'请求失败: {e}')
+                return None
+
+        # 第一个请求建立连接（HTTP/2 还包括导入 httpx），不计入结果
+        ask(make_prompt(bank, 0))
+        baseline = llm.connections
+
+        samples, failures = [], 0
+        for number in range(1, args.questions + 1):
+            prompt = make_prompt(bank, number)
+            started = time.perf_counter()
+            results = list(executor.map(ask, [prompt] * width))
+            samples.append(time.perf_counter() - started)
+            failures += sum(result is None for result in results)
+        connections = llm.connections - baseline
+    transport.close_all()
+    return samples, failures, connections
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='HTTP/2 传输基准测试')
+    parser.add_argument('--questions', type=int, default=30, help='每种情况的题目数')
+    parser.add_argument('--connect-latency', type=float, default=0.1, help='建立新连接的耗时（秒）')
+    parser.add_argument('--llm-latency', default='const:0.05', help='模型首个 token 前的延迟分布')
+    parser.add_argument('--verbose', action='store_true', help='输出请求日志')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        logger.disable('tools')
+    if not transport.http2_available():
+        print('未安装 h2，跳过 HTTP/2 的测量（pip install h2）')
+        return 0
+
+    stages = {}
+    connections = {}
+    failed = []
+    for scenario in SCENARIOS:
+        for http2 in (False, True):
+            name = f"{scenario}/{'h2' if http2 else 'h1'}"
+            samples, failures, opened = run(scenario, http2, args)
+            stages[name] = summarize(samples)
+            connections[name] = opened
+            if failures:
+                failed.append(f'{name}: {failures} 个请求失败')
+            if scenario == 'complete' and not http2 and opened:
+                failed.append(f'{name}: 新建了 {opened} 个连接，读完的流式响应没有复用连接')
+            if scenario == 'stream' and not http2 and opened * 2 > args.questions:
+                failed.append(f'{name}: 新建了 {opened} 个连接，提前结束的流式请求没有把连接放回连接池')
+            if http2 and opened > 1:
+                failed.append(f'{name}: 新建了 {opened} 个连接，请求没有在同一连接上多路复用')
+
+    print(format_table(stages))
+    print()
+    print('新建连接数：' + '，'.join(f'{name} {opened}' for name, opened in connections.items()))
+    for message in failed:
+        print(f'未通过 - {message}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日志组件吞吐量基准测试
+从后台线程以固定速率通过 QuizThread.log_signal 发送日志，
+测量主线程事件循环的最大卡顿、日志全部显示所需的时间和最终保留的行数
+
+用法：
+    python -m benchmarks.log_widget --rate 5000 --seconds 3
+    python -m benchmarks.log_widget --legacy       # 对比旧版逐行追加的 QTextEdit
+"""
+
+import argparse
+import os
+import threading
+import time
+
+# 没有显示器时使用离屏渲染
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QApplication, QTextEdit
+from benchmarks.stats import format_table, summarize
+from gui.threads import QuizThread
+from gui.widgets import LogWidget
+
+
+class LegacyLogWidget(QTextEdit):
+    """旧版实现：每行都追加到 QTextEdit 并移动光标，不限制行数"""
+
+    def append_log(self, text):
+        from datetime import datetime
+        self.append(f"[{datetime.now().strftime('%H:%M:%S')}] {text}")
+        self.moveCursor(QTextCursor.MoveOperation.End)
+
+    def flush(self):
+        pass
+
+    def line_count(self):
+        return self.document().blockCount()
+
+
+def emit_lines(signal, rate, seconds, done):
+    """按 rate 行/秒发送 seconds 秒的日志"""
+    total = int(rate * seconds)
+    started = time.perf_counter()
+    for i in range(total):
+        signal.emit(f'INFO: 第{i}行日志 DEBUG 请求成功: {{"code": 0, "data": {{"id": {i}}}}}')
+        # 每 100 行校准一次发送速度
+        if i % 100 == 0:
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    done.set()
+
+
+def run(args):
+    app = QApplication.instance() or QApplication([])
+    if args.legacy:
+        widget = LegacyLogWidget()
+        line_count = widget.line_count
+    else:
+        widget = LogWidget()
+        line_count = lambda: widget.log_text.document().blockCount()
+    widget.resize(800, 600)
+    widget.show()
+
+    thread = QuizThread()
+    thread.log_signal.connect(widget.append_log)
+    received = [0]
+
+    def count_received(text):
+        received[0] += 1
+
+    thread.log_signal.connect(count_received)
+    total = int(args.rate * args.seconds)
+
+    # 心跳定时器：两次触发的间隔超过 interval 的部分即为界面卡顿
+    interval = 0.01
+    gaps = []
+    last = [time.perf_counter()]
+
+    def heartbeat():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+
+    timer = QTimer()
+    timer.setInterval(int(interval * 1000))
+    timer.timeout.connect(heartbeat)
+    timer.start()
+
+    done = threading.Event()
+    emitter = threading.Thread(target=emit_lines, args=(thread.log_signal, args.rate, args.seconds, done),
+                               daemon=True)
+    started = time.perf_counter()
+    emitter.start()
+    # 发送结束后继续处理事件，直到队列中的日志全部显示
+    while not done.is_set():
+        app.processEvents()
+    sent_at = time.perf_counter()
+    deadline = sent_at + 120
+    while received[0] < total and time.perf_counter() < deadline:
+        app.processEvents()
+    # 不等待下一次定时刷新，立即显示最后一批日志
+    widget.flush()
+    drained = time.perf_counter()
+    timer.stop()
+
+    return {
+        'widget': 'legacy' if args.legacy else 'LogWidget',
+        'lines': total,
+        'send_time': sent_at - started,
+        'drain_time': drained - sent_at,
+        'kept_lines': line_count(),
+        'heartbeat': summarize(gaps),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='日志组件吞吐量基准测试')
+    parser.add_argument('--rate', type=int, default=5000, help='每秒发送的日志行数')
+    parser.add_argument('--seconds', type=float, default=3, help='发送持续时间')
+    parser.add_argument('--legacy', action='store_true', help='测试旧版 QTextEdit 实现')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    result = run(parse_args(argv))
+    print(format_table({'heartbeat': result['heartbeat']}))
+    print()
+    print(f"{result['widget']}: 发送 {result['lines']} 行，用时 {result['send_time']:.2f}s，"
+          f"发送结束后显示完毕还需 {result['drain_time']:.2f}s，保留 {result['kept_lines']} 行")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+连接预热基准测试
+替身服务为每个新连接增加 --connect-latency 的耗时（模拟 DNS、TCP 和 TLS 握手），
+分别在扫码登录期间（login）和输入验证码期间（captcha）预热连接，比较第一道题的耗时；
+预热后第一道题节省的耗时不足 connect-latency 的一半时以返回码 1 退出
+
+用法：
+    python -m benchmarks.prewarm
+    python -m benchmarks.prewarm --connect-latency 0.3 --runs 5
+"""
+
+import argparse
+import time
+from contextlib import ExitStack
+from unittest import mock
+from benchmarks.quiz_pipeline import BenchmarkSession, StaticRegistry
+from benchmarks.stubs import BiliStubServer, MockLLMServer, QuestionBank
+from client import senior
+from config.config import PREWARM_CONFIG
+from tools.LLM.deepseek import DeepSeekAPI
+from tools.LLM.strategy import create_strategy
+from tools.logger import logger
+from tools.metrics import percentile
+from tools.prewarm import prewarm, prewarmer
+
+SCENARIOS = ('login', 'captcha')
+
+
+def run_once(scenario, warm, args):
+    """回答一道题，返回 (第一道题去掉用户输入后的耗时, 会话统计的预计节省毫秒数)"""
+    bank = QuestionBank(total=1)
+    with ExitStack() as stack:
+        bili = stack.enter_context(BiliStubServer(
+            bank, require_captcha=scenario == 'captcha', latency='const:0.02',
+            connect_latency=args.connect_latency))
+        llm = stack.enter_context(MockLLMServer(
+            bank, latency='const:0.1', token_interval=0.005, connect_latency=args.connect_latency))
+        stack.enter_context(mock.patch.object(senior, 'base_url', bili.senior_url))
+        stack.enter_context(mock.patch.dict(PREWARM_CONFIG, enabled=warm))
+        # 丢弃之前运行留下的预热记录
+        prewarmer.take_saved()
+
+        registry = StaticRegistry({'1': DeepSeekAPI(base_url=llm.url + '/v1', model='mock-chat', api_key='bench')})
+        session = BenchmarkSession(create_strategy('single', registry, '1'))
+        session.llm_registry = registry
+
+        def slow_input(kind, payload):
+            # 用户输入验证码的时间
+            time.sleep(args.user_delay)
+            return '1'
+        session.input_handler = slow_input
+
+        if scenario == 'login':
+            # 与 scripts.login.auth 一样在扫码期间预热，之后用户扫码需要 user_delay 秒
+            prewarm(bili_url=bili.senior_url, llm_urls=[llm.url + '/v1'])
+            time.sleep(args.user_delay)
+        session.start()
+
+    question = session.metrics.questions[0]['stages']
+    # captcha 情况下第一次获取题目发生在验证码之前，无法预热
+    skipped = ('verification', 'submit_wait') + (('question_get',) if scenario == 'captcha' else ())
+    elapsed = sum(v for name, v in question.items() if name not in skipped)
+    return elapsed, session.metrics.counters.get('prewarm_saved_ms', 0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='连接预热基准测试')
+    parser.add_argument('--runs', type=int, default=3, help='每种情况的运行次数')
+    parser.add_argument('--connect-latency', type=float, default=0.15, help='建立新连接的耗时（秒）')
+    parser.add_argument('--user-delay', type=float, default=0.5, help='扫码或输入验证码的时间（秒）')
+    parser.add_argument('--verbose', action='store_true', help='输出答题日志')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        for name in ('scripts', 'tools', 'client'):
+            logger.disable(name)
+
+    print(f"{'scenario':<12}{'cold':>10}{'warm':>10}{'saved':>10}{'estimate':>10}  (ms, p50)")
+    failed = []
+    for scenario in SCENARIOS:
+        cold = [run_once(scenario, False, args)[0] for _ in range(args.runs)]
+        warm_runs = [run_once(scenario, True, args) for _ in range(args.runs)]
+        cold_p50 = percentile(cold, 50)
+        warm_p50 = percentile([elapsed for elapsed, _ in warm_runs], 50)
+        estimate = percentile([saved for _, saved in warm_runs], 50)
+        saved = cold_p50 - warm_p50
+        print(f'{scenario:<12}{cold_p50 * 1000:>10.1f}{warm_p50 * 1000:>10.1f}{saved * 1000:>10.1f}{estimate:>10.1f}')
+        if saved < args.connect_latency / 2:
+            failed.append(scenario)
+
+    for scenario in failed:
+        print(f'未通过 - {scenario}: 预热后第一道题节省的耗时不足 {args.connect_latency * 500:.0f}ms')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
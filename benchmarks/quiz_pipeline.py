@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+答题流程端到端基准测试
+在本地启动 B站答题接口和模型接口的替身服务，驱动 QuizSession 完成一轮答题，
+输出各阶段耗时的 p50/p95/p99 以及总耗时
+
+用法：
+    python -m benchmarks.quiz_pipeline
+    python -m benchmarks.quiz_pipeline --llm-latency lognormal:0.4,0.5 --llm-error-rate 0.05 --json result.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from contextlib import ExitStack
+from unittest import mock
+from benchmarks.stats import format_table
+from benchmarks.stubs import BiliStubServer, MockLLMServer, QuestionBank
+from client import senior
+from scripts.start_senior import QuizSession
+from tools.LLM.deepseek import DeepSeekAPI
+from tools.LLM.breaker import BreakerLLM, CircuitBreaker
+from tools.LLM.gemini import GeminiAPI
+from tools.LLM.hedge import HedgedLLM, LatencyTracker
+from tools.LLM.strategy import FailoverStrategy, backend_name, create_strategy
+from tools.answer_cache import AnswerCache
+from tools.logger import logger
+from tools.trace import TraceRecorder
+
+
+class StaticRegistry:
+    """返回固定客户端的注册表，替代按配置文件创建客户端的 LLMRegistry"""
+
+    def __init__(self, clients):
+        self.clients = clients
+        self.wrapper = None
+
+    def get(self, choice):
+        if choice not in self.clients:
+            raise ValueError(f'基准测试未配置模型: {choice}')
+        if self.wrapper is not None:
+            return self.wrapper(backend_name(choice), self.clients[choice])
+        return self.clients[choice]
+
+    def set_wrapper(self, wrapper=None):
+        self.wrapper = wrapper
+
+    def invalidate(self, model_type=None):
+        pass
+
+
+class BenchmarkSession(QuizSession):
+    """基准测试用的答题会话，统计结果只在内存中保留，默认不使用本地答案缓存"""
+
+    save_metrics = False
+
+    def __init__(self, strategy, submit_interval=0.0):
+        super().__init__(strategy)
+        self.submit_interval = submit_interval
+        # 配置目录中的缓存会让替身题库的题目直接命中，不经过模型请求
+        self.answer_cache = None
+
+
+def run(args):
+    """运行一次基准测试，返回结果字典"""
+    bank = QuestionBank(total=args.questions, seed=args.seed)
+    with ExitStack() as stack:
+        bili = stack.enter_context(BiliStubServer(
+            bank, require_captcha=args.captcha,
+            latency=args.bili_latency, error_rate=args.bili_error_rate, seed=args.seed))
+        llm = stack.enter_context(MockLLMServer(
+            bank, accuracy=args.accuracy, token_interval=args.token_interval,
+            latency=args.llm_latency, error_rate=args.llm_error_rate, seed=args.seed + 1))
+        # --fallback 时 Gemini 格式的接口由另一个不注入错误的替身服务提供
+        backup = llm
+        if args.fallback:
+            backup = stack.enter_context(MockLLMServer(
+                bank, accuracy=args.accuracy, token_interval=args.token_interval,
+                latency=args.llm_latency, seed=args.seed + 2))
+
+        stack.enter_context(mock.patch.object(senior, 'base_url', bili.senior_url))
+        stack.enter_context(mock.patch('tools.LLM.strategy.LLM_STREAM', not args.no_stream))
+
+        clients = {
+            '1': DeepSeekAPI(base_url=llm.url + '/v1', model='mock-chat', api_key='bench'),
+            '2': GeminiAPI(base_url=backup.url + '/v1beta', model='mock-gemini', api_key='bench'),
+        }
+        if args.hedge:
+            # 每次运行使用新的耗时统计，不受之前运行的影响
+            tracker = LatencyTracker()
+            clients = {choice: HedgedLLM(backend_name(choice), client, tracker=tracker,
+                                         config={'min_delay': args.hedge_min_delay})
+                       for choice, client in clients.items()}
+        if args.fallback:
+            # 每次运行使用新的熔断器
+            clients = {choice: BreakerLLM(backend_name(choice), client, CircuitBreaker(backend_name(choice)))
+                       for choice, client in clients.items()}
+        registry = StaticRegistry(clients)
+        choice = '2' if args.backend == 'gemini' else '1'
+        if args.fallback:
+            strategy = FailoverStrategy(registry, '1', ('1', '2'))
+        else:
+            strategy = create_strategy(args.strategy, registry, choice)
+        session = BenchmarkSession(strategy, args.submit_interval)
+        session.llm_registry = registry
+        # 分类ID和验证码都回答 1，替身服务不做校验
+        session.input_handler = lambda kind, payload: '1'
+        if args.cache:
+            cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            session.answer_cache = AnswerCache(path=os.path.join(cache_dir, 'answer_cache.db'))
+        else:
+            session.answer_cache = None
+
+        recorder = TraceRecorder(args.trace).install(session) if args.trace else None
+        try:
+            session.start()
+        finally:
+            if recorder is not None:
+                recorder.uninstall()
+        summary = session.metrics.summary()
+        session.get_strategy().close()
+        if session.answer_cache is not None:
+            session.answer_cache.close()
+
+    return {
+        'questions': bank.answered,
+        'correct': bank.correct,
+        'wall_time': summary['duration'],
+        'bili_requests': bili.requests,
+        'bili_errors': bili.errors,
+        'llm_requests': llm.requests + (backup.requests if backup is not llm else 0),
+        'llm_errors': llm.errors,
+        'stages': dict(summary['stages'], question=summary['question_total']),
+        'counters': summary['counters'],
+        'prompt_tokens': session.prompt_builder.summary(),
+    }
+
+
+def print_report(result):
+    print(format_table(result['stages']))
+    print()
+    print(f"答题数: {result['questions']}  正确: {result['correct']}  总耗时: {result['wall_time']:.2f}s")
+    print(f"B站接口请求: {result['bili_requests']} (注入错误 {result['bili_errors']})  "
+          f"模型请求: {result['llm_requests']} (注入错误 {result['llm_errors']})")
+    if result['counters']:
+        print('计数: ' + '  '.join(f'{k}={v}' for k, v in result['counters'].items()))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='答题流程端到端基准测试')
+    parser.add_argument('--questions', type=int, default=100, help='题目数量 (1-100)')
+    parser.add_argument('--strategy', default='single', choices=('single', 'failover', 'race', 'ensemble'))
+    parser.add_argument('--backend', default='openai', choices=('openai', 'gemini'),
+                        help='单模型策略使用的接口格式')
+    parser.add_argument('--no-stream', action='store_true', help='关闭流式请求')
+    parser.add_argument('--cache', action='store_true', help='启用本地答案缓存（临时目录）')
+    parser.add_argument('--captcha', action='store_true', help='开始答题前需要完成验证码流程')
+    parser.add_argument('--bili-latency', default='lognormal:0.05,0.3', help='B站接口延迟分布')
+    parser.add_argument('--bili-error-rate', type=float, default=0.0, help='B站接口返回 503 的概率')
+    parser.add_argument('--llm-latency', default='lognormal:0.3,0.4', help='模型首个 token 前的延迟分布')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='模型接口返回 503 的概率')
+    parser.add_argument('--token-interval', type=float, default=0.02, help='模型每个 token 的生成间隔（秒）')
+    parser.add_argument('--hedge', action='store_true', help='启用对冲请求')
+    parser.add_argument('--fallback', action='store_true',
+                        help='OpenAI 格式接口按 --llm-error-rate 出错，经熔断切换到另一个正常的 Gemini 格式接口')
+    parser.add_argument('--hedge-min-delay', type=float, default=0.2,
+                        help='对冲等待时间的下限（秒），替身服务的延迟较低，默认比配置中的值小')
+    parser.add_argument('--accuracy', type=float, default=1.0, help='模型答对的概率')
+    parser.add_argument('--submit-interval', type=float, default=0.0,
+                        help='提交后的等待时间，QuizSession 默认为 1 秒')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='将结果写入 JSON 文件')
+    parser.add_argument('--trace', help='将请求录制到该 JSONL 文件，可用 python -m tools.trace replay 回放')
+    parser.add_argument('--verbose', action='store_true', help='输出答题日志')
+    args = parser.parse_args(argv)
+    if not 1 <= args.questions <= 100:
+        parser.error('--questions 必须在 1 到 100 之间')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        for name in ('scripts', 'tools', 'client'):
+            logger.disable(name)
+    result = run(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0 if result['questions'] == args.questions else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求签名基准测试
+比较 appsign（每次复制、排序并编码全部参数）和 ParamTemplate.sign（只编码变化的参数）对答题接口请求的耗时，
+两者的签名结果不一致时以返回码 1 退出
+
+用法：
+    python -m benchmarks.signing
+    python -m benchmarks.signing --iterations 100000
+"""
+
+import argparse
+import time
+from unittest import mock
+from client.senior import CAPTCHA_SUBMIT_PARAMS, QUERY_PARAMS
+from tools.request_b import ParamTemplate, appsign
+
+CREDENTIALS = {'access_key': 'a' * 32, 'csrf': 'c' * 32}
+
+# 请求 -> (固定参数, 变化的参数)
+CASES = {
+    'question_get': (QUERY_PARAMS, {}),
+    'question_submit': (QUERY_PARAMS, {'id': 12345, 'ans_hash': 'f' * 32, 'ans_text': '选项文本 A&B'}),
+    'captcha_submit': (CAPTCHA_SUBMIT_PARAMS, {'bili_code': 'ab12', 'bili_token': 't' * 32, 'ids': '1,2,3'}),
+}
+
+
+def measure(sign, iterations):
+    """返回每次签名的平均耗时（秒）"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        sign()
+    return (time.perf_counter() - started) / iterations
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='请求签名基准测试')
+    parser.add_argument('--iterations', type=int, default=20000, help='每种请求的签名次数')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"{'request':<18}{'appsign':>10}{'template':>10}{'saved':>8}  (us)")
+    failed = []
+    for name, (static, dynamic) in CASES.items():
+        static = dict(static, **CREDENTIALS)
+        template = ParamTemplate(static)
+        # 固定时间戳，两种方式的结果应完全相同（包括参数顺序）
+        with mock.patch('time.time', return_value=1700000000):
+            expected, actual = appsign(dict(static, **dynamic)), template.sign(dynamic)
+        if expected != actual or list(expected) != list(actual):
+            failed.append(name)
+        legacy = measure(lambda: appsign(dict(static, **dynamic)), args.iterations)
+        current = measure(lambda: template.sign(dynamic), args.iterations)
+        print(f'{name:<18}{legacy * 1e6:>10.1f}{current * 1e6:>10.1f}{1 - current / legacy:>8.0%}')
+
+    for name in failed:
+        print(f'未通过 - {name}: ParamTemplate.sign 与 appsign 的结果不一致')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GUI 启动耗时基准测试
+在全新的子进程中分别测量导入 gui.main_window 的耗时和显示第一个窗口的耗时，
+并列出启动时提前导入的模块；多次测量中的最小值超出 --import-budget 或 --window-budget 时以返回码 1 退出。
+延迟导入和导入副作用的检查见 tests/test_startup.py，与这里共用 LAZY_MODULES 和 probe
+
+用法：
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from benchmarks.stats import format_table, summarize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动时不应导入的模块，它们只在登录、显示二维码或开始答题时才需要
+LAZY_MODULES = (
+    'qrcode', 'PIL', 'gui.dialogs', 'gui.threads', 'gui.async_runner',
+    'scripts.start_senior', 'scripts.start_senior_async',
+    'tools.LLM.deepseek', 'tools.LLM.gemini', 'tools.LLM.custom',
+)
+
+# 启动 GUI 时导入的模块
+GUI_MODULES = ('gui.main_window', 'gui.style')
+
+# 子进程中执行的测量代码：记录导入期间创建的目录，再导入 argv[1] 中的模块，
+# argv[2] 为 'window' 时显示主窗口，结果以一行 JSON 输出
+_PROBE = r'''
+import json, os, sys, time
+created = []
+_makedirs, _mkdir = os.makedirs, os.mkdir
+def makedirs(name, *args, **kwargs):
+    created.append(str(name))
+    return _makedirs(name, *args, **kwargs)
+def mkdir(name, *args, **kwargs):
+    created.append(str(name))
+    return _mkdir(name, *args, **kwargs)
+os.makedirs, os.mkdir = makedirs, mkdir
+
+started = time.perf_counter()
+for name in sys.argv[1].split(','):
+    __import__(name)
+imported = time.perf_counter()
+result = {'import': imported - started, 'created': list(created), 'modules': sorted(sys.modules)}
+if sys.argv[2] == 'window':
+    from PySide6.QtWidgets import QApplication
+    from gui.main_window import MainWindow
+    from gui.style import STYLE_SHEET
+    app = QApplication([])
+    app.setStyle("Fusion")
+    app.setStyleSheet(STYLE_SHEET)
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    result['window'] = time.perf_counter() - started
+print(json.dumps(result))
+'''
+
+
+def probe(home, modules=GUI_MODULES, mode='window'):
+    """启动一个使用临时 HOME 的子进程测量一次
+
+    Args:
+        home (str): 子进程的 HOME 目录
+        modules (Iterable[str]): 要导入的模块
+        mode (str): 'window' 时导入后再显示主窗口，'import' 时只导入
+
+    Returns:
+        dict: import/window 为耗时（秒），created 为导入期间创建的目录，modules 为已导入的模块
+    """
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home))
+    # 没有显示器时使用离屏渲染
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE, ','.join(modules), mode],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(args):
+    """运行 args.runs 次测量，返回结果字典"""
+    imports, windows, loaded = [], [], set()
+    with tempfile.TemporaryDirectory() as home:
+        for _ in range(args.runs):
+            result = probe(home)
+            imports.append(result['import'])
+            windows.append(result['window'])
+            loaded.update(name for name in LAZY_MODULES if name in result['modules'])
+        config_dir_created = os.path.exists(os.path.join(home, '.bili-hardcore'))
+    return {
+        'runs': args.runs,
+        'import': summarize(imports),
+        'window': summarize(windows),
+        'best_import': min(imports),
+        'best_window': min(windows),
+        'eager_modules': sorted(loaded),
+        'config_dir_created': config_dir_created,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='GUI 启动耗时基准测试')
+    parser.add_argument('--runs', type=int, default=5, help='测量次数')
+    parser.add_argument('--import-budget', type=float, default=0.35, help='导入 gui.main_window 的耗时预算（秒）')
+    parser.add_argument('--window-budget', type=float, default=0.8, help='从导入到显示第一个窗口的耗时预算（秒）')
+    parser.add_argument('--json', help='将结果写入 JSON 文件')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    print(format_table({'import': result['import'], 'first_window': result['window']}))
+    print()
+    if result['eager_modules']:
+        print('启动时导入了应延迟加载的模块: ' + ', '.join(result['eager_modules']))
+    if result['config_dir_created']:
+        print('启动时创建了配置目录')
+    failed = []
+    if result['best_import'] >= args.import_budget:
+        failed.append(f"导入耗时 {result['best_import'] * 1000:.0f}ms 超出预算 {args.import_budget * 1000:.0f}ms")
+    if result['best_window'] >= args.window_budget:
+        failed.append(f"显示第一个窗口耗时 {result['best_window'] * 1000:.0f}ms 超出预算 {args.window_budget * 1000:.0f}ms")
+    for message in failed:
+        print(f'未通过 - {message}')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
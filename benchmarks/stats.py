@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试的统计工具
+"""
+
+from tools.metrics import summarize
+
+# summarize 供各基准测试与 format_table 一起导入
+__all__ = ['format_table', 'summarize']
+
+
+def format_table(summaries):
+    """将各阶段的汇总格式化为文本表格，耗时单位为毫秒
+
+    Args:
+        summaries (dict): 阶段名 -> summarize() 的结果
+
+    Returns:
+        str: 表格文本
+    """
+    header = f"{'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    lines = [header, '-' * 74]
+    for name, s in summaries.items():
+        lines.append(
+            f"{name:<16}{s['count']:>8}"
+            f"{s['mean'] * 1000:>10.1f}{s['p50'] * 1000:>10.1f}{s['p95'] * 1000:>10.1f}"
+            f"{s['p99'] * 1000:>10.1f}{s['max'] * 1000:>10.1f}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地替身服务
+BiliStubServer 模拟 /x/senior/v1 下的答题接口，MockLLMServer 模拟 OpenAI / Gemini 兼容的模型接口，
+两者共用同一个题库，延迟分布和错误率均可配置；http2=True 时以 HTTP/2 明文连接（h2c）提供服务
+"""
+
+import hashlib
+import json
+import random
+import socket
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from urllib.parse import parse_qs, urlsplit
+
+SENIOR_PREFIX = '/x/senior/v1'
+
+
+class LatencyModel:
+    """延迟分布
+
+    规格字符串格式：
+        '0.05'                 固定 50ms
+        'const:0.05'           固定 50ms
+        'uniform:0.02,0.1'     20ms 到 100ms 均匀分布
+        'lognormal:0.05,0.5'   中位数 50ms、sigma 为 0.5 的对数正态分布
+        'normal:0.05,0.01'     均值 50ms、标准差 10ms 的正态分布（截断到 0）
+    """
+
+    def __init__(self, kind='const', args=(0.0,), seed=None):
+        self.kind = kind
+        self.args = tuple(args)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=None):
+        """从规格字符串创建延迟分布"""
+        spec = str(spec).strip()
+        kind, _, raw = spec.partition(':')
+        if not raw:
+            kind, raw = 'const', spec
+        args = [float(value) for value in raw.split(',')]
+        if kind not in ('const', 'uniform', 'lognormal', 'normal'):
+            raise ValueError(f'未知的延迟分布: {kind}')
+        return cls(kind, args, seed)
+
+    def sample(self):
+        """采样一次延迟（秒）"""
+        with self._lock:
+            if self.kind == 'uniform':
+                value = self._random.uniform(*self.args)
+            elif self.kind == 'lognormal':
+                median, sigma = self.args
+                value = median * self._random.lognormvariate(0, sigma)
+            elif self.kind == 'normal':
+                value = self._random.gauss(*self.args)
+            else:
+                value = self.args[0]
+        return max(value, 0.0)
+
+
+class QuestionBank:
+    """生成确定性的题目，并记录正确答案供模型替身和答题统计使用"""
+
+    def __init__(self, total=100, seed=0):
+        self.total = total
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # 题目文本 -> (选项列表, 正确选项序号)
+        self._questions = {}
+        self.answered = 0
+        self.correct = 0
+
+    def make(self, number):
+        """生成第 number 题，返回 (题目, 选项列表)"""
+        with self._lock:
+            a, b = self._random.randint(10, 99), self._random.randint(10, 99)
+            question = f'基准测试第{number}题：{a} + {b} 等于多少？'
+            values = {a + b}
+            while len(values) < 4:
+                values.add(a + b + self._random.randint(-20, 20))
+            texts = [str(value) for value in values]
+            self._random.shuffle(texts)
+            answers = [{'ans_hash': hashlib.md5(f'{question}{text}'.encode()).hexdigest(), 'ans_text': text}
+                       for text in texts]
+            self._questions[question] = (answers, texts.index(str(a + b)) + 1)
+        return question, answers
+
+    def correct_index(self, prompt):
+        """从提示词中找到题目，返回 (正确选项序号, 选项数量)，找不到时返回 (None, 4)"""
+        question = prompt.rsplit('问题：', 1)[-1].split('\n', 1)[0].strip()
+        with self._lock:
+            entry = self._questions.get(question)
+        if entry is None:
+            return None, 4
+        answers, index = entry
+        return index, len(answers)
+
+    def record(self, question, ans_hash):
+        """记录一次提交，返回是否正确"""
+        with self._lock:
+            answers, index = self._questions.get(question, ([], None))
+            correct = bool(answers) and answers[index - 1]['ans_hash'] == ans_hash
+            self.answered += 1
+            self.correct += int(correct)
+        return correct
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体一次写出，避免 Nagle 算法与延迟确认叠加出额外的 40ms
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except (BrokenPipeError, ConnectionResetError):
+            # 流式响应被客户端提前关闭
+            self.close_connection = True
+
+    def finish(self):
+        try:
+            super().finish()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        self.server.stub.dispatch(self, 'GET')
+
+    def do_POST(self):
+        self.server.stub.dispatch(self, 'POST')
+
+    def do_HEAD(self):
+        # 连接预热使用的 HEAD 请求，不计入请求数，也不注入延迟和错误
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_events(self):
+        """开始 SSE 响应，以分块编码发送，连接在响应结束后可以复用"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.wfile.flush()
+
+    def write_event(self, data):
+        try:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            raise
+
+    def end_events(self):
+        self.write_event(b'')
+
+
+class _H2Exchange:
+    """HTTP/2 连接上的一个请求，提供与 _Handler 相同的响应接口"""
+
+    def __init__(self, connection, stream_id, headers):
+        self._connection = connection
+        self.stream_id = stream_id
+        self.command = headers.get(':method', 'GET')
+        self.path = headers.get(':path', '/')
+        self.body = bytearray()
+        self.reset = False
+        # 与 _Handler 的属性对应，HTTP/2 中提前结束的请求只影响自身的流
+        self.close_connection = False
+
+    def read_body(self):
+        return bytes(self.body)
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self._connection.send_headers(self, status, [('content-type', 'application/json; charset=utf-8'),
+                                                     ('content-length', str(len(body)))])
+        self._connection.send_data(self, body, end_stream=True)
+
+    def send_empty(self):
+        self._connection.send_headers(self, 200, [('content-length', '0')], end_stream=True)
+
+    def start_events(self):
+        self._connection.send_headers(self, 200, [('content-type', 'text/event-stream; charset=utf-8')])
+
+    def write_event(self, data):
+        self._connection.send_data(self, data)
+
+    def end_events(self):
+        self._connection.send_data(self, b'', end_stream=True)
+
+
+class _H2Connection:
+    """服务端的一个 HTTP/2 连接：当前线程读取帧，每个请求在单独的线程中处理"""
+
+    def __init__(self, stub, sock):
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self.stub = stub
+        self.sock = sock
+        self.conn = H2Connection(H2Configuration(client_side=False, header_encoding='utf-8'))
+        # 保护 conn 和套接字写入；流量控制窗口不足时在 _window 上等待
+        self._lock = threading.Lock()
+        self._window = threading.Condition(self._lock)
+        self._streams = {}
+        self._closed = False
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data:
+            self.sock.sendall(data)
+
+    def serve(self):
+        import h2.events
+        import h2.exceptions
+
+        with self._lock:
+            self.conn.initiate_connection()
+            self._flush()
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                with self._lock:
+                    for event in self.conn.receive_data(data):
+                        self._on_event(event, h2.events)
+                    self._flush()
+                    self._window.notify_all()
+        except (OSError, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            with self._lock:
+                self._closed = True
+                self._window.notify_all()
+
+    def _on_event(self, event, events):
+        if isinstance(event, events.RequestReceived):
+            self._streams[event.stream_id] = _H2Exchange(self, event.stream_id, dict(event.headers))
+        elif isinstance(event, events.DataReceived):
+            exchange = self._streams.get(event.stream_id)
+            if exchange is not None:
+                exchange.body += event.data
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, events.StreamEnded):
+            exchange = self._streams.get(event.stream_id)
+            if exchange is not None:
+                threading.Thread(target=self._dispatch, args=(exchange,), daemon=True).start()
+        elif isinstance(event, events.StreamReset):
+            exchange = self._streams.pop(event.stream_id, None)
+            if exchange is not None:
+                exchange.reset = True
+
+    def _dispatch(self, exchange):
+        try:
+            if exchange.command == 'HEAD':
+                exchange.send_empty()
+            else:
+                self.stub.dispatch(exchange, exchange.command)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._streams.pop(exchange.stream_id, None)
+
+    def _check(self, exchange):
+        if self._closed or exchange.reset:
+            raise BrokenPipeError('stream closed')
+
+    def send_headers(self, exchange, status, headers, end_stream=False):
+        from h2.exceptions import StreamClosedError
+
+        with self._lock:
+            self._check(exchange)
+            try:
+                self.conn.send_headers(exchange.stream_id, [(':status', str(status))] + headers,
+                                       end_stream=end_stream)
+            except StreamClosedError:
+                raise BrokenPipeError('stream closed')
+            self._flush()
+
+    def send_data(self, exchange, data, end_stream=False):
+        from h2.exceptions import StreamClosedError
+
+        with self._lock:
+            try:
+                while True:
+                    self._check(exchange)
+                    size = min(self.conn.local_flow_control_window(exchange.stream_id),
+                               self.conn.max_outbound_frame_size, len(data))
+                    if size <= 0 and data:
+                        self._window.wait(1)
+                        continue
+                    chunk, data = data[:size], data[size:]
+                    self.conn.send_data(exchange.stream_id, chunk, end_stream=end_stream and not data)
+                    self._flush()
+                    if not data:
+                        break
+            except StreamClosedError:
+                raise BrokenPipeError('stream closed')
+
+
+class _H2Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _H2Connection(self.server.stub, self.request).serve()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    connect_latency = 0.0
+
+    def finish_request(self, request, client_address):
+        self.stub.count_connection()
+        # 每个新连接先等待 connect_latency，模拟 DNS、TCP 和 TLS 握手的耗时
+        if self.connect_latency:
+            sleep(self.connect_latency)
+        super().finish_request(request, client_address)
+
+
+class StubServer:
+    """在后台线程运行的 HTTP 替身服务基类"""
+
+    def __init__(self, latency='0', error_rate=0.0, seed=None, host='127.0.0.1', port=0, connect_latency=0.0,
+                 http2=False):
+        """
+        Args:
+            latency: 每个请求的延迟分布，见 LatencyModel.parse
+            error_rate (float): 返回 503 的概率
+            connect_latency (float): 建立新连接的额外耗时（秒），复用的 keep-alive 连接没有该耗时
+            http2 (bool): 以 HTTP/2 明文连接提供服务（需要安装 h2），不支持 HTTP/1.1
+        """
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel.parse(latency, seed)
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _H2Handler if http2 else _Handler)
+        self._server.connect_latency = connect_latency
+        self._server.stub = self
+        self._thread = None
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            self.errors += int(failed)
+        return failed
+
+    def dispatch(self, handler, method):
+        # 先读完请求体，注入错误时连接仍可复用
+        body = handler.read_body()
+        sleep(self.latency.sample())
+        if self._should_fail():
+            handler.send_json({'error': 'injected failure'}, status=503)
+            return
+        self.handle(handler, method, urlsplit(handler.path), body)
+
+    def handle(self, handler, method, url, body):
+        raise NotImplementedError
+
+
+class BiliStubServer(StubServer):
+    """B站答题接口替身
+
+    答题从第 101 - total 题开始编号，使 QuizSession 恰好回答 total 道题；
+    require_captcha 为 True 时需要先完成分类选择和验证码提交才能获取题目
+    """
+
+    def __init__(self, bank, require_captcha=False, **kwargs):
+        super().__init__(**kwargs)
+        self.bank = bank
+        self.verified = not require_captcha
+        self._number = 101 - bank.total
+        self._current = None
+
+    @property
+    def senior_url(self):
+        return self.url + SENIOR_PREFIX
+
+    def handle(self, handler, method, url, body):
+        path = url.path[len(SENIOR_PREFIX):] if url.path.startswith(SENIOR_PREFIX) else url.path
+        form = {key: values[0] for key, values in parse_qs(body.decode('utf-8')).items()}
+
+        if path == '/question' and method == 'GET':
+            handler.send_json(self._question())
+        elif path == '/answer/submit' and method == 'POST':
+            handler.send_json(self._submit(form))
+        elif path == '/category' and method == 'GET':
+            handler.send_json({'code': 0, 'data': {'categories': [
+                {'id': 1, 'name': '文史'}, {'id': 2, 'name': '理工'}, {'id': 3, 'name': '动画'},
+            ]}})
+        elif path == '/captcha' and method == 'GET':
+            handler.send_json({'code': 0, 'data': {'url': self.url + '/captcha.png', 'token': 'stub-captcha'}})
+        elif path == '/captcha/submit' and method == 'POST':
+            self.verified = True
+            handler.send_json({'code': 0, 'data': {}})
+        else:
+            handler.send_json({'code': -404, 'message': 'not found'}, status=404)
+
+    def _question(self):
+        if not self.verified:
+            return {'code': 41099, 'message': '请先完成验证'}
+        with self._lock:
+            if self._current is None:
+                question, answers = self.bank.make(self._number)
+                self._current = {'id': self._number, 'question': question, 'answers': answers,
+                                 'question_num': self._number}
+            return {'code': 0, 'data': self._current}
+
+    def _submit(self, form):
+        with self._lock:
+            current = self._current
+            if current is None or str(current['id']) != form.get('id'):
+                return {'code': 41100, 'message': '题目不存在'}
+            self.bank.record(current['question'], form.get('ans_hash'))
+            self._current = None
+            self._number += 1
+        return {'code': 0, 'data': {}}
+
+
+class MockLLMServer(StubServer):
+    """OpenAI / Gemini 兼容的模型接口替身
+
+    根据题库给出答案，accuracy 控制答对的概率。回复由序号和一段解析组成（explanation_tokens 为 0 时只有序号），
+    每 4 个字符作为一个 token，按 token_interval 逐个生成，流式请求会逐块返回
+    """
+
+    def __init__(self, bank, accuracy=1.0, token_interval=0.02, explanation_tokens=40, **kwargs):
+        super().__init__(**kwargs)
+        self.bank = bank
+        self.accuracy = accuracy
+        self.token_interval = token_interval
+        self.explanation_tokens = explanation_tokens
+
+    def _reply_chunks(self, prompt):
+        index, option_count = self.bank.correct_index(prompt)
+        with self._lock:
+            if index is None or self._random.random() >= self.accuracy:
+                choices = [i for i in range(1, option_count + 1) if i != index]
+                index = self._random.choice(choices)
+        if not self.explanation_tokens:
+            return [f'{index}']
+        return [f'{index}', '\n解析：'] + ['计算可得'] * self.explanation_tokens
+
+    def handle(self, handler, method, url, body):
+        if method != 'POST':
+            handler.send_json({'error': 'method not allowed'}, status=405)
+            return
+        body = json.loads(body or b'{}')
+        path = url.path
+        if path.endswith('/chat/completions'):
+            prompt = body['messages'][-1]['content']
+            chunks = self._reply_chunks(prompt)
+            if body.get('stream'):
+                self._stream(handler, chunks, self._openai_chunk, done=True)
+            else:
+                self._generate(chunks)
+                handler.send_json({'choices': [{'message': {'role': 'assistant', 'content': ''.join(chunks)}}]})
+        elif ':generateContent' in path or ':streamGenerateContent' in path:
+            prompt = body['contents'][0]['parts'][0]['text']
+            chunks = self._reply_chunks(prompt)
+            if ':streamGenerateContent' in path:
+                self._stream(handler, chunks, self._gemini_chunk, done=False)
+            else:
+                self._generate(chunks)
+                handler.send_json({'candidates': [{'content': {'parts': [{'text': ''.join(chunks)}]}}]})
+        else:
+            handler.send_json({'error': 'not found'}, status=404)
+
+    def _generate(self, chunks):
+        sleep(self.token_interval * len(chunks))
+
+    @staticmethod
+    def _openai_chunk(text):
+        return {'choices': [{'delta': {'content': text}}]}
+
+    @staticmethod
+    def _gemini_chunk(text):
+        return {'candidates': [{'content': {'parts': [{'text': text}]}}]}
+
+    def _stream(self, handler, chunks, make_chunk, done):
+        handler.start_events()
+        try:
+            for text in chunks:
+                sleep(self.token_interval)
+                event = json.dumps(make_chunk(text), ensure_ascii=False)
+                handler.write_event(f'data: {event}\n\n'.encode('utf-8'))
+            if done:
+                handler.write_event(b'data: [DONE]\n\n')
+            handler.end_events()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端拿到答案后提前关闭了连接
+            pass
@@ -71,7 +71,10 @@ def create_spec_file():
         "'charset_normalizer'",
         "'urllib3'",
         "'PIL'",
-        "'PIL.Image'"
+        "'PIL.Image'",
+        "'httpx'",
+        "'h2'",
+        "'qasync'"
     ]
     
     # 使用安全的路径字符串（避免__file__问题）
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+B站硬核会员试炼答题助手命令行入口
+不依赖 PySide6，适合在没有图形界面的服务器上运行
+
+使用 --json 时标准输出的每一行都是一个 JSON 对象（event 字段区分类型），日志也以 log 事件输出；
+需要输入分类ID或验证码时输出 input_required 事件，并从标准输入读取一行
+
+用法：
+    python cli.py login
+    python cli.py status --json
+    python cli.py run --model gemini --json
+    python cli.py bench --questions 20 --strategy race
+"""
+
+import argparse
+import json
+import sys
+import threading
+from datetime import datetime
+from config.config import MODEL_DISPLAY_INFO, ANSWER_STRATEGY, CONFIG_DIR, HEDGE_CONFIG, load_model_config
+from tools.logger import disable_sink, logger
+
+# 返回码
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NOT_READY = 2  # 未登录或未配置 API 密钥
+
+# 模型类型 <-> model_choice
+MODEL_CHOICES = {name: info['choice_value'] for name, info in MODEL_DISPLAY_INFO.items()}
+
+
+class JsonReporter:
+    """以 JSON Lines 格式向标准输出写入事件"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+        self._sink_id = None
+
+    def emit(self, event, data=None):
+        record = {'event': event, 'time': datetime.now().isoformat(timespec='milliseconds')}
+        record.update(data or {})
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def _write_log(self, message):
+        record = message.record
+        self.emit('log', {'level': record['level'].name, 'message': record['message']})
+
+    def capture_logs(self, level):
+        """用 log 事件替换控制台日志，保证标准输出只有 JSON"""
+        disable_sink('console')
+        self._sink_id = logger.add(self._write_log, level=level, format='{message}')
+
+    def progress(self, event, data):
+        """QuizSession 的进度回调"""
+        self.emit(event, data)
+
+    def request_input(self, kind, payload):
+        """QuizSession 的输入回调，从标准输入读取一行"""
+        self.emit('input_required', {'kind': kind, 'payload': payload})
+        line = sys.stdin.readline()
+        return line.strip()
+
+
+def cmd_login(args, reporter):
+    from scripts.login import auth, logout
+
+    if args.force:
+        logout()
+    if reporter is None:
+        ok = auth()
+    else:
+        # 二维码链接以事件输出，不在标准输出打印字符二维码
+        ok = auth(gui_mode=True, gui_callback=lambda url: reporter.emit('qrcode', {'url': url}))
+        reporter.emit('login', {'success': ok})
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+def cmd_status(args, reporter):
+    from scripts.login import load_auth_data, is_login
+    import tools.request_b
+
+    load_auth_data()
+    logged_in = is_login()
+    models = {}
+    for name in MODEL_CHOICES:
+        config = load_model_config(name)
+        models[name] = {
+            'base_url': config.get('base_url', ''),
+            'model': config.get('model', ''),
+            'http2': config.get('http2', False),
+            'api_key_configured': bool(config.get('api_key')),
+        }
+    status = {
+        'logged_in': logged_in,
+        'mid': tools.request_b.headers.get('x-bili-mid') if logged_in else None,
+        'strategy': ANSWER_STRATEGY,
+        'hedge': HEDGE_CONFIG['enabled'],
+        'config_dir': CONFIG_DIR,
+        'models': models,
+    }
+    if reporter is not None:
+        reporter.emit('status', status)
+    else:
+        print(f"登录状态: {'已登录 (mid ' + str(status['mid']) + ')' if logged_in else '未登录'}")
+        print(f"答题策略: {status['strategy']}")
+        print(f"对冲请求: {'开启' if status['hedge'] else '关闭'}")
+        print(f"配置目录: {status['config_dir']}")
+        for name, model in models.items():
+            print(f"{MODEL_DISPLAY_INFO[name]['name']}: {model['model'] or '-'} "
+                  f"({'已配置API密钥' if model['api_key_configured'] else '未配置API密钥'})")
+    return EXIT_OK
+
+
+def cmd_run(args, reporter):
+    import config.config
+    from scripts.login import load_auth_data, is_login
+    from scripts.start_senior import QuizSession
+    from tools.LLM.strategy import create_strategy
+
+    def not_ready(message):
+        if reporter is not None:
+            reporter.emit('error', {'message': message})
+        else:
+            logger.error(message)
+        return EXIT_NOT_READY
+
+    if not load_auth_data() and not is_login():
+        return not_ready('未登录，请先运行 python cli.py login')
+    if not load_model_config(args.model).get('api_key'):
+        return not_ready(f'请先配置{args.model.upper()} API密钥')
+
+    choice = MODEL_CHOICES[args.model]
+    config.config.model_choice = choice
+    if args.hedge:
+        # 模型客户端在第一次提问时按 HEDGE_CONFIG 创建
+        config.config.HEDGE_CONFIG['enabled'] = True
+    if reporter is not None:
+        session = QuizSession(input_handler=reporter.request_input, progress_handler=reporter.progress)
+    else:
+        session = QuizSession()
+    session.update_model_choice(choice)
+    if args.strategy:
+        session.strategy = create_strategy(args.strategy, session.llm_registry, choice)
+
+    logger.info(f'开始使用 {args.model.upper()} 模型答题...')
+    session.start()
+    logger.info('答题结束')
+    return EXIT_OK if session.question_num >= 100 else EXIT_FAILED
+
+
+def cmd_bench(args, reporter):
+    from benchmarks.quiz_pipeline import main as bench_main
+
+    return bench_main(args.bench_args)
+
+
+def parse_args(argv=None):
+    # login、status、run 共用的输出选项
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--json', action='store_true', help='以 JSON Lines 格式输出事件和日志')
+    output.add_argument('--log-level', default='INFO', help='--json 模式下输出的日志级别')
+
+    parser = argparse.ArgumentParser(description='B站硬核会员试炼答题助手（命令行）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    login = sub.add_parser('login', parents=[output], help='扫码登录B站')
+    login.add_argument('--force', action='store_true', help='清除已保存的登录信息后重新登录')
+    login.set_defaults(handler=cmd_login)
+
+    status = sub.add_parser('status', parents=[output], help='查看登录状态和模型配置')
+    status.set_defaults(handler=cmd_status)
+
+    run = sub.add_parser('run', parents=[output], help='开始答题')
+    run.add_argument('--model', choices=tuple(MODEL_CHOICES), default='deepseek', help='使用的模型')
+    run.add_argument('--strategy', choices=('single', 'failover', 'race', 'ensemble'),
+                     help=f'答题策略，默认为配置中的 {ANSWER_STRATEGY}')
+    run.add_argument('--hedge', action='store_true',
+                     help='开启对冲请求（HEDGE_CONFIG）：耗时异常的请求向同一模型再发一次，会重复计费')
+    run.set_defaults(handler=cmd_run)
+
+    bench = sub.add_parser('bench', help='运行答题流程基准测试，其余参数传给 benchmarks.quiz_pipeline',
+                           add_help=False)
+    bench.set_defaults(handler=cmd_bench, json=False)
+
+    args, extra = parser.parse_known_args(argv)
+    if args.command == 'bench':
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    reporter = None
+    if args.json:
+        reporter = JsonReporter()
+        reporter.capture_logs(args.log_level)
+    try:
+        return args.handler(args, reporter)
+    except KeyboardInterrupt:
+        logger.info('已中断')
+        return EXIT_FAILED
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
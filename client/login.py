@@ -11,7 +11,7 @@ def qrcode_get():
     '''
     res = post('https://passport.bilibili.com/x/passport-tv-login/qrcode/auth_code', {
         'local_id':0
-    });
+    }, idempotent=True);
     if res and res.get('code') == 0:
         return res.get('data')
     else:
@@ -23,7 +23,8 @@ def qrcode_poll(auth_code):
     :param auth_code:
     :return:
     '''
+    # 轮询只查询状态，可以安全重试
     return post('https://passport.bilibili.com/x/passport-tv-login/qrcode/poll', {
         'auth_code': auth_code,
         'local_id':0
-    });
\ No newline at end of file
+    }, idempotent=True);
\ No newline at end of file
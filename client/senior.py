@@ -1,100 +1,263 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from tools.request_b import get, post
+"""
+答题接口
+SeniorClient 持有登录凭证，固定参数在创建时编码一次，请求时只签名变化的参数，
+返回类型化的结果，接口返回错误时抛出 SeniorAPIError 的子类；
+模块级函数保持原有的返回值，使用模块变量中的凭证
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+from tools.request_b import ParamTemplate, get, post
+from config.config import API_CONFIG
 
 access_token = None;
 csrf = None;
+# 答题接口地址，基准测试时可替换为本地服务
+base_url = API_CONFIG['senior_url']
+
+STATISTICS = '{"appId":1,"platform":3,"version":"8.40.0","abtest":""}'
+
+# 获取分类、验证码、题目和提交答案共用的固定参数
+QUERY_PARAMS = {
+    'disable_rcmd': '0',
+    'mobi_app': 'android',
+    'platform': 'android',
+    'statistics': STATISTICS,
+    'web_location': '333.790',
+}
+
+# 提交验证码的固定参数
+CAPTCHA_SUBMIT_PARAMS = {
+    'disable_rcmd': '0',
+    'gt_challenge': '',
+    'gt_seccode': '',
+    'gt_validate': '',
+    'mobi_app': 'android',
+    'platform': 'android',
+    'statistics': STATISTICS,
+    'type': 'bilibili',
+}
+
+
+class SeniorAPIError(Exception):
+    """答题接口返回错误"""
+
+    def __init__(self, message, response=None):
+        super().__init__(f'{message}{response}')
+        self.response = response
+        self.code = response.get('code') if isinstance(response, dict) else None
+
+
+class QuizUnavailable(SeniorAPIError):
+    """无法获取分类或验证码，通常是已开始答题或受到答题限制"""
+
+
+class VerificationRequired(SeniorAPIError):
+    """获取题目前需要先完成分类选择和验证码"""
+
+
+class CaptchaRejected(SeniorAPIError):
+    """验证码提交失败"""
+
+
+class AnswerRejected(SeniorAPIError):
+    """答案提交失败"""
+
+
+def response_data(res, error, message):
+    """返回响应中的 data，code 不为 0 时抛出 error
+
+    Args:
+        res (dict): 接口返回的 JSON
+        error (type): SeniorAPIError 的子类
+        message (str): 错误信息
+
+    Raises:
+        SeniorAPIError: 响应不是 JSON 对象
+    """
+    if not isinstance(res, dict):
+        raise SeniorAPIError('答题接口响应格式错误', res)
+    if res.get('code') != 0:
+        raise error(message, res)
+    return res.get('data') or {}
+
+
+@dataclass
+class Category:
+    """答题分类"""
+    id: int
+    name: str
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.get('id'), data.get('name'))
+
+
+@dataclass
+class CaptchaChallenge:
+    """验证码图片地址和提交时使用的 token"""
+    url: str
+    token: str
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.get('url'), data.get('token'))
+
+
+@dataclass
+class Answer:
+    """题目选项，提交答案时需要 ans_hash 和 ans_text"""
+    ans_hash: str
+    ans_text: str
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.get('ans_hash'), data.get('ans_text'))
+
+
+@dataclass
+class Question:
+    """一道题目"""
+    id: int
+    question: str
+    answers: List[Answer] = field(default_factory=list)
+    question_num: int = 0
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.get('id'), data.get('question'),
+                   [Answer.from_data(answer) for answer in data.get('answers') or []],
+                   data.get('question_num', 0))
+
+
+class SeniorClient:
+    """答题接口客户端"""
+
+    def __init__(self, access_token: Optional[str] = None, csrf: Optional[str] = None,
+                 base_url: Optional[str] = None):
+        """
+        Args:
+            access_token (str): 登录后的 access_key
+            csrf (str): 登录后的 bili_jct
+            base_url (str): 答题接口地址，默认使用 API_CONFIG['senior_url']
+        """
+        self.access_token = access_token
+        self.csrf = csrf
+        self.base_url = base_url or API_CONFIG['senior_url']
+        credentials = {'access_key': access_token, 'csrf': csrf}
+        self.query_params = ParamTemplate(dict(QUERY_PARAMS, **credentials))
+        self.captcha_submit_params = ParamTemplate(dict(CAPTCHA_SUBMIT_PARAMS, **credentials))
+
+    def get(self, path, params=None):
+        """发送带固定参数的 GET 请求，返回接口的原始响应
+
+        Args:
+            path (str): 接口路径，例如 '/question'
+            params (dict): 变化的参数
+        """
+        return get(self.base_url + path, params or {}, template=self.query_params)
+
+    def post(self, path, params, template=None):
+        """发送 POST 请求，返回接口的原始响应
+
+        Args:
+            path (str): 接口路径，例如 '/answer/submit'
+            params (dict): 变化的参数
+            template (ParamTemplate): 固定参数，默认为 query_params
+        """
+        return post(self.base_url + path, params, template=template or self.query_params)
+
+    def categories(self) -> List[Category]:
+        """获取分类
+
+        Raises:
+            QuizUnavailable: 已开始答题或受到答题限制
+        """
+        data = response_data(self.get('/category'), QuizUnavailable, '获取分类失败，可能是已开始答题或答题限制')
+        return [Category.from_data(c) for c in data.get('categories', [])]
+
+    def captcha(self) -> CaptchaChallenge:
+        """获取验证码
+
+        Raises:
+            QuizUnavailable: 已开始答题或受到答题限制
+        """
+        data = response_data(self.get('/captcha'), QuizUnavailable, '获取验证码失败，可能是已开始答题或答题限制')
+        return CaptchaChallenge.from_data(data)
+
+    def submit_captcha(self, code: str, captcha_token: str, ids: str) -> None:
+        """提交验证码和所选分类
+
+        Args:
+            code (str): 验证码
+            captcha_token (str): CaptchaChallenge.token
+            ids (str): 分类ID，多个用英文逗号隔开
+
+        Raises:
+            CaptchaRejected: 验证码错误或分类无效
+        """
+        res = self.post('/captcha/submit', {'bili_code': code, 'bili_token': captcha_token, 'ids': ids},
+                        self.captcha_submit_params)
+        response_data(res, CaptchaRejected, '提交验证码失败')
+
+    def question(self) -> Question:
+        """获取当前题目
+
+        Raises:
+            VerificationRequired: 需要先完成验证码
+        """
+        return Question.from_data(response_data(self.get('/question'), VerificationRequired, '需要验证码验证'))
+
+    def submit_answer(self, question_id: int, ans_hash: str, ans_text: str) -> None:
+        """提交答案
+
+        Raises:
+            AnswerRejected: 题目已过期或提交失败
+        """
+        res = self.post('/answer/submit', {'id': question_id, 'ans_hash': ans_hash, 'ans_text': ans_text})
+        response_data(res, AnswerRejected, '答案提交失败')
+
+
+_client = None
+
+def default_client():
+    """返回使用模块变量中的凭证和接口地址的客户端，凭证或地址变化后重新创建"""
+    global _client
+    client = _client
+    if client is None or (client.access_token, client.csrf, client.base_url) != (access_token, csrf, base_url):
+        client = _client = SeniorClient(access_token, csrf, base_url)
+    return client
 
 def category_get():
     '''
     获取分类
     '''
-    res = get('https://api.bilibili.com/x/senior/v1/category', {
-        'access_key':access_token,
-        'csrf':csrf,
-        'disable_rcmd':0,
-        'mobi_app':'android',
-        'platform':'android',
-        'statistics':'{"appId":1,"platform":3,"version":"8.40.0","abtest":""}',
-        'web_location':'333.790'
-    });
-    if res and res.get('code') == 0:
-        return res.get('data')
-    else:
-        print('获取分类失败，可能是已开始答题或答题限制{}'.format(res))
-        exit()
+    return response_data(default_client().get('/category'), QuizUnavailable, '获取分类失败，可能是已开始答题或答题限制')
 
 def captcha_get():
     '''
     获取验证码
     '''
-    res = get('https://api.bilibili.com/x/senior/v1/captcha', {
-        'access_key':access_token,
-        'csrf':csrf,
-        'disable_rcmd':0,
-        'mobi_app':'android',
-        'platform':'android',
-        'statistics':'{"appId":1,"platform":3,"version":"8.40.0","abtest":""}',
-        'web_location':'333.790'
-    });
-    if res and res.get('code') == 0:
-        return res.get('data')
-    else:
-        print('获取验证码失败，可能是已开始答题或答题限制{}'.format(res))
-        exit()
+    return response_data(default_client().get('/captcha'), QuizUnavailable, '获取验证码失败，可能是已开始答题或答题限制')
 
 def captcha_submit(code,captcha_token,ids):
     '''
     提交验证码
     '''
-    res = post('https://api.bilibili.com/x/senior/v1/captcha/submit', {
-        "access_key": access_token,
-        "bili_code": code,
-        "bili_token": captcha_token,
-        "csrf": csrf,
-        "disable_rcmd": "0",
-        "gt_challenge": "",
-        "gt_seccode": "",
-        "gt_validate": "",
-        "ids": ids,
-        "mobi_app": "android",
-        "platform": "android",
-        "statistics": "{\"appId\":1,\"platform\":3,\"version\":\"8.40.0\",\"abtest\":\"\"}",
-        "type": "bilibili",
-    });
-    if res and res.get('code') == 0:
-        return True
-    else:
-        raise Exception('提交验证码失败{}'.format(res))
+    default_client().submit_captcha(code, captcha_token, ids)
+    return True
 
 def question_get():
     '''
     获取题目
     '''
-    return get('https://api.bilibili.com/x/senior/v1/question', {
-        "access_key": access_token,
-        "csrf": csrf,
-        "disable_rcmd": "0",
-        "mobi_app": "android",
-        "platform": "android",
-        "statistics": "{\"appId\":1,\"platform\":3,\"version\":\"8.40.0\",\"abtest\":\"\"}",
-        "web_location": "333.790",
-    });
+    return default_client().get('/question')
 
 def question_submit(id,ans_hash,ans_text):
     '''
     提交答案
     '''
-    return post('https://api.bilibili.com/x/senior/v1/answer/submit', {
-        "access_key": access_token,
-        "csrf": csrf,
-        "id": id,
-        "ans_hash": ans_hash,
-        "ans_text": ans_text,
-        "disable_rcmd": "0",
-        "mobi_app": "android",
-        "platform": "android",
-        "statistics": "{\"appId\":1,\"platform\":3,\"version\":\"8.40.0\",\"abtest\":\"\"}",
-        "web_location": "333.790",
-    });
\ No newline at end of file
+    return default_client().post('/answer/submit', {'id': id, 'ans_hash': ans_hash, 'ans_text': ans_text})
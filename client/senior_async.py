@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步版本的答题接口，凭证、固定参数、返回类型和错误类型与 client.senior 的 SeniorClient 相同
+"""
+
+from typing import List
+from client import senior
+from client.senior import (AnswerRejected, CaptchaChallenge, CaptchaRejected, Category, Question, QuizUnavailable,
+                           VerificationRequired, response_data)
+from tools.request_async import get, post
+
+
+async def _get(client, path):
+    senior_client = senior.default_client()
+    return await get(client, senior_client.base_url + path, {}, template=senior_client.query_params)
+
+
+async def _post(client, path, params, template=None):
+    senior_client = senior.default_client()
+    return await post(client, senior_client.base_url + path, params,
+                      template=template or senior_client.query_params)
+
+
+async def category_get(client) -> List[Category]:
+    '''
+    获取分类
+
+    Raises:
+        QuizUnavailable: 已开始答题或受到答题限制
+    '''
+    data = response_data(await _get(client, '/category'), QuizUnavailable, '获取分类失败，可能是已开始答题或答题限制')
+    return [Category.from_data(c) for c in data.get('categories', [])]
+
+
+async def captcha_get(client) -> CaptchaChallenge:
+    '''
+    获取验证码
+
+    Raises:
+        QuizUnavailable: 已开始答题或受到答题限制
+    '''
+    data = response_data(await _get(client, '/captcha'), QuizUnavailable, '获取验证码失败，可能是已开始答题或答题限制')
+    return CaptchaChallenge.from_data(data)
+
+
+async def captcha_submit(client, code, captcha_token, ids) -> None:
+    '''
+    提交验证码
+
+    Raises:
+        CaptchaRejected: 验证码错误或分类无效
+    '''
+    res = await _post(client, '/captcha/submit', {
+        'bili_code': code,
+        'bili_token': captcha_token,
+        'ids': ids,
+    }, template=senior.default_client().captcha_submit_params)
+    response_data(res, CaptchaRejected, '提交验证码失败')
+
+
+async def question_get(client) -> Question:
+    '''
+    获取题目
+
+    Raises:
+        VerificationRequired: 需要先完成验证码
+    '''
+    return Question.from_data(response_data(await _get(client, '/question'), VerificationRequired, '需要验证码验证'))
+
+
+async def question_submit(client, id, ans_hash, ans_text) -> None:
+    '''
+    提交答案
+
+    Raises:
+        AnswerRejected: 题目已过期或提交失败
+    '''
+    res = await _post(client, '/answer/submit', {
+        'id': id,
+        'ans_hash': ans_hash,
+        'ans_text': ans_text,
+    })
+    response_data(res, AnswerRejected, '答案提交失败')
@@ -3,6 +3,8 @@
 
 import os
 import json
+import tempfile
+import threading
 from loguru import logger
 
 # 模型配置 - 基础URL和默认模型
@@ -10,17 +12,20 @@ MODEL_CONFIGS = {
     'deepseek': {
         'base_url': 'https://api.deepseek.com/v1',
         'model': 'deepseek-chat',
-        'api_key': ''
+        'api_key': '',
+        'http2': False
     },
     'gemini': {
         'base_url': 'https://generativelanguage.googleapis.com/v1beta',
         'model': 'gemini-2.0-flash',
-        'api_key': ''
+        'api_key': '',
+        'http2': False
     },
     'custom': {
         'base_url': '',
         'model': '',
-        'api_key': ''
+        'api_key': '',
+        'http2': False
     }
 }
 
@@ -50,44 +55,128 @@ def ensure_config_dir():
     """确保配置目录存在"""
     os.makedirs(CONFIG_DIR, exist_ok=True)
 
-def load_model_config(model_type):
-    """加载模型完整配置（包括API密钥）"""
-    ensure_config_dir()
-    config_file = os.path.join(CONFIG_DIR, f'{model_type}_config.json')
-    
-    if os.path.exists(config_file):
+
+class ConfigStore:
+    """模型配置的内存缓存
+
+    解析后的配置保存在内存中，只有文件的 mtime/size 变化时才重新读取；
+    写入时先写临时文件再重命名，保证配置文件不会被写坏
+    """
+
+    def __init__(self, config_dir):
+        self.config_dir = config_dir
+        # model_type -> (文件签名, 配置字典)
+        self._cache = {}
+        # model_type -> 版本号，配置内容每变化一次递增
+        self._versions = {}
+        self._lock = threading.RLock()
+
+    def _path(self, model_type):
+        return os.path.join(self.config_dir, f'{model_type}_config.json')
+
+    @staticmethod
+    def _signature(path):
+        """返回文件签名 (mtime_ns, size)，文件不存在时返回 None"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _defaults(model_type):
+        return MODEL_CONFIGS.get(model_type, {'base_url': '', 'model': '', 'api_key': '', 'http2': False}).copy()
+
+    def _read(self, model_type, path):
+        """从文件读取配置，失败时返回默认配置"""
+        default_config = self._defaults(model_type)
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
+            with open(path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                # 确保返回完整的配置结构
-                default_config = MODEL_CONFIGS.get(model_type, {})
-                return {
-                    'base_url': data.get('base_url', default_config.get('base_url', '')),
-                    'model': data.get('model', default_config.get('model', '')),
-                    'api_key': data.get('api_key', default_config.get('api_key', ''))
-                }
+            # 确保返回完整的配置结构
+            return {
+                'base_url': data.get('base_url', default_config.get('base_url', '')),
+                'model': data.get('model', default_config.get('model', '')),
+                'api_key': data.get('api_key', default_config.get('api_key', '')),
+                'http2': bool(data.get('http2', default_config.get('http2', False)))
+            }
         except Exception as e:
             logger.error(f'读取{model_type}配置失败: {e}')
-    
-    return MODEL_CONFIGS.get(model_type, {'base_url': '', 'model': '', 'api_key': ''}).copy()
+            return default_config
 
-def save_model_config(model_type, base_url, model_name, api_key=''):
-    """保存模型完整配置（包括API密钥）"""
-    ensure_config_dir()
-    config_file = os.path.join(CONFIG_DIR, f'{model_type}_config.json')
-    
+    def _refresh(self, model_type):
+        """文件签名变化时重新读取，返回缓存的配置"""
+        path = self._path(model_type)
+        signature = self._signature(path)
+        cached = self._cache.get(model_type)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        if signature is None:
+            data = self._defaults(model_type)
+        else:
+            data = self._read(model_type, path)
+        self._cache[model_type] = (signature, data)
+        self._versions[model_type] = self._versions.get(model_type, 0) + 1
+        return data
+
+    def load(self, model_type):
+        """加载配置，返回副本"""
+        with self._lock:
+            return dict(self._refresh(model_type))
+
+    def version(self, model_type):
+        """获取配置版本号，文件在外部被修改时同样会递增"""
+        with self._lock:
+            self._refresh(model_type)
+            return self._versions[model_type]
+
+    def save(self, model_type, data):
+        """原子写入配置并更新缓存"""
+        with self._lock:
+            ensure_config_dir()
+            path = self._path(model_type)
+            fd, tmp_path = tempfile.mkstemp(prefix=f'.{model_type}_', suffix='.tmp', dir=self.config_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._cache[model_type] = (self._signature(path), dict(data))
+            self._versions[model_type] = self._versions.get(model_type, 0) + 1
+
+
+config_store = ConfigStore(CONFIG_DIR)
+
+def get_config_version(model_type):
+    """获取模型配置的版本号，用于让缓存的模型客户端失效"""
+    return config_store.version(model_type)
+
+def load_model_config(model_type):
+    """加载模型完整配置（包括API密钥）"""
+    return config_store.load(model_type)
+
+def save_model_config(model_type, base_url, model_name, api_key='', http2=None):
+    """保存模型完整配置（包括API密钥）
+
+    http2 为 None 时保留现有的设置
+    """
+    existing_config = load_model_config(model_type)
     # 如果没有提供api_key，保留现有的api_key
     if not api_key:
-        existing_config = load_model_config(model_type)
         api_key = existing_config.get('api_key', '')
+    if http2 is None:
+        http2 = existing_config.get('http2', False)
     
     try:
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'base_url': base_url,
-                'model': model_name,
-                'api_key': api_key
-            }, f, indent=2, ensure_ascii=False)
+        config_store.save(model_type, {
+            'base_url': base_url,
+            'model': model_name,
+            'api_key': api_key,
+            'http2': bool(http2)
+        })
         logger.info(f'{model_type}配置已保存')
     except Exception as e:
         logger.error(f'保存{model_type}配置失败: {e}')
@@ -104,14 +193,22 @@ def save_api_key(key_type, api_key):
 
 # 项目配置
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 日志目录在第一次写入日志文件时才创建
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
-os.makedirs(LOG_DIR, exist_ok=True)
+
+# 日志配置，运行时可通过 tools.logger.set_log_level 调整
+LOG_CONFIG = {
+    'console_level': 'INFO',
+    'file_level': 'INFO',
+    'debug_truncate': 500,  # 调试日志中请求参数和响应内容的最大长度，0 表示不截断
+}
 
 # B站API配置
 API_CONFIG = {
     'appkey': '783bbb7264451d82',
     'appsec': '2653583c8873dea268ab9386918b1d65',
     'user_agent': 'Mozilla/5.0 BiliDroid/1.12.0 (bbcallen@gmail.com)',
+    'senior_url': 'https://api.bilibili.com/x/senior/v1',  # 答题接口地址
 }
 
 HEADERS = {
@@ -127,19 +224,120 @@ HEADERS = {
 AUTH_FILE = os.path.join(CONFIG_DIR, 'auth.json')
 
 # LLM提示词模板
-PROMPT = '''
-当前时间：{}
-你是一个高效精准的答题专家，面对选择题时，直接根据问题和选项判断正确答案，并返回对应选项的序号（1, 2, 3, 4）。示例：
+# 固定的指令部分放在最前面且不包含时间等变化内容，便于模型服务商的前缀缓存命中
+PROMPT = '''你是一个高效精准的答题专家，面对选择题时，直接根据问题和选项判断正确答案，并返回对应选项的序号（1, 2, 3, 4）。示例：
 问题：大的反义词是什么？
-选项：['长', '宽', '小', '热']
+选项：
+1. 长
+2. 宽
+3. 小
+4. 热
 回答：3
 如果不确定正确答案，选择最接近的选项序号返回，不提供额外解释或超出 1-4 的内容。
 ---
-请回答我的问题：{}
-'''
+请回答我的问题：
+{}'''
+
+# LLM流式输出：边接收边解析，出现有效选项序号后立即结束请求
+LLM_STREAM = True
+# 流式回复只有一个序号（例如 "3"）且停顿超过该时间（秒）时直接采用该序号，不再等待后续输出
+LLM_STREAM_PAUSE = 0.3
+
+# 每道题无法解析AI回答时的最大提问次数
+ANSWER_RETRY_LIMIT = 3
+
+# 答题策略：'single' 只使用当前选择的模型，'failover' 在当前模型不可用（熔断）时依次改用 BREAKER_CONFIG['fallbacks'] 中已配置的模型，'race' 同时询问所有已配置的模型并采用最先返回的有效答案，
+# 'ensemble' 并发询问多个模型并在延迟预算内投票；
+# 默认使用 'failover'，当前模型熔断时后续题目自动交给下一个已配置的模型，不会因单个模型不可用而中断答题
+ANSWER_STRATEGY = 'failover'
+
+# 投票策略配置
+ENSEMBLE_CONFIG = {
+    'choices': ('1', '2', '3'),  # 参与投票的模型，只填一个模型并设置 samples 即为同一模型多次采样
+    'samples': 1,                # 每个模型的请求次数
+    'budget': 8.0,               # 延迟预算（秒），到时只统计已返回的票
+    'grace': 4.0,                # 预算用完仍没有有效票时最多再等待的时间（秒）
+    'weights': {},               # 模型权重，例如 {'deepseek': 1.5}，未配置的为 1
+}
+
+# 对冲请求：模型请求超过该模型近期耗时的百分位后，向同一模型再发一次相同的请求，采用先返回的结果
+# 被对冲的请求会重复计费（按 95 百分位约为 5% 的请求），默认关闭
+HEDGE_CONFIG = {
+    'enabled': False,
+    'percentile': 95,      # 触发对冲的耗时百分位
+    'window': 100,         # 每个模型保留的最近耗时样本数
+    'min_samples': 20,     # 样本数不足时不对冲
+    'min_delay': 1.0,      # 对冲等待时间的下限（秒），避免在很快的模型上频繁对冲
+    'max_delay': 15.0,     # 对冲等待时间的上限（秒）
+}
+
+# 模型熔断：某个模型连续失败或超时时暂停使用，'failover' 策略改用下一个已配置的模型，'single' 策略直接报错
+BREAKER_CONFIG = {
+    'enabled': True,
+    'window': 10,               # 统计失败率的最近请求数
+    'min_calls': 4,             # 请求数达到该值后才计算失败率
+    'failure_rate': 0.5,        # 失败率达到该值时熔断
+    'slow_call_seconds': 20.0,  # 耗时达到该值的请求也视为失败
+    'open_seconds': 60.0,       # 熔断持续时间，之后放行探测请求
+    'half_open_probes': 1,      # 探测请求数，全部成功后恢复
+    'fallbacks': ('1', '2', '3'),  # 当前模型不可用时依次尝试的模型
+}
+
+# 网络请求的超时与重试，按调用方分组
+# 幂等的请求在连接失败、超时或返回 retry_statuses 时重试；非幂等的请求（提交答案、验证码）只在请求未发出，
+# 或返回表示服务端没有处理的 unprocessed_statuses 时重试；响应带 Retry-After 时至少等待该时间
+# 两次重试之间等待 [0, min(max_delay, base_delay * 2^n)] 内的随机时间；deadline 为单次调用含重试的总时长上限
+RETRY_POLICIES = {
+    'bili': {
+        'attempts': 3,
+        'base_delay': 0.5,
+        'max_delay': 4.0,
+        'connect_timeout': 5.0,
+        'read_timeout': 10.0,
+        'deadline': 30.0,
+        'retry_statuses': (429, 500, 502, 503, 504),
+        'unprocessed_statuses': (429, 503),
+    },
+    'llm': {
+        'attempts': 3,
+        'base_delay': 0.5,
+        'max_delay': 4.0,
+        'connect_timeout': 5.0,
+        'read_timeout': 30.0,  # 调用方传入的 timeout 优先
+        'deadline': 60.0,
+        'retry_statuses': (429, 500, 502, 503, 504),
+    },
+    'ticket': {
+        'attempts': 2,
+        'base_delay': 0.5,
+        'max_delay': 2.0,
+        'connect_timeout': 5.0,
+        'read_timeout': 5.0,
+        'deadline': 15.0,
+        'retry_statuses': (429, 500, 502, 503, 504),
+    },
+}
+
+# 连接预热：扫码登录和输入验证码时在后台建立到答题接口和模型接口的连接
+PREWARM_CONFIG = {
+    'enabled': True,
+    'timeout': 5.0,     # 预热请求的超时时间（秒）
+    'max_idle': 60.0,   # 预热的连接超过该时间未使用时可能已被服务端关闭，不再计入节省的耗时
+}
+
+# 本地答案缓存（SQLite，保存在配置目录下）
+ANSWER_CACHE = {
+    'enabled': True,
+    'ttl_days': 30,        # 缓存有效期
+    'max_entries': 5000,   # 超出后淘汰最久未使用的条目
+}
+
+# GUI日志区域显示的最低日志级别，例如 'DEBUG'、'INFO'、'SUCCESS'
+GUI_LOG_LEVEL = 'INFO'
+
+# 录制答题会话的请求和响应（脱敏后写入日志目录的 .trace.jsonl），用于离线回放排查问题
+TRACE_RECORD = False
 
 # GUI模式全局变量
 model_choice = '1'  # 默认DeepSeek
-
-# 初始化配置
-ensure_config_dir()
\ No newline at end of file
+quiz_engine = 'thread'  # 答题引擎：'thread' 使用 QuizThread，'async' 使用 qasync 事件循环中的 AsyncQuizSession
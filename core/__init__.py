@@ -1,14 +1,28 @@
 """
 Core module
 提供应用程序的核心功能和抽象层
+
+各管理器依赖 PySide6，首次访问时才导入，命令行模式导入 core 不会加载 Qt
 """
 
-from .app_controller import AppController
-from .model_manager import ModelManager
-from .auth_manager import AuthManager
+import importlib
+
+_EXPORTS = {
+    'AppController': '.app_controller',
+    'ModelManager': '.model_manager',
+    'AuthManager': '.auth_manager',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'AppController',
-    'ModelManager', 
-    'AuthManager'
-] 
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -7,7 +7,7 @@
 """
 
 from PySide6.QtCore import QObject, Signal
-from config.config import (load_api_key, save_api_key, load_model_config, 
+from config.config import (save_api_key, load_model_config,
                           save_model_config)
 
 
@@ -69,7 +69,7 @@ class ModelManager(QObject):
         """获取当前模型信息"""
         model_info = self.AVAILABLE_MODELS.get(self.current_model, {})
         config = load_model_config(self.current_model)
-        api_key = load_api_key(self.current_model)
+        api_key = config.get('api_key', '')
         
         return {
             'type': self.current_model,
@@ -121,7 +121,7 @@ class ModelManager(QObject):
             raise ValueError(f"不支持的模型类型: {model_type}")
         
         config = load_model_config(model_type)
-        api_key = load_api_key(model_type)
+        api_key = config.get('api_key', '')
         model_info = self.AVAILABLE_MODELS[model_type]
         
         return {
@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from .main_window import MainWindow
-from .dialogs import QRCodeDialog, CaptchaDialog
-from .widgets import LogWidget, SettingsWidget
-from .threads import QuizThread, LoginThread
+import importlib
 
-__all__ = [
-    'MainWindow',
-    'QRCodeDialog', 
-    'CaptchaDialog',
-    'LogWidget',
-    'SettingsWidget', 
-    'QuizThread',
-    'LoginThread'
-] 
\ No newline at end of file
+# 名称 -> 所在模块，首次访问时才导入，避免 import gui 时加载二维码库和答题流程
+_EXPORTS = {
+    'MainWindow': '.main_window',
+    'QRCodeDialog': '.dialogs',
+    'CaptchaDialog': '.dialogs',
+    'LogWidget': '.widgets',
+    'SettingsWidget': '.widgets',
+    'QuizThread': '.threads',
+    'LoginThread': '.threads',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
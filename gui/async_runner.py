@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步答题运行器
+在 qasync 事件循环中运行 AsyncQuizSession，接口与 QuizThread 保持一致
+"""
+
+import asyncio
+from PySide6.QtCore import QObject, Signal
+from gui.log_sink import LogPump
+from scripts.start_senior_async import AsyncQuizSession
+
+
+class AsyncQuizRunner(QObject):
+    """异步答题运行器"""
+
+    log_signal = Signal(str)
+    finished_signal = Signal()
+    captcha_signal = Signal(str, list)
+    progress_signal = Signal(str, object)
+
+    def __init__(self):
+        super().__init__()
+        self.quiz_session = AsyncQuizSession(input_handler=self._request_input)
+        self.quiz_session.progress_handler = self.progress_signal.emit
+        self._task = None
+        self._input_future = None
+        self.log_pump = LogPump(self)
+        self.records_signal = self.log_pump.records_signal
+
+    def start(self):
+        """在当前事件循环中启动答题任务"""
+        self.log_pump.start()
+        self._task = asyncio.ensure_future(self.quiz_session.start())
+        self._task.add_done_callback(self._on_done)
+
+    def isRunning(self):
+        """是否正在运行"""
+        return self._task is not None and not self._task.done()
+
+    def stop(self):
+        """停止答题，立即取消任务"""
+        self.quiz_session.stop()
+        if self._input_future is not None and not self._input_future.done():
+            self._input_future.cancel()
+
+    def set_captcha_result(self, captcha_text, category_ids=""):
+        """设置验证码结果"""
+        if self._input_future is not None and not self._input_future.done():
+            self._input_future.set_result(category_ids or captcha_text)
+
+    async def _request_input(self, kind, payload):
+        """请求GUI输入分类ID或验证码"""
+        self._input_future = asyncio.get_running_loop().create_future()
+        if kind == 'category':
+            self.captcha_signal.emit("", payload)
+        else:
+            self.captcha_signal.emit(payload, [])
+        try:
+            return await self._input_future
+        finally:
+            self._input_future = None
+
+    def _on_done(self, task):
+        self.log_pump.stop()
+        if not task.cancelled() and task.exception() is not None:
+            self.log_signal.emit(f"答题过程出错: {str(task.exception())}")
+        self.finished_signal.emit()
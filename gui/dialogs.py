@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import qrcode
 from io import BytesIO
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QLineEdit, QTextEdit, QFormLayout, 
@@ -52,6 +51,9 @@ class QRCodeDialog(QDialog):
         self.url = url
         
         try:
+            # 二维码库（及其依赖的 PIL）只在显示二维码时才导入
+            import qrcode
+            
             # 生成二维码图像
             qr = qrcode.QRCode(
                 version=1,
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GUI 日志转发
+答题会话的日志通过 loguru sink 写入队列，再由 GUI 线程的定时器批量取出显示，
+任意线程记录日志都不需要直接操作界面；
+loguru 的 sink 接收所有线程的日志，多个会话同时运行时共用一个 sink，每条日志只显示一次
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from PySide6.QtCore import QObject, QTimer, Signal
+from config.config import GUI_LOG_LEVEL
+from tools.logger import logger
+
+
+@dataclass
+class LogEntry:
+    """一条日志记录"""
+    time: datetime
+    level: str
+    message: str
+
+
+class QueueLogSink:
+    """将 loguru 日志写入 SimpleQueue 的 sink"""
+
+    def __init__(self, level=GUI_LOG_LEVEL):
+        self.level = level
+        self.queue = queue.SimpleQueue()
+        self._sink_id = None
+        self._users = 0
+        self._lock = threading.Lock()
+
+    def _write(self, message):
+        record = message.record
+        self.queue.put(LogEntry(record['time'], record['level'].name, record['message']))
+
+    def install(self):
+        """添加到 loguru，已添加时只增加引用计数"""
+        with self._lock:
+            self._users += 1
+            if self._sink_id is None:
+                self._sink_id = logger.add(self._write, level=self.level, format='{message}')
+
+    def remove(self):
+        """减少引用计数，最后一个使用者移除时从 loguru 移除"""
+        with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users == 0 and self._sink_id is not None:
+                logger.remove(self._sink_id)
+                self._sink_id = None
+
+    def drain(self):
+        """取出队列中的全部日志
+
+        Returns:
+            list: LogEntry 列表
+        """
+        entries = []
+        try:
+            while True:
+                entries.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return entries
+
+
+_shared_sink = None
+
+def shared_sink():
+    """返回进程内共用的 sink"""
+    global _shared_sink
+    if _shared_sink is None:
+        _shared_sink = QueueLogSink()
+    return _shared_sink
+
+
+class LogPump(QObject):
+    """在 GUI 线程中定时取出日志并通过 records_signal 批量发送"""
+
+    records_signal = Signal(list)
+
+    # 取日志的间隔（毫秒）
+    INTERVAL_MS = 50
+
+    def __init__(self, parent=None, sink=None):
+        """
+        Args:
+            parent (QObject): 父对象
+            sink (QueueLogSink): 日志来源，默认使用进程内共用的 sink
+        """
+        super().__init__(parent)
+        self.sink = sink or shared_sink()
+        self._running = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.INTERVAL_MS)
+        self._timer.timeout.connect(self.pump)
+
+    def start(self):
+        """安装 sink 并开始转发，需要在 GUI 线程中调用"""
+        if self._running:
+            return
+        self._running = True
+        self.sink.install()
+        self._timer.start()
+
+    def stop(self):
+        """移除 sink，转发剩余的日志后停止"""
+        if not self._running:
+            return
+        self._running = False
+        self.sink.remove()
+        self._timer.stop()
+        self.pump()
+
+    def pump(self):
+        entries = self.sink.drain()
+        if entries:
+            self.records_signal.emit(entries)
@@ -5,29 +5,36 @@ import sys
 import os
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QTabWidget, QMessageBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 
 # 导入样式
 from .style import STYLE_SHEET
 
-# 导入组件
-from .widgets import (LogWidget, StatusWidget,
-                     SettingsWidget, AboutWidget)
-from .dialogs import QRCodeDialog, CaptchaDialog
-from .threads import QuizThread, LoginThread, SwitchAccountThread
+# 导入组件，对话框、答题线程和设置页在首次使用时才导入或创建，以加快启动
+from .widgets import LogWidget, StatusWidget
 
-from scripts.login import is_login
+
+def is_login():
+    """检查登录状态，登录模块（及 requests）在第一次检查时才导入"""
+    from scripts.login import is_login
+    return is_login()
 
 
 class MainWindow(QMainWindow):
     """主窗口类"""
     
+    # 标签页索引
+    SETTINGS_TAB = 1
+    ABOUT_TAB = 2
+    
     def __init__(self):
         super().__init__()
         self.quiz_thread = None
+        self.selected_backend = None
         self.initUI()
         self.setup_connections()
-        self.load_initial_state()
+        # 窗口显示后再检查登录状态
+        QTimer.singleShot(0, self.load_initial_state)
     
     def initUI(self):
         """初始化UI"""
@@ -71,13 +78,50 @@ class MainWindow(QMainWindow):
         
         self.tab_widget.addTab(home_widget, "🏠 首页")
         
-        # 设置页
-        self.settings_widget = SettingsWidget()
-        self.tab_widget.addTab(self.settings_widget, "⚙️ 设置")
-        
-        # 关于页
-        self.about_widget = AboutWidget()
-        self.tab_widget.addTab(self.about_widget, "ℹ️ 关于")
+        # 设置页和关于页先放占位部件，切换到该页时再创建
+        self._settings_widget = None
+        self._about_widget = None
+        self.tab_widget.addTab(QWidget(), "⚙️ 设置")
+        self.tab_widget.addTab(QWidget(), "ℹ️ 关于")
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+    
+    def _replace_tab(self, index, widget):
+        """用真正的页面替换占位部件"""
+        placeholder = self.tab_widget.widget(index)
+        title = self.tab_widget.tabText(index)
+        current = self.tab_widget.currentIndex()
+        # 替换期间不触发 currentChanged，替换后保持原来选中的标签页
+        self.tab_widget.blockSignals(True)
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, widget, title)
+        self.tab_widget.setCurrentIndex(current)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+    
+    @property
+    def settings_widget(self):
+        """设置页，首次访问时创建"""
+        if self._settings_widget is None:
+            from .widgets import SettingsWidget
+            self._settings_widget = SettingsWidget()
+            self._replace_tab(self.SETTINGS_TAB, self._settings_widget)
+        return self._settings_widget
+    
+    @property
+    def about_widget(self):
+        """关于页，首次访问时创建"""
+        if self._about_widget is None:
+            from .widgets import AboutWidget
+            self._about_widget = AboutWidget()
+            self._replace_tab(self.ABOUT_TAB, self._about_widget)
+        return self._about_widget
+    
+    def _on_tab_changed(self, index):
+        """切换到尚未创建的标签页时创建它"""
+        if index == self.SETTINGS_TAB:
+            self.settings_widget
+        elif index == self.ABOUT_TAB:
+            self.about_widget
     
     def setup_connections(self):
         """设置信号连接"""
@@ -101,6 +145,9 @@ class MainWindow(QMainWindow):
         # 添加登录日志
         self.log_widget.append_log("正在准备B站登录...")
         
+        from .dialogs import QRCodeDialog
+        from .threads import LoginThread
+        
         # 创建并显示二维码对话框
         qr_dialog = QRCodeDialog(self)
         
@@ -158,6 +205,9 @@ class MainWindow(QMainWindow):
         # 禁用按钮防止重复点击
         self.status_widget.switch_account_clicked.disconnect()
         
+        from .dialogs import QRCodeDialog
+        from .threads import SwitchAccountThread
+        
         # 创建并显示二维码对话框
         qr_dialog = QRCodeDialog(self)
         
@@ -220,10 +270,21 @@ class MainWindow(QMainWindow):
         if self.quiz_thread is not None and self.quiz_thread.isRunning():
             self.stop_quiz()
         
-        self.quiz_thread = QuizThread()
+        if config.config.quiz_engine == 'async':
+            from .async_runner import AsyncQuizRunner
+            self.quiz_thread = AsyncQuizRunner()
+        else:
+            from .threads import QuizThread
+            self.quiz_thread = QuizThread()
         self.quiz_thread.log_signal.connect(self.log_widget.append_log)
+        self.quiz_thread.records_signal.connect(self.log_widget.append_records)
         self.quiz_thread.finished_signal.connect(self.on_quiz_finished)
         self.quiz_thread.captcha_signal.connect(self.show_captcha_dialog)
+        self.quiz_thread.progress_signal.connect(self.on_quiz_progress)
+        # 竞速和投票策略本来就会使用多个模型，只有自动切换策略需要注明实际作答的模型
+        single = config.config.ANSWER_STRATEGY in ('single', 'failover')
+        self.selected_backend = model_info['type'] if single else None
+        self.status_widget.set_answer_backend(model_info['type'])
         
         # 设置线程中QuizSession的模型选择
         self.quiz_thread.quiz_session.update_model_choice(model_info['choice_value'])
@@ -241,6 +302,11 @@ class MainWindow(QMainWindow):
             self.quiz_thread.stop()
             self.log_widget.append_log("正在停止答题...")
     
+    def on_quiz_progress(self, event, data):
+        """答题进度回调，显示实际作答的模型"""
+        if event == 'answer':
+            self.status_widget.set_answer_backend(data['backend'], self.selected_backend)
+    
     def on_quiz_finished(self):
         """答题完成回调"""
         # 恢复开始按钮
@@ -249,6 +315,7 @@ class MainWindow(QMainWindow):
     
     def show_captcha_dialog(self, url, categories):
         """在主线程中显示验证码对话框"""
+        from .dialogs import CaptchaDialog
         dialog = CaptchaDialog(url, categories, self)
         if dialog.exec():
             if categories:
@@ -272,6 +339,17 @@ def main():
     window = MainWindow()
     window.show()
     
+    import config.config
+    if config.config.quiz_engine == 'async':
+        # 使用 qasync 将 asyncio 事件循环与 Qt 事件循环合并
+        import asyncio
+        import qasync
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        with loop:
+            loop.run_forever()
+        sys.exit(0)
+    
     sys.exit(app.exec())
 
 
@@ -176,7 +176,7 @@ QTabBar::tab:!selected:hover {
 }
 
 /* 日志文本区域特殊样式 */
-QTextEdit#log_text {
+QPlainTextEdit#log_text {
     font-family: "Cascadia Code", "Consolas", "Courier New", monospace;
     font-size: 9pt;
     background-color: #2c3e50;
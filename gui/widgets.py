@@ -2,20 +2,41 @@
 # -*- coding: utf-8 -*-
 
 import webbrowser
+from datetime import datetime
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QComboBox, QLineEdit, QTextEdit, 
-                             QFrame, QStackedWidget, QMessageBox, QGroupBox, QFormLayout)
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QTextCursor
+                             QPushButton, QComboBox, QLineEdit, QTextEdit, QPlainTextEdit,
+                             QFrame, QStackedWidget, QMessageBox, QGroupBox, QFormLayout, QCheckBox)
+from PySide6.QtCore import Qt, Signal, QTimer
 from config.config import (load_api_key, save_api_key, load_model_config, 
-                          save_model_config)
+                          save_model_config, MODEL_DISPLAY_INFO)
 
 
 class LogWidget(QWidget):
-    """日志显示组件"""
+    """日志显示组件
+    
+    新日志先放入缓冲区，由定时器合并后一次性追加；超过 MAX_LINES 行时自动丢弃最早的日志
+    """
+    
+    # 最多保留的日志行数
+    MAX_LINES = 5000
+    # 合并刷新的间隔（毫秒）
+    FLUSH_INTERVAL_MS = 50
+    
+    # 状态关键字，按优先级排列
+    STATUS_KEYWORDS = (
+        (("开始",), "🔵 运行中"),
+        (("成功", "完成"), "🟢 完成"),
+        (("失败", "错误"), "🔴 错误"),
+        (("停止",), "🟡 已停止"),
+    )
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
         self.initUI()
     
     def initUI(self):
@@ -49,9 +70,11 @@ class LogWidget(QWidget):
         log_layout.addLayout(log_toolbar)
         
         # 日志文本区域
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setObjectName("log_text")  # 设置对象名以应用特定样式
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(self.MAX_LINES)
+        self.log_text.setUndoRedoEnabled(False)
         self.log_text.setMinimumHeight(200)
         self.log_text.setPlaceholderText("日志信息将在这里显示...")
         log_layout.addWidget(self.log_text)
@@ -59,28 +82,55 @@ class LogWidget(QWidget):
         main_layout.addWidget(log_group)
     
     def append_log(self, text):
-        """添加日志"""
-        # 根据日志内容更新状态指示器
-        if "开始" in text:
-            self.status_indicator.setText("🔵 运行中")
-        elif "成功" in text or "完成" in text:
-            self.status_indicator.setText("🟢 完成")
-        elif "失败" in text or "错误" in text:
-            self.status_indicator.setText("🔴 错误")
-        elif "停止" in text:
-            self.status_indicator.setText("🟡 已停止")
-        
+        """添加日志，实际显示在下一次刷新时完成"""
         # 添加时间戳
-        from datetime import datetime
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_text = f"[{timestamp}] {text}"
-        
-        self.log_text.append(formatted_text)
-        # 自动滚动到底部
-        self.log_text.moveCursor(QTextCursor.MoveOperation.End)
+        self._pending.append(f"[{timestamp}] {text}")
+        self._schedule_flush()
+    
+    def append_records(self, entries):
+        """批量添加带级别和时间的日志记录
+        
+        Args:
+            entries (list): gui.log_sink.LogEntry 列表
+        """
+        self._pending.extend(f"[{entry.time:%H:%M:%S}] {entry.level}: {entry.message}" for entry in entries)
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def flush(self):
+        """将缓冲区中的日志一次性追加到文本区域"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        # 超出保留行数的部分追加后也会被丢弃，直接跳过
+        lines = self._pending[-self.MAX_LINES:]
+        self._pending = []
+        
+        self._update_status(lines)
+        
+        scrollbar = self.log_text.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.log_text.appendPlainText("\n".join(lines))
+        # 用户未向上翻看时自动滚动到底部
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+    
+    def _update_status(self, lines):
+        """根据本批次中最后一条带关键字的日志更新状态指示器"""
+        for line in reversed(lines):
+            for keywords, status in self.STATUS_KEYWORDS:
+                if any(keyword in line for keyword in keywords):
+                    self.status_indicator.setText(status)
+                    return
     
     def clear_log(self):
         """清空日志"""
+        self._pending = []
+        self._flush_timer.stop()
         self.log_text.clear()
         self.status_indicator.setText("🟢 就绪")
     
@@ -127,8 +177,13 @@ class StatusWidget(QWidget):
         self.status_hint_label = QLabel("💡 请先登录B站账号以开始答题")
         self.status_hint_label.setObjectName("statusHint")
         
+        # 作答模型，当前模型熔断后会显示实际作答的模型
+        self.backend_label = QLabel("作答模型：-")
+        self.backend_label.setObjectName("statusHint")
+        
         status_info_layout.addWidget(self.login_status_label)
         status_info_layout.addWidget(self.status_hint_label)
+        status_info_layout.addWidget(self.backend_label)
         
         # 登录按钮容器
         login_button_layout = QVBoxLayout()
@@ -212,6 +267,22 @@ class StatusWidget(QWidget):
     def set_start_button_enabled(self, enabled):
         """设置开始按钮启用状态"""
         self.start_button.setEnabled(enabled)
+    
+    def set_answer_backend(self, backend, selected=None):
+        """显示作答的模型
+        
+        Args:
+            backend (str): 模型类型，多个模型以 + 连接，'cache' 表示本地缓存
+            selected (str): 当前选择的模型类型，与作答模型不同时注明已切换
+        """
+        if backend == 'cache':
+            text = "本地缓存"
+        else:
+            text = " + ".join(MODEL_DISPLAY_INFO.get(name, {}).get('name', name) for name in backend.split('+'))
+        if selected and backend not in (selected, 'cache'):
+            selected_name = MODEL_DISPLAY_INFO.get(selected, {}).get('name', selected)
+            text += f"（{selected_name} 不可用，已自动切换）"
+        self.backend_label.setText(f"作答模型：{text}")
 
 
 
@@ -272,6 +343,17 @@ class ModelConfigWidget(QWidget):
         model_name_label.setTextFormat(Qt.TextFormat.RichText)
         self.model_input = QLineEdit()
         form_layout.addRow(model_name_label, self.model_input)
+
+        # HTTP/2 连接
+        from tools.LLM.transport import http2_available
+        self.http2_check = QCheckBox("使用 HTTP/2 连接")
+        if http2_available():
+            self.http2_check.setToolTip("同一模型的并发请求（竞速、对冲）共用一个连接。\n"
+                                        "服务商不支持时自动使用 HTTP/1.1；http:// 地址需要服务端支持 HTTP/2 明文连接")
+        else:
+            self.http2_check.setEnabled(False)
+            self.http2_check.setToolTip("需要安装 h2：pip install h2")
+        form_layout.addRow("", self.http2_check)
         
         # 根据模型类型设置不同的占位符文本
         self._set_placeholders()
@@ -315,6 +397,7 @@ class ModelConfigWidget(QWidget):
         self.url_input.setText(config['base_url'])
         self.model_input.setText(config['model'])
         self.key_input.setText(api_key)
+        self.http2_check.setChecked(config.get('http2', False))
     
     def save_settings(self):
         """保存设置"""
@@ -364,7 +447,7 @@ class ModelConfigWidget(QWidget):
             save_api_key(self.model_type, api_key)
             
             # 保存模型配置
-            save_model_config(self.model_type, base_url, model_name)
+            save_model_config(self.model_type, base_url, model_name, http2=self.http2_check.isChecked())
             
             QMessageBox.information(self, "保存成功", "模型配置已保存！")
             
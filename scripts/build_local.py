@@ -66,7 +66,9 @@ def check_dependencies():
         'requests',
         'qrcode',
         'loguru',
-        'pillow'
+        'pillow',
+        'httpx',
+        'qasync'
     ]
     
     missing_packages = []
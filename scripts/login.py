@@ -7,13 +7,21 @@ import time
 from time import sleep
 from tools.bili_ticket import getTicket
 from client.login import qrcode_get, qrcode_poll
-from qrcode.main import QRCode
-from qrcode.constants import ERROR_CORRECT_L
 from client import senior
 import tools.request_b
-from config.config import AUTH_FILE
+from config.config import AUTH_FILE, load_model_config
+from tools.prewarm import prewarm
 from tools.logger import logger
 
+def prewarm_connections():
+    """扫码期间在后台预热答题接口和当前所选模型接口的连接"""
+    import config.config
+    from tools.LLM.registry import BACKENDS, DEFAULT_CHOICE
+
+    model_type = BACKENDS.get(config.config.model_choice, BACKENDS[DEFAULT_CHOICE])[0]
+    model_config = load_model_config(model_type)
+    prewarm(bili_url=senior.base_url, llm_urls=[(model_config.get('base_url'), model_config.get('http2', False))])
+
 def load_auth_data():
     """从缓存加载认证信息
     
@@ -136,6 +144,9 @@ def auth(gui_mode=False, gui_callback=None):
             logger.info('请使用哔哩哔哩APP扫描二维码登录')
         else:
             # 终端模式
+            from qrcode.main import QRCode
+            from qrcode.constants import ERROR_CORRECT_L
+            
             # 创建QRCode实例
             qr = QRCode(
                 version=1,
@@ -153,6 +164,8 @@ def auth(gui_mode=False, gui_callback=None):
             logger.info('请使用哔哩哔哩APP扫描二维码登录')
             logger.info(f"如果二维码不能正常显示，请使用 https://cli.im/ 手动生成此链接的二维码进行扫码：{url}")
         
+        prewarm_connections()
+
         # 轮询二维码状态
         auth_code = qrcode_data.get('auth_code')
         retry_count = 0
@@ -1,87 +1,278 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from client.senior import captcha_get, captcha_submit, category_get, question_get, question_submit
+from dataclasses import asdict
+from client.senior import AnswerRejected, CaptchaRejected, QuizUnavailable, VerificationRequired, default_client
 from tools.logger import logger
-from tools.LLM.gemini import GeminiAPI
-from tools.LLM.deepseek import DeepSeekAPI
-from tools.LLM.custom import CustomAPI
-from config.config import model_choice
-from time import sleep
+from tools.LLM.registry import LLMRegistry
+from tools.LLM.strategy import SingleStrategy, backend_name, create_strategy
+from tools.LLM.prompt import PromptBuilder
+from tools.LLM.hedge import hedge_stats
+from tools.resilience import resilience_stats
+from tools.prewarm import prewarm, prewarmer
+from tools.answer_cache import AnswerCache
+from tools.metrics import SessionMetrics
+from tools.trace import TraceRecorder
+from tools.cancel import CancelToken, CancelledError, activate
+from config.config import model_choice, ANSWER_RETRY_LIMIT, ANSWER_STRATEGY, ANSWER_CACHE, TRACE_RECORD
+
+
+def console_input(kind, payload):
+    """终端模式下的输入处理
+
+    Args:
+        kind (str): 'category' 或 'captcha'
+        payload: 分类列表或验证码链接
+
+    Returns:
+        str: 用户输入
+    """
+    prompt = '请输入分类ID: ' if kind == 'category' else '请输入验证码: '
+    return input(prompt)
+
+
+# 进程内共用、在会话结束时计入统计的计数：对冲次数、重试和超时次数
+COUNTER_SOURCES = (hedge_stats, resilience_stats)
+
 
 class QuizSession:
-    def __init__(self):
+    # 每次提交答案后的等待时间（秒）
+    submit_interval = 1
+    # 会话结束时是否将统计写入日志目录
+    save_metrics = True
+
+    def __init__(self, strategy=None, input_handler=None, progress_handler=None):
+        """
+        Args:
+            strategy: 答题策略，为None时按配置创建
+            input_handler: 输入回调 (kind, payload) -> str，用于分类和验证码输入，默认从终端读取
+            progress_handler: 进度回调 (event, data)，event 为 'question'、'answer'、'submitted'、
+                'verification' 或 'finished'，data 为 dict
+        """
+        self.input_handler = input_handler or console_input
+        self.progress_handler = progress_handler
         self.question_id = None
         self.answers = None
         self.question_num = 0
         self.question = None
-        self.stopped = False
+        # 停止答题时取消，正在进行的请求和等待立即返回
+        self.cancel_token = CancelToken()
+        self._stopped = False
         # 从配置中获取当前选择的模型
         self.current_model = model_choice
+        # 模型客户端在会话内复用，切换模型或保存配置后才重建
+        self.llm_registry = LLMRegistry()
+        # 答题策略，为None时按配置创建
+        self.strategy = strategy
+        # 题目提示词构建，统计输入token
+        self.prompt_builder = PromptBuilder()
+        # 阶段耗时统计，每次 start() 时重建
+        self.metrics = SessionMetrics()
+        # 会话开始时的对冲和重试次数，结束时计入本次会话新增的次数
+        self._counter_baselines = self.counter_totals()
+        # 本次会话是否已预热模型接口的连接
+        self._prewarmed = False
+        # 本地答案缓存
+        if ANSWER_CACHE['enabled']:
+            self.answer_cache = AnswerCache(ttl=ANSWER_CACHE['ttl_days'] * 24 * 3600,
+                                            max_entries=ANSWER_CACHE['max_entries'])
+        else:
+            self.answer_cache = None
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    @stopped.setter
+    def stopped(self, value):
+        self._stopped = value
+        if value:
+            self.cancel_token.cancel()
+        elif self.cancel_token.cancelled:
+            self.cancel_token = CancelToken()
+
+    def stop(self):
+        """停止答题，可在其他线程调用"""
+        self.stopped = True
 
     def start(self):
         """开始答题会话"""
+        self.metrics = SessionMetrics()
+        self._counter_baselines = self.counter_totals()
+        self._prewarmed = False
+        recorder = TraceRecorder().install(self) if TRACE_RECORD else None
         try:
-            while self.question_num < 100 and not self.stopped:
-                if not self.get_question():
-                    logger.error("获取题目失败")
-                    return
-                
-                # 检查是否停止
-                if self.stopped:
-                    logger.info("答题已停止")
-                    return
-                
-                # 显示题目信息
-                self.display_question()
-                # 根据用户选择初始化对应的LLM模型
-                # 使用类中缓存的当前模型选择，这样可以随时更新
-                if self.current_model == '1':
-                    llm = DeepSeekAPI()
-                elif self.current_model == '2':
-                    llm = GeminiAPI()
-                elif self.current_model == '3':
-                    llm = CustomAPI()
-                else:
-                    llm = DeepSeekAPI()
-                
-                # 检查是否停止
-                if self.stopped:
-                    logger.info("答题已停止")
-                    return
-                    
-                answer = llm.ask(self.get_question_prompt())
-                logger.info('AI给出的答案:{}'.format(answer))
-                
-                # 检查是否停止
-                if self.stopped:
-                    logger.info("答题已停止")
-                    return
-                
-                try:
-                    answer = int(answer)
-                    if not (1 <= answer <= len(self.answers)):
-                        logger.warning(f"无效的答案序号: {answer}")
-                        continue
-                except ValueError:
-                    logger.warning("AI回复其他内容,正在重试")
-                    continue
-
-                result = self.answers[answer-1]
-                
-                # 检查是否停止
-                if self.stopped:
-                    logger.info("答题已停止")
-                    return
-                
-                if not self.submit_answer(result):
-                    logger.error("提交答案失败")
-                    return
+            with activate(self.cancel_token):
+                self.run_questions()
+        except CancelledError:
+            logger.info("答题已停止")
         except KeyboardInterrupt:
             logger.info("答题会话已终止")
         except Exception as e:
+            self.metrics.count('errors')
             logger.error(f"答题过程发生错误: {str(e)}")
+        finally:
+            if recorder is not None:
+                recorder.uninstall()
+            summary = self.report_metrics()
+            self.emit_progress('finished', {
+                'question_num': self.question_num,
+                'answered': summary['answered'],
+                'duration': summary['duration'],
+                'counters': summary['counters'],
+                'stopped': self.stopped,
+            })
+
+    def run_questions(self):
+        """答题循环，停止时在请求或等待中抛出 CancelledError"""
+        while self.question_num < 100 and not self.stopped:
+            if not self.get_question():
+                logger.error("获取题目失败")
+                return
+            
+            # 检查是否停止
+            if self.stopped:
+                logger.info("答题已停止")
+                return
+            
+            # 显示题目信息
+            self.display_question()
+            
+            result = self.resolve_answer()
+            
+            # 检查是否停止
+            if self.stopped:
+                logger.info("答题已停止")
+                return
+            
+            if result is None:
+                logger.error(f"连续{ANSWER_RETRY_LIMIT}次无法解析AI的回答，请在B站APP手动完成该题后重新开始")
+                return
+
+            if not self.submit_answer(result):
+                logger.error("提交答案失败")
+                return
+
+    def emit_progress(self, event, data):
+        """调用进度回调，回调出错不影响答题"""
+        if self.progress_handler is None:
+            return
+        try:
+            self.progress_handler(event, data)
+        except Exception as e:
+            logger.warning(f"进度回调出错: {str(e)}")
     
+    @staticmethod
+    def counter_totals():
+        """进程内共用计数的快照"""
+        return [stats.totals() for stats in COUNTER_SOURCES]
+
+    def report_metrics(self):
+        """结束统计，将会话汇总写入日志和 JSON 文件
+        
+        Returns:
+            dict: 会话汇总
+        """
+        for stats, baseline in zip(COUNTER_SOURCES, self._counter_baselines):
+            for name, n in stats.since(baseline).items():
+                self.metrics.count(name, n)
+        self._counter_baselines = self.counter_totals()
+        saved = prewarmer.take_saved()
+        if saved > 0:
+            self.metrics.count('prewarm_saved_ms', round(saved * 1000))
+        self.metrics.finish()
+        summary = self.metrics.summary()
+        self.metrics.log_summary(summary)
+        if self.save_metrics:
+            self.metrics.write(summary)
+        return summary
+
+    def prewarm_connections(self):
+        """等待用户输入验证码时在后台预热答题要用到的模型接口连接，每次会话一次"""
+        if self._prewarmed:
+            return
+        self._prewarmed = True
+        strategy = self.get_strategy()
+        choices = getattr(strategy, 'choices', None) or (getattr(strategy, 'choice', self.current_model),)
+        urls = []
+        for choice in choices:
+            try:
+                backend = self.llm_registry.get(choice)
+                urls.append((backend.base_url, getattr(backend, 'http2', False)))
+            except Exception as e:
+                logger.debug(f"跳过预热 {backend_name(choice)}: {str(e)}")
+        prewarm(llm_urls=urls)
+
+    def get_strategy(self):
+        """获取答题策略，未指定时按配置创建"""
+        if self.strategy is None:
+            self.strategy = create_strategy(ANSWER_STRATEGY, self.llm_registry, self.current_model)
+        return self.strategy
+
+    def resolve_answer(self):
+        """向模型提问并解析答案，解析失败或请求出错时在重试次数内重新提问
+        
+        Returns:
+            Answer: 选中的答案，无法解析或已停止时返回None
+        
+        Raises:
+            Exception: 最后一次提问仍然出错时抛出该错误
+        """
+        cached = self.lookup_cached_answer()
+        if cached is not None:
+            return cached
+        
+        strategy = self.get_strategy()
+        last_error = None
+        for attempt in range(1, ANSWER_RETRY_LIMIT + 1):
+            if self.stopped:
+                return None
+            if attempt > 1:
+                self.metrics.count('llm_retries')
+            prompt = self.get_question_prompt()
+            try:
+                with self.metrics.stage('llm'):
+                    result = strategy.answer(prompt, self.answers)
+            except Exception as e:
+                last_error = e
+                self.metrics.count('llm_errors')
+                logger.warning(f"AI请求失败: {str(e)}，正在重试 ({attempt}/{ANSWER_RETRY_LIMIT})")
+                continue
+            last_error = None
+            # 单模型策略只在改用其他模型作答时注明来源
+            if isinstance(strategy, SingleStrategy) and result.backend == backend_name(strategy.choice):
+                logger.info('AI给出的答案:{}'.format(result.reply))
+            else:
+                logger.info('AI给出的答案:{} (来自 {})'.format(result.reply, result.backend))
+            if result.index is not None:
+                answer = self.answers[result.index-1]
+                self.remember_answer(answer, result.backend)
+                self.emit_progress('answer', {'question_num': self.question_num, 'index': result.index,
+                                              'answer': answer.ans_text, 'backend': result.backend})
+                return answer
+            self.metrics.count('parse_failures')
+            logger.warning(f"AI回复其他内容,正在重试 ({attempt}/{ANSWER_RETRY_LIMIT})")
+        if last_error is not None:
+            raise last_error
+        return None
+
+    def lookup_cached_answer(self):
+        """在本地缓存中查找当前题目的答案"""
+        if self.answer_cache is None:
+            return None
+        answer = self.answer_cache.get(self.question, self.answers)
+        if answer is not None:
+            self.metrics.count('cache_hits')
+            self.emit_progress('answer', {'question_num': self.question_num,
+                                          'index': self.answers.index(answer) + 1,
+                                          'answer': answer.ans_text, 'backend': 'cache'})
+        return answer
+
+    def remember_answer(self, answer, model):
+        """将模型给出的答案写入本地缓存"""
+        if self.answer_cache is not None:
+            self.answer_cache.put(self.question, self.answers, answer.ans_text, model)
+
     # 允许外部更新当前使用的模型
     def update_model_choice(self, new_model_choice):
         """更新当前使用的模型
@@ -90,6 +281,9 @@ class QuizSession:
             new_model_choice (str): 新的模型选择 ('1', '2' 或 '3')
         """
         self.current_model = new_model_choice
+        self.llm_registry.invalidate()
+        if isinstance(self.strategy, SingleStrategy):
+            self.strategy.choice = new_model_choice
         logger.info(f"已更新模型选择为: {self.current_model}")
 
     def get_question(self):
@@ -99,25 +293,26 @@ class QuizSession:
             bool: 是否成功获取题目
         """
         try:
-            question = question_get()
-            if not question:
-                return False
-
-            if question.get('code') != 0:
-                logger.info("需要验证码验证")
+            with self.metrics.stage('question_get'):
+                question = default_client().question()
+        except VerificationRequired as e:
+            logger.info("需要验证码验证")
+            self.emit_progress('verification', {'code': e.code})
+            with self.metrics.stage('verification'):
                 return self.handle_verification()
-
-            data = question.get('data', {})
-            self.question = data.get('question')
-            self.answers = data.get('answers', [])
-            self.question_id = data.get('id')
-            self.question_num = data.get('question_num', 0)
-            return True
-
         except Exception as e:
             logger.error(f"获取题目失败: {str(e)}")
             return False
 
+        self.question = question.question
+        self.answers = question.answers
+        self.question_id = question.id
+        self.question_num = question.question_num
+        self.metrics.begin_question(self.question_num, self.question)
+        self.emit_progress('question', {'question_num': self.question_num, 'question': self.question,
+                                        'answers': [a.ans_text for a in self.answers]})
+        return True
+
     def handle_verification(self):
         """处理验证码验证
         
@@ -130,10 +325,9 @@ class QuizSession:
                 logger.info("答题已停止")
                 return False
                 
+            client = default_client()
             logger.info("获取分类信息...")
-            category = category_get()
-            if not category:
-                return False
+            categories = client.categories()
             
             # 检查是否停止
             if self.stopped:
@@ -141,10 +335,11 @@ class QuizSession:
                 return False
                 
             logger.info("分类信息:")
-            for cat in category.get('categories', []):
-                logger.info(f"ID: {cat.get('id')} - {cat.get('name')}")
+            for cat in categories:
+                logger.info(f"ID: {cat.id} - {cat.name}")
             logger.info("tips: 输入多个分类ID请用 *英文逗号* 隔开,例如:1,2,3")
-            ids = input('请输入分类ID: ')
+            self.prewarm_connections()
+            ids = self.input_handler('category', [asdict(cat) for cat in categories])
             
             # 检查是否停止
             if self.stopped:
@@ -152,25 +347,26 @@ class QuizSession:
                 return False
                 
             logger.info("获取验证码...")
-            captcha_res = captcha_get()
-            logger.info("请打开链接查看验证码内容:{}".format(captcha_res.get('url')))
-            if not captcha_res:
-                return False
+            challenge = client.captcha()
+            logger.info("请打开链接查看验证码内容:{}".format(challenge.url))
                 
             # 检查是否停止
             if self.stopped:
                 logger.info("答题已停止")
                 return False
                 
-            captcha = input('请输入验证码: ')
+            captcha = self.input_handler('captcha', challenge.url)
 
-            if captcha_submit(code=captcha, captcha_token=captcha_res.get('token'), ids=ids):
-                logger.info("验证通过✅")
-                return self.get_question()
-            else:
-                logger.error("验证失败")
-                return False
+            client.submit_captcha(code=captcha, captcha_token=challenge.token, ids=ids)
+            logger.info("验证通过✅")
+            return self.get_question()
 
+        except QuizUnavailable as e:
+            logger.error(str(e))
+            return False
+        except CaptchaRejected as e:
+            logger.error(f"验证失败: {str(e)}")
+            return False
         except Exception as e:
             logger.error(f"验证过程发生错误: {str(e)}")
             return False
@@ -183,36 +379,43 @@ class QuizSession:
 
         logger.info(f"第{self.question_num}题:{self.question}")
         for i, answer in enumerate(self.answers, 1):
-            logger.info(f"{i}. {answer.get('ans_text')}")
+            logger.info(f"{i}. {answer.ans_text}")
     
     def get_question_prompt(self):
-        return '''
-        题目:{}
-        答案:{}
-        '''.format(self.question, self.answers)
+        """构建当前题目的提示词，只包含题目和带序号的选项文本"""
+        prompt = self.prompt_builder.build(self.question, self.answers)
+        last = self.prompt_builder.last
+        # 按构建的提示词计，与旧格式相比每次提问节省的输入 token
+        self.metrics.count('prompt_tokens_saved', last['legacy_tokens'] - last['tokens'])
+        logger.debug(f"提示词约 {last['tokens']} tokens (旧格式约 {last['legacy_tokens']} tokens)，"
+                     f"累计节省 {self.prompt_builder.saved_ratio():.0%}")
+        return prompt
 
     def submit_answer(self, answer):
         """提交答案
         
         Args:
-            answer (dict): 答案信息
+            answer (Answer): 选中的选项
         
         Returns:
             bool: 是否成功提交答案
         """
         try:
-            result = question_submit(
-                self.question_id,
-                answer.get('ans_hash'),
-                answer.get('ans_text')
-            )
-            if result and result.get('code') == 0:
-                logger.info("答案提交成功")
-                sleep(1)
-                return True
-            else:
-                logger.error(f"答案提交失败: {result}")
-                return False
+            with self.metrics.stage('question_submit'):
+                default_client().submit_answer(
+                    self.question_id,
+                    answer.ans_hash,
+                    answer.ans_text
+                )
+            logger.info("答案提交成功")
+            self.emit_progress('submitted', {'question_num': self.question_num})
+            with self.metrics.stage('submit_wait'):
+                self.cancel_token.sleep(self.submit_interval)
+            self.metrics.end_question()
+            return True
+        except AnswerRejected as e:
+            logger.error(str(e))
+            return False
         except Exception as e:
             logger.error(f"提交答案时发生错误: {str(e)}")
             return False
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于 asyncio 的答题会话
+与线程版 QuizSession 流程和进度事件一致，B站接口的请求是异步的；
+向模型提问与 QuizSession 共用答题策略、熔断、对冲和重试，在线程池中执行，
+停止时取消任务和取消令牌，不需要等待阻塞的请求返回
+"""
+
+import asyncio
+from dataclasses import asdict
+from client import senior_async
+from client.senior import SeniorAPIError, VerificationRequired
+from config.config import ANSWER_RETRY_LIMIT
+from scripts.start_senior import QuizSession
+from tools.cancel import CancelledError, activate
+from tools.metrics import SessionMetrics
+from tools.request_async import create_client
+from tools.logger import logger
+
+# 每个步骤的超时时间（秒），向模型提问的超时和重试由答题策略和 'llm' 重试策略处理
+STEP_TIMEOUTS = {
+    'question_get': 15,
+    'question_submit': 15,
+    'verification': 300,
+}
+
+
+async def console_input(kind, payload):
+    """终端模式下的输入处理，在线程池中等待用户输入
+
+    Args:
+        kind (str): 'category' 或 'captcha'
+        payload: 分类列表或验证码链接
+
+    Returns:
+        str: 用户输入
+    """
+    prompt = '请输入分类ID: ' if kind == 'category' else '请输入验证码: '
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+class AsyncQuizSession(QuizSession):
+    """异步答题会话"""
+
+    def __init__(self, input_handler=None, step_timeouts=None):
+        """
+        Args:
+            input_handler: 异步输入回调 (kind, payload) -> str，用于分类和验证码输入
+            step_timeouts (dict): 覆盖默认的步骤超时时间
+        """
+        super().__init__()
+        self.input_handler = input_handler or console_input
+        self.step_timeouts = dict(STEP_TIMEOUTS, **(step_timeouts or {}))
+        self.client = None
+        self._task = None
+
+    async def _step(self, name, coro):
+        """带超时执行单个步骤，并统计耗时"""
+        with self.metrics.stage(name):
+            return await asyncio.wait_for(coro, self.step_timeouts[name])
+
+    async def start(self):
+        """开始答题会话"""
+        self._task = asyncio.current_task()
+        self.metrics = SessionMetrics()
+        self._counter_baselines = self.counter_totals()
+        self._prewarmed = False
+        try:
+            async with create_client() as client:
+                self.client = client
+                await self._run()
+        except asyncio.CancelledError:
+            logger.info("答题已停止")
+            raise
+        except CancelledError:
+            logger.info("答题已停止")
+        except asyncio.TimeoutError:
+            self.metrics.count('timeouts')
+            logger.error("答题过程发生错误: 请求超时")
+        except Exception as e:
+            self.metrics.count('errors')
+            logger.error(f"答题过程发生错误: {str(e)}")
+        finally:
+            self.client = None
+            self._task = None
+            summary = self.report_metrics()
+            self.emit_progress('finished', {
+                'question_num': self.question_num,
+                'answered': summary['answered'],
+                'duration': summary['duration'],
+                'counters': summary['counters'],
+                'stopped': self.stopped,
+            })
+
+    async def _run(self):
+        while self.question_num < 100 and not self.stopped:
+            if not await self.get_question():
+                logger.error("获取题目失败")
+                return
+
+            # 显示题目信息
+            self.display_question()
+            result = await self.resolve_answer()
+            if self.stopped:
+                logger.info("答题已停止")
+                return
+            if result is None:
+                logger.error(f"连续{ANSWER_RETRY_LIMIT}次无法解析AI的回答，请在B站APP手动完成该题后重新开始")
+                return
+
+            if not await self.submit_answer(result):
+                logger.error("提交答案失败")
+                return
+
+    async def resolve_answer(self):
+        """在线程池中执行 QuizSession.resolve_answer，停止时取消令牌使其立即返回"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._resolve_answer_sync)
+
+    def _resolve_answer_sync(self):
+        with activate(self.cancel_token):
+            return super().resolve_answer()
+
+    def stop(self):
+        """停止答题，立即取消正在进行的请求"""
+        self.stopped = True
+        if self._task is not None:
+            self._task.cancel()
+
+    async def get_question(self):
+        """获取题目
+
+        Returns:
+            bool: 是否成功获取题目
+        """
+        try:
+            question = await self._step('question_get', senior_async.question_get(self.client))
+        except asyncio.TimeoutError:
+            self.metrics.count('timeouts')
+            logger.error("获取题目超时")
+            return False
+        except VerificationRequired as e:
+            logger.info("需要验证码验证")
+            self.emit_progress('verification', {'code': e.code})
+            with self.metrics.stage('verification'):
+                return await self.handle_verification()
+        except SeniorAPIError as e:
+            logger.error(f"获取题目失败: {str(e)}")
+            return False
+
+        self.question = question.question
+        self.answers = question.answers
+        self.question_id = question.id
+        self.question_num = question.question_num
+        self.metrics.begin_question(self.question_num, self.question)
+        self.emit_progress('question', {'question_num': self.question_num, 'question': self.question,
+                                        'answers': [a.ans_text for a in self.answers]})
+        return True
+
+    async def handle_verification(self):
+        """处理验证码验证
+
+        Returns:
+            bool: 验证是否成功
+        """
+        try:
+            logger.info("获取分类信息...")
+            categories = await self._step('question_get', senior_async.category_get(self.client))
+            for cat in categories:
+                logger.info(f"ID: {cat.id} - {cat.name}")
+            self.prewarm_connections()
+            ids = await self._step('verification', self.input_handler('category', [asdict(cat) for cat in categories]))
+
+            logger.info("获取验证码...")
+            challenge = await self._step('question_get', senior_async.captcha_get(self.client))
+            logger.info("请打开链接查看验证码内容:{}".format(challenge.url))
+            captcha = await self._step('verification', self.input_handler('captcha', challenge.url))
+
+            await self._step('question_submit', senior_async.captcha_submit(
+                self.client, code=captcha, captcha_token=challenge.token, ids=ids))
+            logger.info("验证通过✅")
+            return await self.get_question()
+        except asyncio.TimeoutError:
+            logger.error("验证过程超时")
+            return False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"验证过程发生错误: {str(e)}")
+            return False
+
+    async def submit_answer(self, answer):
+        """提交答案
+
+        Args:
+            answer (Answer): 选中的选项
+
+        Returns:
+            bool: 是否成功提交答案
+        """
+        try:
+            await self._step('question_submit', senior_async.question_submit(
+                self.client,
+                self.question_id,
+                answer.ans_hash,
+                answer.ans_text
+            ))
+        except asyncio.TimeoutError:
+            self.metrics.count('timeouts')
+            logger.error("提交答案超时")
+            return False
+        except SeniorAPIError as e:
+            logger.error(str(e))
+            return False
+        logger.info("答案提交成功")
+        self.emit_progress('submitted', {'question_num': self.question_num})
+        with self.metrics.stage('submit_wait'):
+            await asyncio.sleep(self.submit_interval)
+        self.metrics.end_question()
+        return True
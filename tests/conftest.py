@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+# 测试从项目根目录导入 tools、client 等模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class _StalledStreamHandler(BaseHTTPRequestHandler):
+    """返回一个 SSE 事件（不含答案）后停止输出，直到测试结束"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        event = 'data: {"text": "根据题意"}\n\n'.encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(event), event))
+        self.wfile.flush()
+        self.server.requested.set()
+        self.server.release.wait(10)
+
+
+@pytest.fixture
+def stalled_server():
+    """停滞的流式模型接口，返回服务器对象，url 属性为接口地址，requested 在收到请求后设置"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StalledStreamHandler)
+    server.daemon_threads = True
+    server.release = threading.Event()
+    server.requested = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    server.url = f'http://{host}:{port}'
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
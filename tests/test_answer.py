@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+回答解析测试：句子中有多个数字时优先采用提示词之后且没有被否定的序号，其次采用最后一个有效数字
+"""
+
+import pytest
+from client.senior import Answer
+from tools.LLM.answer import extract_option_index, parse_answer
+
+ANSWERS = [Answer(f'hash{i}', text) for i, text in enumerate(('甲', '乙', '丙', '丁'), 1)]
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('3', 3),
+    ('答案：2', 2),
+    ('答案不是1而是3', 3),
+    ('答案是3，不是1', 3),
+    ('我选4', 4),
+    ('排除1和2以后只剩3', 3),
+    ('共有12种情况，其中第4种符合', 4),
+])
+def test_parse_answer(reply, expected):
+    assert parse_answer(reply, ANSWERS) == expected
+
+
+def test_extract_prefers_hinted_number():
+    assert extract_option_index('答案不是1而是3', 4) == 3
+    assert extract_option_index('不选2，应该选4', 4) == 4
+
+
+def test_extract_falls_back_to_last_valid_number():
+    assert extract_option_index('1和2都不对，3正确，共9个', 4) == 3
+    assert extract_option_index('没有数字', 4) is None
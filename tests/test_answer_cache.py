@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+答案缓存测试：数据库目录无法创建时按未命中处理，读写和清空都不抛出异常
+"""
+
+from client.senior import Answer
+from tools.answer_cache import AnswerCache
+
+ANSWERS = [Answer('a1', '长'), Answer('a2', '宽'), Answer('a3', '小'), Answer('a4', '热')]
+
+
+def test_round_trip(tmp_path):
+    cache = AnswerCache(path=str(tmp_path / 'cache' / 'answer_cache.db'))
+    try:
+        assert cache.get('大的反义词是什么？', ANSWERS) is None
+        cache.put('大的反义词是什么？', ANSWERS, '小', 'mock')
+        assert cache.get('大的反义词是什么？', list(reversed(ANSWERS))).ans_hash == 'a3'
+        assert cache.clear()
+        assert cache.get('大的反义词是什么？', ANSWERS) is None
+    finally:
+        cache.close()
+
+
+def test_unusable_directory_is_a_miss(tmp_path):
+    # 数据库目录的上级是一个普通文件，os.makedirs 抛出 OSError
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+    cache = AnswerCache(path=str(blocker / 'cache' / 'answer_cache.db'))
+    cache.put('题目', ANSWERS, '长', 'mock')
+    assert cache.get('题目', ANSWERS) is None
+    assert cache.clear() is False
+    cache.close()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+熔断器测试：半开状态的探测请求被取消时归还探测名额，熔断器不会一直停在半开状态
+"""
+
+import threading
+import pytest
+from tools.cancel import CancelToken, CancelledError, activate, current_token
+from tools.LLM.breaker import CLOSED, HALF_OPEN, OPEN, BreakerLLM, CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Backend:
+    """在取消令牌上等待的模型后端，相当于请求进行中或处于退避等待"""
+
+    def __init__(self):
+        self.started = threading.Event()
+
+    def ask(self, question, timeout=30):
+        self.started.set()
+        current_token().sleep(10)
+        return '1'
+
+
+@pytest.fixture
+def half_open():
+    clock = _Clock()
+    breaker = CircuitBreaker('mock', window=4, min_calls=2, failure_rate=0.5, slow_call_seconds=20,
+                             open_seconds=60, half_open_probes=1, clock=clock)
+    breaker.record(False, 0.1)
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    clock.now += 60
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+
+def test_cancelled_probe_is_released(half_open):
+    backend = _Backend()
+    llm = BreakerLLM('mock', backend, half_open)
+    token = CancelToken()
+    outcome = {}
+
+    def probe():
+        with activate(token):
+            try:
+                llm.ask('问题')
+            except BaseException as e:
+                outcome['error'] = e
+
+    thread = threading.Thread(target=probe, daemon=True)
+    thread.start()
+    assert backend.started.wait(5)
+    # 探测名额已被占用，其他请求立即失败
+    with pytest.raises(CircuitOpenError):
+        BreakerLLM('mock', _Backend(), half_open).ask('问题')
+
+    token.cancel()
+    thread.join(5)
+    assert isinstance(outcome.get('error'), CancelledError)
+    assert half_open.state == HALF_OPEN
+    assert half_open.allow()
+
+
+def test_completed_probe_closes_breaker(half_open):
+    class Quick:
+        def ask(self, question, timeout=30):
+            return '1'
+
+    assert BreakerLLM('mock', Quick(), half_open).ask('问题') == '1'
+    assert half_open.state == CLOSED
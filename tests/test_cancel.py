@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+协作式取消测试：令牌被取消后，阻塞调用、等待和停滞的流式请求都应在 100ms 内返回
+"""
+
+import threading
+import time
+import pytest
+from tools.cancel import CancelToken, CancelledError, activate, run_cancellable
+from tools.LLM.streaming import stream_answer
+
+BUDGET = 0.1
+# 取消前等待调用进入阻塞状态的时间
+SETTLE = 0.2
+
+
+def cancel_after_settle(call):
+    """在后台线程执行 call(token)，取消令牌后返回 (耗时, 返回值或异常)"""
+    token = CancelToken()
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = call(token)
+        except BaseException as e:
+            outcome['result'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    time.sleep(SETTLE)
+    assert thread.is_alive(), '调用在取消前已经返回'
+    started = time.perf_counter()
+    token.cancel()
+    thread.join(5)
+    elapsed = time.perf_counter() - started
+    assert not thread.is_alive()
+    return elapsed, outcome.get('result')
+
+
+def test_run_cancellable_stops_blocking_call():
+    elapsed, result = cancel_after_settle(lambda token: run_cancellable(time.sleep, 10, token=token))
+    assert isinstance(result, CancelledError)
+    assert elapsed < BUDGET
+
+
+def test_run_cancellable_uses_active_token():
+    def call(token):
+        with activate(token):
+            return run_cancellable(time.sleep, 10)
+    elapsed, result = cancel_after_settle(call)
+    assert isinstance(result, CancelledError)
+    assert elapsed < BUDGET
+
+
+@pytest.mark.parametrize('wait', [
+    lambda token: token.sleep(10),
+    lambda token: token.wait_event(threading.Event(), 10),
+], ids=['sleep', 'wait_event'])
+def test_waits_return_on_cancel(wait):
+    elapsed, result = cancel_after_settle(wait)
+    assert isinstance(result, CancelledError)
+    assert elapsed < BUDGET
+
+
+class _Backend:
+    """stream_answer 需要的最小模型后端"""
+    http2 = False
+
+    def __init__(self, url):
+        self.url = url
+
+    def build_stream_request(self, question):
+        return {'url': self.url, 'json': {'prompt': question}}
+
+    def parse_stream_chunk(self, event):
+        return event['text']
+
+
+def test_stalled_stream_closes_on_cancel(stalled_server):
+    backend = _Backend(stalled_server.url + '/stream')
+    elapsed, result = cancel_after_settle(
+        lambda token: stream_answer(backend, '问题', 4, timeout=10, cancel_event=token))
+    assert result is None
+    assert elapsed < BUDGET
+
+
+def test_stalled_stream_in_cancellable_call(stalled_server):
+    # 与答题策略相同：在 run_cancellable 中执行流式请求，并把令牌作为 cancel_event 传入
+    backend = _Backend(stalled_server.url + '/stream')
+    elapsed, result = cancel_after_settle(lambda token: run_cancellable(
+        stream_answer, backend, '问题', 4, timeout=10, cancel_event=token, token=token))
+    assert isinstance(result, CancelledError)
+    assert elapsed < BUDGET
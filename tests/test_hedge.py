@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+对冲请求测试：首个请求和对冲请求都在调用方上下文的副本中运行，会话的取消令牌在线程池中同样有效
+"""
+
+import threading
+from tools.cancel import CancelToken, activate, current_token
+from tools.LLM.hedge import HedgedLLM, HedgeStats, LatencyTracker
+
+
+class _Backend:
+    """第一次请求等到对冲请求返回后才结束，记录每次请求看到的取消令牌"""
+
+    def __init__(self):
+        self.tokens = []
+        self.hedged = threading.Event()
+
+    def ask(self, question, timeout=30):
+        self.tokens.append(current_token())
+        if len(self.tokens) == 1:
+            self.hedged.wait(5)
+            return '1'
+        self.hedged.set()
+        return '2'
+
+
+def test_requests_run_in_caller_context():
+    tracker = LatencyTracker(window=10, min_samples=1)
+    tracker.record('mock', 0.01)
+    stats = HedgeStats()
+    backend = _Backend()
+    llm = HedgedLLM('mock', backend, tracker=tracker, stats=stats, config={'min_delay': 0.01, 'max_delay': 0.05})
+    token = CancelToken()
+    with activate(token):
+        assert llm.ask('问题') == '2'
+    assert backend.tokens == [token, token]
+    assert stats.totals() == {'llm_hedged': 1, 'llm_hedge_wins': 1}
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GUI 日志转发测试：多个会话的 LogPump 同时运行时每条日志只转发一次，最后一个停止时才移除 sink
+"""
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+from PySide6.QtCore import QCoreApplication
+from gui.log_sink import LogPump, QueueLogSink
+from tools.logger import logger
+
+
+@pytest.fixture
+def pumps():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    sink = QueueLogSink('INFO')
+    received = []
+    created = []
+
+    def make():
+        pump = LogPump(sink=sink)
+        pump.records_signal.connect(lambda entries: received.extend(entry.message for entry in entries))
+        created.append(pump)
+        return pump
+
+    yield make, sink, received
+    for pump in created:
+        pump.stop()
+    del app
+
+
+def test_overlapping_sessions_forward_each_line_once(pumps):
+    make, sink, received = pumps
+    first, second = make(), make()
+    first.start()
+    second.start()
+    logger.info('重叠会话的日志')
+    first.pump()
+    second.pump()
+    assert received == ['重叠会话的日志']
+
+
+def test_sink_removed_after_last_pump_stops(pumps):
+    make, sink, received = pumps
+    first, second = make(), make()
+    first.start()
+    second.start()
+    first.stop()
+    first.stop()
+    logger.info('一个会话停止后')
+    second.pump()
+    assert received == ['一个会话停止后']
+
+    second.stop()
+    logger.info('全部停止后')
+    first.pump()
+    second.pump()
+    assert received == ['一个会话停止后']
+    assert sink.drain() == []
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提示词统计测试：按字符数估算的旧格式 token 数与渲染完整旧格式提示词后的估算一致
+"""
+
+from dataclasses import asdict
+import pytest
+from client.senior import Answer
+from tools.LLM.prompt import PromptBuilder, estimate_legacy_tokens, estimate_tokens, legacy_prompt
+
+
+@pytest.mark.parametrize('question, answers', [
+    ('大的反义词是什么？', [Answer('a1', '长'), Answer('a2', '宽'), Answer('a3', '小'), Answer('a4', '热')]),
+    ("Which one is O'Neil's 1st album?", [Answer('h' * 32, "O'Neil"), Answer('x', None), Answer('y', '4 km')]),
+    ('没有选项的题目', []),
+])
+def test_estimate_matches_rendered_legacy_prompt(question, answers):
+    assert estimate_legacy_tokens(question, answers) == estimate_tokens(legacy_prompt(question, answers))
+
+
+def test_legacy_prompt_keeps_old_answer_format():
+    answers = [Answer('a1', '长'), Answer('a2', "O'Neil")]
+    assert str([asdict(answer) for answer in answers]) in legacy_prompt('题目', answers)
+
+
+def test_builder_counts_saved_tokens():
+    builder = PromptBuilder()
+    answers = [Answer('a1', '长'), Answer('a2', '宽')]
+    builder.build('大的反义词是什么？', answers)
+    assert builder.last['legacy_tokens'] == estimate_legacy_tokens('大的反义词是什么？', answers)
+    assert builder.last['tokens'] < builder.last['legacy_tokens']
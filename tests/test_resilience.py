@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+重试策略测试：非幂等请求只在请求没有发出或服务端明确没有处理（429、503）时重试，
+Retry-After 至少等待给出的时间，异步请求使用同一套规则
+"""
+
+import asyncio
+import random
+import time
+import pytest
+import requests
+from tools.metrics import KeyedCounters
+from tools.resilience import RetryPolicy
+
+
+class _Response:
+    def __init__(self, status, retry_after=None):
+        self.status_code = status
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _policy(**overrides):
+    options = dict(attempts=3, base_delay=0.01, max_delay=0.01, deadline=5.0,
+                   stats=KeyedCounters(), rng=random.Random(0))
+    options.update(overrides)
+    return RetryPolicy('test', **options)
+
+
+def _sender(*statuses):
+    """依次返回给定状态码的响应，记录每次发送的时间"""
+    responses = [status if isinstance(status, _Response) else _Response(status) for status in statuses]
+    sent = []
+
+    def send(timeout):
+        sent.append(time.monotonic())
+        return responses[len(sent) - 1]
+    return send, sent
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_non_idempotent_retries_unprocessed_status(status):
+    send, sent = _sender(status, 200)
+    assert _policy().call(send, idempotent=False).status_code == 200
+    assert len(sent) == 2
+
+
+@pytest.mark.parametrize('status', [500, 502, 504])
+def test_non_idempotent_does_not_retry_other_errors(status):
+    send, sent = _sender(status, 200)
+    assert _policy().call(send, idempotent=False).status_code == status
+    assert len(sent) == 1
+
+
+def test_non_idempotent_retries_http_error_503():
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            raise requests.exceptions.HTTPError('503', response=_Response(503))
+        return _Response(200)
+    assert _policy().call(send, idempotent=False).status_code == 200
+    assert len(calls) == 2
+
+
+def test_retry_after_is_honoured_beyond_max_delay():
+    send, sent = _sender(_Response(503, retry_after='0.3'), 200)
+    assert _policy().call(send, idempotent=False).status_code == 200
+    assert sent[1] - sent[0] >= 0.3
+
+
+def test_retry_after_past_deadline_gives_up():
+    send, sent = _sender(_Response(429, retry_after='10'), 200)
+    assert _policy(deadline=1.0).call(send).status_code == 429
+    assert len(sent) == 1
+
+
+def test_async_call_uses_same_rules():
+    statuses = iter([_Response(503), _Response(200)])
+    sent = []
+
+    async def send(timeout):
+        sent.append(timeout)
+        return next(statuses)
+
+    stats = KeyedCounters()
+    result = asyncio.run(_policy(stats=stats).call_async(send, idempotent=False))
+    assert result.status_code == 200
+    assert len(sent) == 2
+    assert stats.totals() == {'test_http_retries': 1}
+
+
+def test_async_call_retries_translated_timeouts():
+    calls = []
+
+    async def send(timeout):
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise requests.exceptions.ReadTimeout('slow')
+        return _Response(200)
+
+    assert asyncio.run(_policy().call_async(send)).status_code == 200
+    assert len(calls) == 3
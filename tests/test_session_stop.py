@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+停止答题测试：会话正在等待模型回答（流式请求已发出、服务端停止输出）时，
+QuizSession.stop()、QuizThread.stop() 和 AsyncQuizSession.stop() 都应在 100ms 内结束会话
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from client.senior import Answer
+from config.config import ANSWER_CACHE
+from scripts.start_senior import QuizSession
+from scripts.start_senior_async import AsyncQuizSession
+from tools.LLM.deepseek import DeepSeekAPI
+from tools.LLM.strategy import SingleStrategy
+
+BUDGET = 0.1
+
+ANSWERS = [Answer(f'hash{i}', text) for i, text in enumerate(('甲', '乙', '丙', '丁'), 1)]
+
+
+@pytest.fixture(autouse=True)
+def no_answer_cache(monkeypatch):
+    # 创建会话时不打开配置目录中的答案缓存
+    monkeypatch.setitem(ANSWER_CACHE, 'enabled', False)
+
+
+class _Registry:
+    def __init__(self, url):
+        self.backend = DeepSeekAPI(base_url=url, model='mock-chat', api_key='test-key')
+
+    def get(self, choice):
+        return self.backend
+
+    def invalidate(self):
+        pass
+
+
+def _load_question(session):
+    session.question = '测试题目'
+    session.answers = list(ANSWERS)
+    session.question_id = 1
+    session.question_num = 1
+    session.metrics.begin_question(1, session.question)
+    return True
+
+
+def _prepare(session, server):
+    """让会话直接拿到题目，并向停滞的模型接口提问"""
+    registry = _Registry(server.url)
+    session.llm_registry = registry
+    session.strategy = SingleStrategy(registry, '1')
+    session.answer_cache = None
+    session.save_metrics = False
+    return session
+
+
+def _stop_when_requested(server, stop, finished):
+    """模型请求发出后调用 stop()，返回从 stop() 到会话结束的耗时"""
+    assert server.requested.wait(5), '会话没有向模型提问'
+    time.sleep(0.05)
+    started = time.perf_counter()
+    stop()
+    assert finished(5), '会话没有结束'
+    return time.perf_counter() - started
+
+
+def test_quiz_session_stop(stalled_server):
+    session = _prepare(QuizSession(), stalled_server)
+    session.get_question = lambda: _load_question(session)
+    thread = threading.Thread(target=session.start, daemon=True)
+    thread.start()
+
+    def finished(timeout):
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    assert _stop_when_requested(stalled_server, session.stop, finished) < BUDGET
+    assert session.stopped
+
+
+def test_quiz_thread_stop(stalled_server):
+    pytest.importorskip('PySide6')
+    from PySide6.QtCore import QCoreApplication
+    from gui.threads import QuizThread
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    quiz_thread = QuizThread()
+    session = _prepare(quiz_thread.quiz_session, stalled_server)
+    session.get_question = lambda: _load_question(session)
+    quiz_thread.start()
+    try:
+        elapsed = _stop_when_requested(stalled_server, quiz_thread.stop,
+                                       lambda timeout: quiz_thread.wait(int(timeout * 1000)))
+    finally:
+        quiz_thread.log_pump.stop()
+    assert elapsed < BUDGET
+    del app
+
+
+def test_async_session_stop(stalled_server):
+    session = _prepare(AsyncQuizSession(), stalled_server)
+
+    async def get_question():
+        return _load_question(session)
+    session.get_question = get_question
+
+    loop = asyncio.new_event_loop()
+    done = threading.Event()
+
+    def run():
+        try:
+            loop.run_until_complete(session.start())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        elapsed = _stop_when_requested(stalled_server, lambda: loop.call_soon_threadsafe(session.stop), done.wait)
+    finally:
+        thread.join(5)
+        loop.close()
+    assert elapsed < BUDGET
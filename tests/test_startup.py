@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动测试：命令行和 core 不导入 PySide6，GUI 启动时不导入延迟加载的模块，导入时不创建配置或日志目录
+每项检查都在使用临时 HOME 的子进程中进行（见 benchmarks.startup.probe），启动耗时由 benchmarks.startup 测量
+"""
+
+import importlib.util
+import pytest
+from benchmarks.startup import GUI_MODULES, LAZY_MODULES, probe
+
+requires_qt = pytest.mark.skipif(importlib.util.find_spec('PySide6') is None, reason='未安装 PySide6')
+
+
+def test_cli_and_core_import_without_qt(tmp_path):
+    result = probe(tmp_path, ['cli', 'core'], 'import')
+    assert 'PySide6' not in result['modules']
+    assert result['created'] == []
+    assert not (tmp_path / '.bili-hardcore').exists()
+
+
+@requires_qt
+def test_gui_import_is_lazy(tmp_path):
+    result = probe(tmp_path, GUI_MODULES, 'import')
+    assert [name for name in LAZY_MODULES if name in result['modules']] == []
+    assert result['created'] == []
+    assert not (tmp_path / '.bili-hardcore').exists()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+流式请求测试：提前得到答案后 HTTP/1.1 连接读完剩余输出再放回连接池，
+回复只有一个序号（没有换行）时在输出停顿后直接返回
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from benchmarks.http2 import make_prompt
+from benchmarks.stubs import MockLLMServer, QuestionBank
+from config.config import LLM_STREAM_PAUSE
+from tools.LLM import transport
+from tools.LLM.answer import early_option_index
+from tools.LLM.deepseek import DeepSeekAPI
+from tools.LLM.streaming import stream_answer
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    transport.close_all()
+    yield
+    transport.close_all()
+
+
+class _BareDigitHandler(BaseHTTPRequestHandler):
+    """回复一个没有换行的序号后停止输出，直到测试结束"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        event = ('data: ' + json.dumps({'choices': [{'delta': {'content': '3'}}]}) + '\n\n').encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(event), event))
+        self.wfile.flush()
+        self.server.release.wait(10)
+
+
+def test_early_option_index_accepts_bare_digit_when_settled():
+    assert early_option_index('3', 4) is None
+    assert early_option_index('3', 4, settled=True) == 3
+    assert early_option_index('答案：2', 4, settled=True) == 2
+    assert early_option_index('5', 4, settled=True) is None
+    assert early_option_index('<think>3', 4, settled=True) is None
+
+
+def test_bare_digit_returns_after_pause():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _BareDigitHandler)
+    server.daemon_threads = True
+    server.release = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    api = DeepSeekAPI(base_url=f'http://{host}:{port}', model='mock-chat', api_key='test-key')
+    try:
+        started = time.perf_counter()
+        assert stream_answer(api, '题目', 4) == '3'
+        assert time.perf_counter() - started < LLM_STREAM_PAUSE + 2
+    finally:
+        server.release.set()
+        server.shutdown()
+        server.server_close()
+
+
+def test_early_exit_reuses_http1_connection():
+    bank = QuestionBank(total=6)
+    with MockLLMServer(bank, token_interval=0.001, explanation_tokens=40) as llm:
+        api = DeepSeekAPI(base_url=llm.url + '/v1', model='mock-chat', api_key='test-key')
+        for number in range(1, 6):
+            assert api.ask_stream(make_prompt(bank, number), 4) in ('1', '2', '3', '4')
+            # 答题时提交答案需要时间，剩余输出在此期间读完
+            time.sleep(0.3)
+        assert llm.connections == 1
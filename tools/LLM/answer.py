@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模型回答解析
+从模型回复中提取选项序号，兼容“答案：3”、“选项2”、全角数字、
+字母选项、复述选项内容以及与选项文本的模糊匹配
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+_NUMBER_RE = re.compile(r'\d+')
+_THINK_RE = re.compile(r'<think>.*?(</think>|$)', re.S)
+# “答案：3”、“选项 2”、“选择第3个”、“answer: B” 等显式标记
+_MARKED_RE = re.compile(
+    r'(?:答案|选项|选择|回答|正确答案|answer|option)\s*(?:是|为|应该是|应为)?\s*[:：]?\s*'
+    r'(?:第\s*)?([0-9]+|[一二三四五六七八九]|[A-Ia-i](?![A-Za-z]))',
+    re.I
+)
+# “第3个”、“第三项”
+_ORDINAL_RE = re.compile(r'第\s*([0-9]+|[一二三四五六七八九])\s*(?:个|项|条|选项)?')
+# 整个回复只有一个序号，例如 “3”、“(3)”、“3.”、“B”
+_BARE_RE = re.compile(r'^[\s(（\[【]*([0-9]+|[A-Ia-i])[\s)）\]】.、。,，]*$')
+# “是3”、“选3”、“答案为3” 等提示词之后的数字，前面有“不”、“非”时为否定，例如 “不是1”
+_HINTED_NUMBER_RE = re.compile(r'([不非]?)(?:答案|选|是|为)\s*[:：]?\s*(?:第\s*)?([0-9]+)')
+
+_CN_DIGITS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+
+# 模糊匹配的最低相似度
+FUZZY_THRESHOLD = 0.6
+
+
+def normalize(text):
+    """规范化回复文本：全角转半角，去掉思考过程和首尾空白"""
+    text = unicodedata.normalize('NFKC', str(text))
+    return _THINK_RE.sub('', text).strip()
+
+
+def _token_to_index(token):
+    if token.isdigit():
+        return int(token)
+    if token in _CN_DIGITS:
+        return _CN_DIGITS[token]
+    return ord(token.upper()) - ord('A') + 1
+
+
+def extract_option_index(text, option_count):
+    """从模型回复中提取有效的选项序号
+
+    优先采用“是3”、“选3”这类提示词之后且没有被否定的第一个序号，其次采用最后一个有效的数字，
+    例如 “答案不是1而是3” 为 3
+
+    Args:
+        text (str): 完整的模型回复
+        option_count (int): 选项数量
+
+    Returns:
+        int: 选项序号 (1..option_count)，未找到时返回 None
+    """
+    text = _THINK_RE.sub('', unicodedata.normalize('NFKC', text))
+    for match in _HINTED_NUMBER_RE.finditer(text):
+        value = int(match.group(2))
+        if not match.group(1) and 1 <= value <= option_count:
+            return value
+    values = [int(match.group()) for match in _NUMBER_RE.finditer(text)]
+    valid = [value for value in values if 1 <= value <= option_count]
+    return valid[-1] if valid else None
+
+
+def _first_line_index(text):
+    """回复的第一行只有一个序号时返回该序号，例如 “3\n解析：...”"""
+    line, newline, _ = text.partition('\n')
+    match = _BARE_RE.match(line) if newline else None
+    return _token_to_index(match.group(1)) if match else None
+
+
+def early_option_index(text, option_count, settled=False):
+    """流式输出过程中判断答案是否已经确定
+
+    只在回复的第一行只有一个序号且该行已结束，或已出现“答案：3”这类完整的显式标记时返回，
+    结果与 parse_answer 对完整回复的解析一致；其余情况返回 None，等待完整回复后再解析。
+    输出已经结束或停顿（settled）时，整个回复只有一个序号（例如 "3"）也视为答案已确定
+
+    Args:
+        text (str): 目前收到的回复
+        option_count (int): 选项数量
+        settled (bool): 输出是否已经结束或停顿
+
+    Returns:
+        int: 选项序号 (1..option_count)，尚不能确定时返回 None
+    """
+    text = unicodedata.normalize('NFKC', text)
+    if '<think>' in text and '</think>' not in text:
+        # 思考过程中的数字不是答案
+        return None
+    text = _THINK_RE.sub('', text).lstrip()
+    index = _first_line_index(text)
+    if index is None and settled:
+        match = _BARE_RE.match(text)
+        index = _token_to_index(match.group(1)) if match else None
+    if index is None:
+        match = _MARKED_RE.search(text)
+        # 序号之后还有其他字符或输出已停顿，才能确定序号已输出完整
+        if match and (settled or match.end() < len(text)):
+            index = _token_to_index(match.group(1))
+    return index if index is not None and 1 <= index <= option_count else None
+
+
+def _match_option_text(text, option_texts):
+    """回复中复述了某个选项内容时返回该选项序号"""
+    hits = [i for i, option in enumerate(option_texts, 1) if option and option in text]
+    if len(hits) == 1:
+        return hits[0]
+    if len(hits) > 1:
+        # 多个选项互为包含时，取最长的那个
+        longest = max(hits, key=lambda i: len(option_texts[i - 1]))
+        if all(option_texts[i - 1] in option_texts[longest - 1] for i in hits):
+            return longest
+    return None
+
+
+def _fuzzy_match(text, option_texts):
+    """与选项文本做模糊匹配，最佳结果需明显优于其他选项"""
+    scores = sorted(
+        ((SequenceMatcher(None, text, option).ratio(), i) for i, option in enumerate(option_texts, 1) if option),
+        reverse=True
+    )
+    if not scores or scores[0][0] < FUZZY_THRESHOLD:
+        return None
+    if len(scores) > 1 and scores[0][0] - scores[1][0] < 0.1:
+        return None
+    return scores[0][1]
+
+
+def parse_answer(reply, answers):
+    """解析模型回复，返回选项序号
+
+    Args:
+        reply (str): 模型回复
+        answers (list): 题目选项列表，元素为 client.senior.Answer
+
+    Returns:
+        int: 选项序号 (1..len(answers))，无法解析时返回 None
+    """
+    if reply is None or not answers:
+        return None
+    text = normalize(reply)
+    if not text:
+        return None
+    option_count = len(answers)
+
+    def valid(index):
+        return index is not None and 1 <= index <= option_count
+
+    match = _BARE_RE.search(text)
+    index = _token_to_index(match.group(1)) if match else _first_line_index(text)
+    if valid(index):
+        return index
+
+    for pattern in (_MARKED_RE, _ORDINAL_RE):
+        match = pattern.search(text)
+        if match:
+            index = _token_to_index(match.group(1))
+            if valid(index):
+                return index
+
+    option_texts = [normalize(answer.ans_text or '') for answer in answers]
+    index = _match_option_text(text, option_texts)
+    if valid(index):
+        return index
+
+    index = extract_option_index(text, option_count)
+    if valid(index):
+        return index
+
+    index = _fuzzy_match(text, option_texts)
+    return index if valid(index) else None
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模型熔断
+按模型统计最近请求的失败率（超过 slow_call_seconds 的请求也算失败），失败率过高时熔断一段时间，
+期间对该模型的请求立即抛出 CircuitOpenError，由 FailoverStrategy 转交下一个已配置的模型；
+熔断时间结束后进入半开状态，放行少量探测请求，成功则恢复，失败则继续熔断
+"""
+
+import threading
+import time
+from collections import deque
+from config.config import BREAKER_CONFIG
+from tools.logger import logger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """模型处于熔断状态"""
+
+    def __init__(self, backend, retry_after):
+        super().__init__(f"{backend} 已熔断，{retry_after:.0f}秒后重试")
+        self.backend = backend
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """单个模型的熔断器"""
+
+    def __init__(self, name, window=BREAKER_CONFIG['window'], min_calls=BREAKER_CONFIG['min_calls'],
+                 failure_rate=BREAKER_CONFIG['failure_rate'],
+                 slow_call_seconds=BREAKER_CONFIG['slow_call_seconds'],
+                 open_seconds=BREAKER_CONFIG['open_seconds'],
+                 half_open_probes=BREAKER_CONFIG['half_open_probes'], clock=time.monotonic):
+        """
+        Args:
+            name (str): 模型类型，用于日志
+            window (int): 统计失败率的最近请求数
+            min_calls (int): 请求数达到该值后才计算失败率
+            failure_rate (float): 失败率达到该值时熔断
+            slow_call_seconds (float): 耗时达到该值的请求视为失败
+            open_seconds (float): 熔断持续时间
+            half_open_probes (int): 半开状态下放行的探测请求数，全部成功后恢复
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._results = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def _update_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+            logger.info(f"{self.name} 熔断结束，放行探测请求")
+
+    @property
+    def state(self):
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def retry_after(self):
+        """距离进入半开状态的秒数"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self.open_seconds - (self._clock() - self._opened_at), 0.0)
+
+    def allow(self):
+        """是否放行一次请求，半开状态下会占用一个探测名额"""
+        with self._lock:
+            self._update_state()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            return False
+
+    def release(self):
+        """放行的请求被取消、没有结果时归还探测名额"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _open(self, reason):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._results.clear()
+        logger.warning(f"{self.name} 已熔断 {self.open_seconds:.0f}秒: {reason}")
+
+    def record(self, ok, elapsed):
+        """记录一次请求的结果
+
+        Args:
+            ok (bool): 请求是否成功
+            elapsed (float): 耗时（秒）
+        """
+        failed = not ok or elapsed >= self.slow_call_seconds
+        with self._lock:
+            self._update_state()
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open('探测请求失败' if not ok else f'探测请求耗时 {elapsed:.1f}s')
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._state = CLOSED
+                    self._results.clear()
+                    logger.info(f"{self.name} 已恢复")
+                return
+            if self._state == OPEN:
+                return
+            self._results.append(failed)
+            if len(self._results) >= self.min_calls:
+                rate = sum(self._results) / len(self._results)
+                if rate >= self.failure_rate:
+                    self._open(f'最近 {len(self._results)} 次请求失败率 {rate:.0%}')
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(backend):
+    """获取模型的熔断器，进程内按模型类型共用"""
+    with _breakers_lock:
+        breaker = _breakers.get(backend)
+        if breaker is None:
+            breaker = _breakers[backend] = CircuitBreaker(backend)
+        return breaker
+
+
+def breaker_states():
+    """返回各模型熔断器的状态"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.state for name, breaker in breakers.items()}
+
+
+class BreakerLLM:
+    """经过熔断器调用的模型客户端包装"""
+
+    def __init__(self, model_type, backend, breaker=None):
+        self._model_type = model_type
+        self._backend = backend
+        self.breaker = breaker or get_breaker(model_type)
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def ask(self, question, timeout=30):
+        return self._call(lambda: self._backend.ask(question, timeout))
+
+    def ask_stream(self, question, option_count, timeout=30, cancel_event=None):
+        return self._call(lambda: self._backend.ask_stream(question, option_count, timeout, cancel_event))
+
+    def _call(self, call):
+        if not self.breaker.allow():
+            raise CircuitOpenError(self._model_type, self.breaker.retry_after())
+        started = time.monotonic()
+        try:
+            result = call()
+        except Exception:
+            self.breaker.record(False, time.monotonic() - started)
+            raise
+        except BaseException:
+            # 答题停止时在请求或退避等待中抛出的 CancelledError，请求没有结果
+            self.breaker.release()
+            raise
+        if result is None:
+            # 流式请求被取消
+            self.breaker.release()
+            return None
+        self.breaker.record(True, time.monotonic() - started)
+        return result
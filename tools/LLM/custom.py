@@ -1,7 +1,9 @@
 import requests
 from typing import Dict, Any, Optional
 from config.config import PROMPT, load_model_config, load_api_key
-from time import time
+from tools.LLM.transport import llm_post
+from tools.LLM.streaming import stream_answer
+from tools.logger import logger
 
 class APIUtils:
     @staticmethod
@@ -28,20 +30,21 @@ class APIUtils:
             return f"{base_url}/v1/chat/completions"
 
 class CustomAPI:
-    def __init__(self):
-        # 始终从文件重新加载最新配置，确保获取到用户在GUI中最新保存的设置
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 api_key: Optional[str] = None, http2: Optional[bool] = None):
+        # 始终从文件重新加载最新配置，确保获取到用户在GUI中最新保存的设置；传入的参数优先
         config = load_model_config('custom')
         
-        self.base_url = config['base_url']
-        self.model = config['model']
+        self.base_url = base_url or config['base_url']
+        self.model = model or config['model']
         # 同样从文件实时加载API密钥
-        self.api_key = load_api_key('custom')
+        self.api_key = api_key or load_api_key('custom')
+        # 是否使用 HTTP/2 连接
+        self.http2 = config.get('http2', False) if http2 is None else http2
         
         # 添加调试信息，帮助用户确认配置是否正确
-        print(f"[DEBUG] CustomAPI 配置加载:")
-        print(f"  - base_url: '{self.base_url}'")
-        print(f"  - model: '{self.model}'")
-        print(f"  - api_key: '{'*' * min(8, len(self.api_key)) if self.api_key else '(空)'}'")
+        logger.debug(f"CustomAPI 配置加载: base_url='{self.base_url}', model='{self.model}', "
+                     f"api_key='{'*' * min(8, len(self.api_key)) if self.api_key else '(空)'}'")
         
         if not self.base_url:
             raise ValueError("自定义模型的base_url为空，请在GUI设置中配置正确的API基础URL")
@@ -50,23 +53,31 @@ class CustomAPI:
         if not self.api_key:
             raise ValueError("自定义模型的API密钥为空，请在GUI设置中配置正确的API密钥")
 
+        self.api_name = "阿里云DashScope" if self._is_dashscope() else "自定义模型"
+
+    def _is_dashscope(self) -> bool:
+        return 'dashscope' in self.base_url.lower() or 'aliyuncs' in self.base_url.lower()
+
     def ask(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
         """根据API格式自动判断使用不同的API格式"""
-        if 'dashscope' in self.base_url.lower() or 'aliyuncs' in self.base_url.lower():
+        if self._is_dashscope():
             return self.ask_dashscope_format(question, timeout)
         else:
             # 默认使用OpenAI兼容格式
             return self.ask_openai_format(question, timeout)
 
-    def ask_openai_format(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
-        """使用OpenAI格式的API调用"""
-        # 使用新的URL格式化逻辑
-        url = APIUtils.format_api_url(self.base_url)
-        
-        # 添加调试信息
-        print(f"[DEBUG] ask_openai_format:")
-        print(f"  - 原始base_url: '{self.base_url}'")
-        print(f"  - 格式化后URL: '{url}'")
+    def build_request(self, question: str, dashscope: Optional[bool] = None) -> Dict[str, Any]:
+        """构造请求参数，同步和异步客户端共用"""
+        if dashscope is None:
+            dashscope = self._is_dashscope()
+        if dashscope:
+            # 确保URL正确指向chat/completions端点
+            url = f"{self.base_url}/compatible-mode/v1/chat/completions"
+        else:
+            # 使用新的URL格式化逻辑
+            url = APIUtils.format_api_url(self.base_url)
+            # 添加调试信息
+            logger.debug(f"ask_openai_format: 原始base_url='{self.base_url}', 格式化后URL='{url}'")
         
         headers = {
             "Content-Type": "application/json",
@@ -78,59 +89,61 @@ class CustomAPI:
             "messages": [
                 {
                     "role": "user",
-                    "content": PROMPT.format(time(), question)
+                    "content": PROMPT.format(question)
                 }
             ]
         }
 
+        return {"url": url, "headers": headers, "json": data}
+
+    def parse_response(self, result: Dict[str, Any]) -> str:
+        """从响应JSON中提取回答文本"""
+        return result["choices"][0]["message"]["content"]
+
+    def build_stream_request(self, question: str) -> Dict[str, Any]:
+        """构造流式请求参数"""
+        request = self.build_request(question)
+        request["json"]["stream"] = True
+        return request
+
+    def parse_stream_chunk(self, chunk: Dict[str, Any]) -> str:
+        """从流式事件中提取增量文本"""
+        return chunk["choices"][0]["delta"].get("content") or ""
+
+    def ask_stream(self, question: str, option_count: int, timeout: Optional[int] = 30,
+                   cancel_event=None) -> Optional[str]:
+        """流式请求，回复开头已能确定答案时立即返回；cancel_event 被设置时中止并返回 None"""
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=data,
-                timeout=timeout
-            )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            return stream_answer(self, question, option_count, timeout, cancel_event)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"自定义模型API请求失败: {str(e)}")
-        except (KeyError, IndexError) as e:
-            raise Exception(f"解析API响应失败: {str(e)}，请检查模型配置是否正确")
+            raise Exception(f"{self.api_name} API请求失败: {str(e)}")
 
-    def ask_dashscope_format(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
-        """使用阿里云DashScope API格式的调用"""
-        # 确保URL正确指向chat/completions端点
-        url = f"{self.base_url}/compatible-mode/v1/chat/completions"
-        
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-        
-        data = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": PROMPT.format(time(), question)
-                }
-            ]
-        }
+    def _send_chat(self, question: str, timeout: Optional[int], dashscope: bool) -> Dict[str, Any]:
+        api_name = "阿里云DashScope" if dashscope else "自定义模型"
+        request = self.build_request(question, dashscope)
 
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=data,
-                timeout=timeout
+            response = llm_post(
+                request.pop("url"),
+                timeout=timeout,
+                http2=self.http2,
+                **request
             )
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            return self.parse_response(response.json())
         except requests.exceptions.RequestException as e:
-            raise Exception(f"阿里云DashScope API请求失败: {str(e)}")
+            raise Exception(f"{api_name} API请求失败: {str(e)}")
         except (KeyError, IndexError) as e:
             raise Exception(f"解析API响应失败: {str(e)}，请检查模型配置是否正确")
 
+    def ask_openai_format(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
+        """使用OpenAI格式的API调用"""
+        return self._send_chat(question, timeout, dashscope=False)
+
+    def ask_dashscope_format(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
+        """使用阿里云DashScope API格式的调用"""
+        return self._send_chat(question, timeout, dashscope=True)
+
     def ask_custom_format(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
         """使用自定义格式的API调用，适配其他格式的模型API"""
         url = f"{self.base_url}"
@@ -143,15 +156,16 @@ class CustomAPI:
         # 通用数据格式，可根据实际API调整
         data = {
             "model": self.model,
-            "prompt": PROMPT.format(time(), question)
+            "prompt": PROMPT.format(question)
         }
 
         try:
-            response = requests.post(
+            response = llm_post(
                 url,
                 headers=headers,
                 json=data,
-                timeout=timeout
+                timeout=timeout,
+                http2=self.http2
             )
             response.raise_for_status()
             
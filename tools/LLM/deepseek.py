@@ -1,17 +1,24 @@
 import requests
 from typing import Dict, Any, Optional
 from config.config import PROMPT, load_model_config, load_api_key
-from time import time
+from tools.LLM.transport import llm_post
+from tools.LLM.streaming import stream_answer
 
 class DeepSeekAPI:
-    def __init__(self):
-        # 加载DeepSeek模型配置
+    api_name = 'DeepSeek'
+
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 api_key: Optional[str] = None, http2: Optional[bool] = None):
+        # 加载DeepSeek模型配置，传入的参数优先（用于基准测试等场景）
         config = load_model_config('deepseek')
-        self.base_url = config['base_url']
-        self.model = config['model']
-        self.api_key = load_api_key('deepseek')
+        self.base_url = base_url or config['base_url']
+        self.model = model or config['model']
+        self.api_key = api_key or load_api_key('deepseek')
+        # 是否使用 HTTP/2 连接
+        self.http2 = config.get('http2', False) if http2 is None else http2
 
-    def ask(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
+    def build_request(self, question: str) -> Dict[str, Any]:
+        """构造请求参数，同步和异步客户端共用"""
         url = f"{self.base_url}/chat/completions"
         
         headers = {
@@ -24,19 +31,46 @@ class DeepSeekAPI:
             "messages": [
                 {
                     "role": "user",
-                    "content": PROMPT.format(time(), question)
+                    "content": PROMPT.format(question)
                 }
             ]
         }
 
+        return {"url": url, "headers": headers, "json": data}
+
+    def parse_response(self, result: Dict[str, Any]) -> str:
+        """从响应JSON中提取回答文本"""
+        return result["choices"][0]["message"]["content"]
+
+    def build_stream_request(self, question: str) -> Dict[str, Any]:
+        """构造流式请求参数"""
+        request = self.build_request(question)
+        request["json"]["stream"] = True
+        return request
+
+    def parse_stream_chunk(self, chunk: Dict[str, Any]) -> str:
+        """从流式事件中提取增量文本"""
+        return chunk["choices"][0]["delta"].get("content") or ""
+
+    def ask_stream(self, question: str, option_count: int, timeout: Optional[int] = 30,
+                   cancel_event=None) -> Optional[str]:
+        """流式请求，回复开头已能确定答案时立即返回；cancel_event 被设置时中止并返回 None"""
+        try:
+            return stream_answer(self, question, option_count, timeout, cancel_event)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"DeepSeek API request failed: {str(e)}")
+
+    def ask(self, question: str, timeout: Optional[int] = 30) -> Dict[str, Any]:
+        request = self.build_request(question)
+
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=data,
-                timeout=timeout
+            response = llm_post(
+                request.pop("url"),
+                timeout=timeout,
+                http2=self.http2,
+                **request
             )
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            return self.parse_response(response.json())
         except requests.exceptions.RequestException as e:
-            raise Exception(f"DeepSeek API request failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"DeepSeek API request failed: {str(e)}")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+对冲请求
+按模型统计最近的请求耗时，请求超过该模型耗时的 p95 仍未返回时，向同一模型再发一次相同的请求，
+采用先返回的结果，另一个请求被取消（流式）或在后台结束（非流式），以降低模型服务商排队造成的长尾延迟
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from config.config import HEDGE_CONFIG
+from tools.cancel import CancelToken
+from tools.metrics import KeyedCounters, percentile
+from tools.logger import logger
+
+# 对冲请求共用的线程池，非流式的落后请求会在后台运行到超时，预留足够的线程
+_executor = None
+_executor_lock = threading.Lock()
+MAX_WORKERS = 16
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='llm-hedge')
+        return _executor
+
+
+class LatencyTracker:
+    """按模型保存最近 window 次请求的耗时"""
+
+    def __init__(self, window=HEDGE_CONFIG['window'], min_samples=HEDGE_CONFIG['min_samples']):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, backend, seconds):
+        with self._lock:
+            samples = self._samples.get(backend)
+            if samples is None:
+                samples = self._samples[backend] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, backend, p):
+        """返回该模型耗时的百分位数，样本不足 min_samples 时返回 None"""
+        with self._lock:
+            samples = list(self._samples.get(backend, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, p)
+
+    def reset(self, backend=None):
+        """清空样本，模型配置变化后之前的耗时不再有参考价值"""
+        with self._lock:
+            if backend is None:
+                self._samples.clear()
+            else:
+                self._samples.pop(backend, None)
+
+
+class HedgeStats(KeyedCounters):
+    """对冲次数统计，按模型累计"""
+
+
+# 进程内共用：耗时分布属于模型服务本身，不随答题会话重置
+latency_tracker = LatencyTracker()
+hedge_stats = HedgeStats()
+
+
+class _CancelEvent(CancelToken):
+    """单次请求的取消令牌，外部的 cancel_event 被设置时同样视为已取消"""
+
+    def __init__(self, parent=None):
+        # 外部传入 CancelToken 时取消会立即传递，普通的 threading.Event 只能轮询
+        super().__init__(parent if hasattr(parent, 'on_cancel') else None)
+        self._parent = parent
+
+    def is_set(self):
+        return super().is_set() or (self._parent is not None and self._parent.is_set())
+
+
+class HedgedLLM:
+    """为 ask / ask_stream 增加对冲请求的模型客户端包装"""
+
+    def __init__(self, model_type, backend, tracker=None, stats=None, config=None):
+        """
+        Args:
+            model_type (str): 模型类型，用于区分耗时统计
+            backend: 模型客户端
+            tracker (LatencyTracker): 默认使用进程内共用的 latency_tracker
+            stats (HedgeStats): 默认使用进程内共用的 hedge_stats
+            config (dict): 覆盖 HEDGE_CONFIG 中的配置
+        """
+        self._model_type = model_type
+        self._backend = backend
+        self._tracker = tracker or latency_tracker
+        self._stats = stats or hedge_stats
+        self._config = dict(HEDGE_CONFIG, **(config or {}))
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def hedge_delay(self):
+        """发出对冲请求前的等待时间，样本不足时返回 None 表示不对冲"""
+        value = self._tracker.percentile(self._model_type, self._config['percentile'])
+        if value is None:
+            return None
+        return min(max(value, self._config['min_delay']), self._config['max_delay'])
+
+    def ask(self, question, timeout=30):
+        return self._hedged(lambda cancel: self._backend.ask(question, timeout), None)
+
+    def ask_stream(self, question, option_count, timeout=30, cancel_event=None):
+        return self._hedged(
+            lambda cancel: self._backend.ask_stream(question, option_count, timeout, cancel), cancel_event)
+
+    @staticmethod
+    def _timed(call, cancel):
+        started = time.monotonic()
+        result = call(cancel)
+        return result, time.monotonic() - started
+
+    def _hedged(self, call, cancel_event):
+        """执行 call(cancel)，超过对冲等待时间后再执行一次，返回先成功的结果"""
+        delay = self.hedge_delay()
+        if delay is None:
+            result, elapsed = self._timed(call, cancel_event)
+            if result is not None:
+                self._tracker.record(self._model_type, elapsed)
+            return result
+
+        executor = _get_executor()
+        # 每个请求使用当前上下文的副本，使会话的取消令牌在线程池中同样有效
+        context = contextvars.copy_context()
+        cancels = [_CancelEvent(cancel_event)]
+        futures = {executor.submit(context.copy().run, self._timed, call, cancels[0]): 'primary'}
+        done, _ = wait(futures, timeout=delay)
+        if not done and not (cancel_event is not None and cancel_event.is_set()):
+            self._stats.count(self._model_type, 'llm_hedged')
+            logger.info(f"{self._model_type} 请求超过 {delay:.2f}s 未返回，发出对冲请求")
+            cancels.append(_CancelEvent(cancel_event))
+            futures[executor.submit(context.copy().run, self._timed, call, cancels[1])] = 'hedge'
+
+        error = None
+        try:
+            for future in as_completed(futures):
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if result is None:
+                    # 流式请求被外部取消
+                    continue
+                self._tracker.record(self._model_type, elapsed)
+                if futures[future] == 'hedge':
+                    self._stats.count(self._model_type, 'llm_hedge_wins')
+                return result
+        finally:
+            # 通知落后的流式请求尽快关闭
+            for cancel in cancels:
+                cancel.set()
+        if error is not None:
+            raise error
+        return None
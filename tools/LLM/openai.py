@@ -1,7 +1,7 @@
 import requests
 from typing import Dict, Any, Optional
 from config.config import PROMPT, API_KEY_OPENAI, BASE_URL_OPENAI,MODEL_OPENAI
-from time import time
+from tools.LLM.transport import llm_post
 
 class OpenAIAPI:
     def __init__(self, base_url: str = None, model: str = None, api_key: str = None):
@@ -25,13 +25,13 @@ class OpenAIAPI:
             "messages": [
                 {
                     "role": "user",
-                    "content": PROMPT.format(time(), question)
+                    "content": PROMPT.format(question)
                 }
             ]
         }
 
         try:
-            response = requests.post(
+            response = llm_post(
                 url,
                 headers=headers,
                 json=data,
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+题目提示词构建
+只向模型发送题目和带序号的选项文本，并估算输入 token 数，
+与旧格式（带时间戳前缀、原样输出选项字典）对比节省量；旧格式的 token 数按各部分的字符数估算，不渲染完整文本
+"""
+
+import re
+from config.config import PROMPT
+
+# 汉字、假名等每个字符大约对应一个 token
+_CJK_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿豈-﫿]')
+
+# 旧版提示词模板，仅用于统计节省的 token
+_LEGACY_PROMPT = '''
+当前时间：{}
+你是一个高效精准的答题专家，面对选择题时，直接根据问题和选项判断正确答案，并返回对应选项的序号（1, 2, 3, 4）。示例：
+问题：大的反义词是什么？
+选项：['长', '宽', '小', '热']
+回答：3
+如果不确定正确答案，选择最接近的选项序号返回，不提供额外解释或超出 1-4 的内容。
+---
+请回答我的问题：{}
+'''
+# 旧格式的题目部分，答案为选项字典列表的 repr
+_LEGACY_QUESTION = '''
+        题目:{}
+        答案:{}
+        '''
+# 旧格式中一个选项字典的 repr
+_LEGACY_ANSWER = "{{'ans_hash': {}, 'ans_text': {}}}"
+# 时间戳 str(time()) 的长度
+_TIMESTAMP_LENGTH = 18
+
+
+def estimate_tokens(text):
+    """粗略估算文本的 token 数
+
+    中日文字符按每字 1 个 token 计算，其余字符按每 4 个字符 1 个 token 计算
+
+    Args:
+        text (str): 文本
+
+    Returns:
+        int: 估算的 token 数
+    """
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def format_question(question, answers):
+    """将题目和选项格式化为紧凑文本
+
+    Args:
+        question (str): 题目
+        answers (list): 选项列表，元素为 client.senior.Answer
+
+    Returns:
+        str: 例如 "问题：...\\n选项：\\n1. ...\\n2. ..."
+    """
+    lines = [f"问题：{question}", "选项："]
+    lines.extend(f"{i}. {answer.ans_text or ''}" for i, answer in enumerate(answers, 1))
+    return '\n'.join(lines)
+
+
+def render_prompt(question_text):
+    """将题目文本填入提示词模板，固定的指令部分在前"""
+    return PROMPT.format(question_text)
+
+
+def _char_counts(text):
+    """返回 (中日文字符数, 字符总数)"""
+    return len(_CJK_RE.findall(text)), len(text)
+
+
+# 旧格式中与题目无关的部分：模板、时间戳、题目包装和选项列表的方括号
+_LEGACY_FIXED = _char_counts(_LEGACY_PROMPT.format('0' * _TIMESTAMP_LENGTH, _LEGACY_QUESTION.format('', [])))
+# 每个选项字典除两个值以外的字符数，另加列表中的分隔符 ", "
+_LEGACY_PER_ANSWER = len(_LEGACY_ANSWER.format('', '')) + 2
+
+
+def estimate_legacy_tokens(question, answers):
+    """估算旧格式提示词的 token 数
+
+    estimate_tokens 只取决于中日文字符数和字符总数，两者都可以按提示词的各部分相加，
+    因此只需统计题目和选项值，结果与 estimate_tokens(legacy_prompt(...)) 相同
+
+    Args:
+        question (str): 题目
+        answers (list): 选项列表，元素为 client.senior.Answer
+
+    Returns:
+        int: 估算的 token 数
+    """
+    cjk, length = _LEGACY_FIXED
+    parts = [str(question)]
+    for answer in answers:
+        parts.append(repr(answer.ans_hash))
+        parts.append(repr(answer.ans_text))
+    for part in parts:
+        part_cjk, part_length = _char_counts(part)
+        cjk += part_cjk
+        length += part_length
+    if answers:
+        length += _LEGACY_PER_ANSWER * len(answers) - 2
+    return cjk + (length - cjk + 3) // 4
+
+
+def legacy_prompt(question, answers, timestamp=None):
+    """按旧格式渲染的完整提示词，仅用于核对 estimate_legacy_tokens"""
+    answers_text = '[' + ', '.join(_LEGACY_ANSWER.format(repr(answer.ans_hash), repr(answer.ans_text))
+                                   for answer in answers) + ']'
+    timestamp = '0' * _TIMESTAMP_LENGTH if timestamp is None else timestamp
+    return _LEGACY_PROMPT.format(timestamp, _LEGACY_QUESTION.format(question, answers_text))
+
+
+class PromptBuilder:
+    """构建题目提示词并统计输入 token"""
+
+    def __init__(self):
+        self.questions = 0
+        self.tokens = 0
+        self.legacy_tokens = 0
+        self.last = {'tokens': 0, 'legacy_tokens': 0}
+
+    def build(self, question, answers):
+        """构建传给模型后端的题目文本
+
+        Args:
+            question (str): 题目
+            answers (list): 选项列表
+
+        Returns:
+            str: 题目文本，由后端通过 render_prompt 套用模板
+        """
+        question_text = format_question(question, answers)
+        tokens = estimate_tokens(render_prompt(question_text))
+        legacy_tokens = estimate_legacy_tokens(question, answers)
+        self.questions += 1
+        self.tokens += tokens
+        self.legacy_tokens += legacy_tokens
+        self.last = {'tokens': tokens, 'legacy_tokens': legacy_tokens}
+        return question_text
+
+    def saved_ratio(self):
+        """累计节省的 token 比例"""
+        if not self.legacy_tokens:
+            return 0.0
+        return 1 - self.tokens / self.legacy_tokens
+
+    def summary(self):
+        """返回累计统计"""
+        return {
+            'questions': self.questions,
+            'tokens': self.tokens,
+            'legacy_tokens': self.legacy_tokens,
+            'saved_ratio': round(self.saved_ratio(), 4),
+        }
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM 客户端注册表
+按会话缓存模型客户端，只有在切换模型或保存配置后才重新创建
+"""
+
+import importlib
+import threading
+from config.config import get_config_version, HEDGE_CONFIG, BREAKER_CONFIG
+from tools.LLM.breaker import BreakerLLM
+from tools.LLM.hedge import HedgedLLM, latency_tracker
+
+# model_choice 与后端的对应关系：(模型类型, 模块, 类名)，首次使用时才导入后端模块
+BACKENDS = {
+    '1': ('deepseek', 'tools.LLM.deepseek', 'DeepSeekAPI'),
+    '2': ('gemini', 'tools.LLM.gemini', 'GeminiAPI'),
+    '3': ('custom', 'tools.LLM.custom', 'CustomAPI'),
+}
+
+DEFAULT_CHOICE = '1'
+
+
+def load_backend(choice):
+    """导入并返回后端类
+
+    Args:
+        choice (str): 模型选择，未知值回退到 DeepSeek
+
+    Returns:
+        tuple: (模型类型, 客户端类)
+    """
+    model_type, module, name = BACKENDS.get(choice, BACKENDS[DEFAULT_CHOICE])
+    return model_type, getattr(importlib.import_module(module), name)
+
+
+class LLMRegistry:
+    """LLM 客户端注册表"""
+
+    def __init__(self, wrapper=None):
+        """
+        Args:
+            wrapper: 可选的包装函数 (model_type, client) -> client，例如录制请求
+        """
+        # model_type -> (配置版本号, 客户端实例)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.wrapper = wrapper
+
+    def get(self, choice):
+        """获取模型客户端，必要时创建
+
+        Args:
+            choice (str): 模型选择 ('1', '2' 或 '3')，未知值回退到 DeepSeek
+
+        Returns:
+            object: 模型客户端实例
+        """
+        model_type, api_cls = load_backend(choice)
+        version = get_config_version(model_type)
+        with self._lock:
+            cached = self._clients.get(model_type)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            if cached is not None:
+                # 配置变化后之前的耗时不再作为对冲依据
+                latency_tracker.reset(model_type)
+            client = api_cls()
+            if HEDGE_CONFIG['enabled']:
+                client = HedgedLLM(model_type, client)
+            # 熔断器在对冲之外，按包含对冲在内的实际耗时判断
+            if BREAKER_CONFIG['enabled']:
+                client = BreakerLLM(model_type, client)
+            if self.wrapper is not None:
+                client = self.wrapper(model_type, client)
+            self._clients[model_type] = (version, client)
+            return client
+
+    def set_wrapper(self, wrapper=None):
+        """设置客户端包装函数，已缓存的客户端会被重建"""
+        with self._lock:
+            self.wrapper = wrapper
+            self._clients.clear()
+
+    def invalidate(self, model_type=None):
+        """使缓存的客户端失效
+
+        Args:
+            model_type (str): 模型类型，为 None 时清空全部缓存
+        """
+        with self._lock:
+            if model_type is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(model_type, None)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+答题策略
+决定一道题向哪些模型提问、如何从回复中确定最终答案
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Optional
+from config.config import LLM_STREAM, ENSEMBLE_CONFIG, BREAKER_CONFIG
+from tools.LLM.answer import parse_answer
+from tools.LLM.breaker import CircuitOpenError
+from tools.cancel import CancelToken, current_token, run_cancellable
+from tools.LLM.registry import BACKENDS
+from tools.logger import logger
+
+
+@dataclass
+class AnswerResult:
+    """一次作答的结果"""
+    index: Optional[int]   # 选项序号 (1..n)，无法解析时为 None
+    reply: str             # 模型原始回复
+    backend: str           # 作答的模型类型，例如 'deepseek'
+
+
+def ask_backend(llm, prompt, option_count, cancel_event=None):
+    """向单个模型提问，支持流式时解析到有效选项后立即返回
+
+    当前上下文激活了取消令牌时，令牌被取消后立即抛出 CancelledError，流式请求随之关闭
+    """
+    if cancel_event is None:
+        cancel_event = current_token()
+    if LLM_STREAM and hasattr(llm, 'ask_stream'):
+        return run_cancellable(llm.ask_stream, prompt, option_count, cancel_event=cancel_event)
+    return run_cancellable(llm.ask, prompt)
+
+
+def backend_name(choice):
+    """model_choice 对应的模型类型"""
+    return BACKENDS.get(choice, BACKENDS['1'])[0]
+
+
+class SingleStrategy:
+    """使用当前选择的单个模型作答"""
+
+    def __init__(self, registry, choice):
+        self.registry = registry
+        self.choice = choice
+
+    def answer(self, prompt, answers):
+        """
+        Args:
+            prompt (str): 题目提示词
+            answers (list): 题目选项
+
+        Returns:
+            AnswerResult: 作答结果
+        """
+        llm = self.registry.get(self.choice)
+        reply = ask_backend(llm, prompt, len(answers))
+        return AnswerResult(parse_answer(reply, answers), reply, backend_name(self.choice))
+
+    def close(self):
+        pass
+
+
+class FailoverStrategy(SingleStrategy):
+    """优先使用当前选择的模型，请求失败或已熔断时依次改用 fallbacks 中已配置的模型"""
+
+    def __init__(self, registry, choice, fallbacks=('1', '2', '3')):
+        super().__init__(registry, choice)
+        self.fallbacks = tuple(fallbacks)
+
+    def candidates(self):
+        """当前模型在前，其余按 fallbacks 的顺序"""
+        return (self.choice,) + tuple(c for c in self.fallbacks if c != self.choice)
+
+    def answer(self, prompt, answers):
+        """
+        Args:
+            prompt (str): 题目提示词
+            answers (list): 题目选项
+
+        Returns:
+            AnswerResult: 第一个成功返回的模型的作答结果
+        """
+        errors = []
+        for choice in self.candidates():
+            name = backend_name(choice)
+            try:
+                llm = self.registry.get(choice)
+            except ValueError as e:
+                errors.append(f"{name}: {e}")
+                continue
+            if choice != self.choice and not getattr(llm, 'api_key', None):
+                continue
+            try:
+                reply = ask_backend(llm, prompt, len(answers))
+            except CircuitOpenError as e:
+                errors.append(str(e))
+                continue
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                logger.warning(f"{name} 请求失败: {str(e)}")
+                continue
+            if choice != self.choice:
+                logger.info(f"{backend_name(self.choice)} 不可用，已改用 {name} 作答")
+            return AnswerResult(parse_answer(reply, answers), reply, name)
+        raise RuntimeError(f"没有可用的模型: {'; '.join(errors)}")
+
+
+class ParallelStrategy:
+    """并发询问多个模型的策略基类"""
+
+    def __init__(self, registry, choices=('1', '2', '3'), samples=1):
+        self.registry = registry
+        self.choices = tuple(choices)
+        self.samples = samples
+        # 未被取消的非流式请求可能仍在运行，预留足够的线程
+        self._executor = ThreadPoolExecutor(max_workers=len(self.choices) * samples * 2,
+                                            thread_name_prefix='llm-parallel')
+
+    def configured_backends(self):
+        """返回已配置好的 (choice, 客户端) 列表"""
+        backends = []
+        for choice in self.choices:
+            try:
+                llm = self.registry.get(choice)
+            except ValueError:
+                continue
+            if getattr(llm, 'api_key', None):
+                backends.append((choice, llm))
+        return backends
+
+    def _ask(self, choice, llm, prompt, answers, cancel_event):
+        reply = ask_backend(llm, prompt, len(answers), cancel_event)
+        if reply is None:
+            return None
+        return AnswerResult(parse_answer(reply, answers), reply, backend_name(choice))
+
+    def _submit_all(self, prompt, answers, cancel_event):
+        backends = self.configured_backends()
+        if not backends:
+            raise RuntimeError("没有可用的模型，请先在设置中配置API密钥")
+        # 每个请求使用当前上下文的副本，使会话的取消令牌在线程池中同样有效
+        return {
+            self._executor.submit(contextvars.copy_context().run,
+                                  self._ask, choice, llm, prompt, answers, cancel_event): choice
+            for choice, llm in backends
+            for _ in range(self.samples)
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RaceStrategy(ParallelStrategy):
+    """同时向多个已配置的模型提问，采用第一个可解析的答案，其余请求被取消"""
+
+    def answer(self, prompt, answers):
+        """
+        Args:
+            prompt (str): 题目提示词
+            answers (list): 题目选项
+
+        Returns:
+            AnswerResult: 最先得到的有效结果；全部失败时返回最后一个结果
+        """
+        # 会话被取消时同样通知各个请求
+        cancel_event = CancelToken(parent=current_token())
+        futures = self._submit_all(prompt, answers, cancel_event)
+        fallback = None
+        errors = []
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(str(e))
+                    logger.warning(f"竞速模式中有模型请求失败: {str(e)}")
+                    continue
+                if result is None:
+                    continue
+                if result.index is not None:
+                    return result
+                fallback = result
+        finally:
+            # 通知仍在进行的流式请求尽快关闭
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+
+        if fallback is not None:
+            return fallback
+        raise RuntimeError(f"所有模型请求均失败: {'; '.join(errors)}")
+
+
+class EnsembleStrategy(ParallelStrategy):
+    """并发询问 N 个模型（或同一模型采样 N 次），在延迟预算内按加权多数投票"""
+
+    def __init__(self, registry, choices=('1', '2', '3'), samples=1, budget=8.0, weights=None, grace=4.0):
+        """
+        Args:
+            registry (LLMRegistry): 模型客户端注册表
+            choices (tuple): 参与投票的模型
+            samples (int): 每个模型的采样次数
+            budget (float): 延迟预算（秒），超时后只统计已到达的票
+            weights (dict): 模型类型 -> 权重，未配置的模型权重为 1
+            grace (float): 预算用完仍没有有效票时最多再等待的时间（秒）
+        """
+        super().__init__(registry, choices, samples)
+        self.budget = budget
+        self.weights = weights or {}
+        self.grace = grace
+
+    def _decided(self, tally, pending_weight):
+        """领先选项的票数已无法被反超时提前结束"""
+        if not tally:
+            return False
+        ranked = sorted(tally.values(), reverse=True)
+        runner_up = ranked[1] if len(ranked) > 1 else 0
+        return ranked[0] > runner_up + pending_weight
+
+    def answer(self, prompt, answers):
+        """
+        Args:
+            prompt (str): 题目提示词
+            answers (list): 题目选项
+
+        Returns:
+            AnswerResult: 得票最高的选项，reply 中记录各模型的投票
+        """
+        cancel_event = CancelToken(parent=current_token())
+        futures = self._submit_all(prompt, answers, cancel_event)
+        # future -> 权重，用于计算尚未返回的票数
+        pending = {future: self.weights.get(backend_name(choice), 1.0)
+                   for future, choice in futures.items()}
+        tally = {}
+        votes = []
+        unparsed = None
+        errors = []
+        deadline = time.monotonic() + self.budget
+        timed_out = False
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and votes:
+                    logger.info(f"投票达到延迟预算，已收到 {len(votes)}/{len(futures)} 票")
+                    break
+                if remaining <= -self.grace:
+                    timed_out = True
+                    logger.warning(f"投票超过延迟预算 {self.grace:g}s 仍没有有效票")
+                    break
+                # 预算耗尽但还没有票时，最多再等待 grace 秒
+                timeout = remaining if remaining > 0 else remaining + self.grace
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    weight = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors.append(str(e))
+                        logger.warning(f"投票模式中有模型请求失败: {str(e)}")
+                        continue
+                    if result is None:
+                        continue
+                    if result.index is None:
+                        unparsed = result
+                        continue
+                    votes.append(result)
+                    tally[result.index] = tally.get(result.index, 0) + weight
+                if self._decided(tally, sum(pending.values())):
+                    break
+        finally:
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+
+        if not votes:
+            if unparsed is not None:
+                # 交给会话的重试逻辑处理
+                return unparsed
+            if timed_out:
+                raise TimeoutError(f"投票模式在 {self.budget + self.grace:g}s 内没有模型给出有效回答")
+            raise RuntimeError(f"投票模式下所有模型请求均失败: {'; '.join(errors)}")
+
+        # 得票相同时取最先到达的选项
+        order = {}
+        for result in votes:
+            order.setdefault(result.index, len(order))
+        winner = max(tally, key=lambda index: (tally[index], -order[index]))
+        summary = ', '.join(f"{result.backend}:{result.index}" for result in votes)
+        backends = sorted({result.backend for result in votes if result.index == winner})
+        return AnswerResult(winner, f"{winner} [投票 {summary}]", '+'.join(backends))
+
+
+STRATEGIES = {
+    'single': SingleStrategy,
+    'failover': FailoverStrategy,
+    'race': RaceStrategy,
+    'ensemble': EnsembleStrategy,
+}
+
+
+def create_strategy(name, registry, choice):
+    """按名称创建答题策略
+
+    Args:
+        name (str): 策略名称 ('single'、'failover'、'race' 或 'ensemble')
+        registry (LLMRegistry): 模型客户端注册表
+        choice (str): 当前选择的模型，单模型策略使用
+
+    Returns:
+        答题策略实例
+    """
+    if name == 'race':
+        return RaceStrategy(registry)
+    if name == 'ensemble':
+        return EnsembleStrategy(registry, **ENSEMBLE_CONFIG)
+    if name == 'failover':
+        return FailoverStrategy(registry, choice, BREAKER_CONFIG['fallbacks'])
+    if name not in STRATEGIES:
+        logger.warning(f"未知的答题策略: {name}，使用单模型策略")
+    return SingleStrategy(registry, choice)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM 流式请求
+边接收 SSE 数据边解析，回复的开头已能确定答案，或回复只有一个序号且输出结束或停顿时立即返回；
+否则读完整个回复，由调用方用 parse_answer 解析完整文本。
+响应在后台线程中读取，提前返回后该线程继续读完剩余输出，HTTP/1.1 连接随后放回连接池
+"""
+
+import json
+import queue
+import threading
+import time
+from config.config import LLM_STREAM_PAUSE
+from tools.LLM.answer import early_option_index
+from tools.LLM.transport import POOL_CONFIG, abort_response, llm_post
+
+SSE_DONE = object()
+# StreamReader.lines 在 pause 秒内没有收到新数据时返回的标记
+PAUSE = object()
+_END = object()
+
+
+def parse_sse_line(line):
+    """解析一行 SSE 数据
+
+    Args:
+        line (str): SSE 行
+
+    Returns:
+        dict | SSE_DONE | None: 事件数据，结束标记，或非数据行时返回 None
+    """
+    if not line or not line.startswith('data:'):
+        return None
+    payload = line[5:].strip()
+    if payload == '[DONE]':
+        return SSE_DONE
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class StreamReader:
+    """在后台线程中逐行读取流式响应，只有读取线程操作响应
+
+    调用方不再需要剩余输出时调用 release()，读取线程继续读到响应结束再关闭，HTTP/1.1 连接
+    因此放回连接池；剩余输出超过 POOL_CONFIG 的 drain_bytes 或 drain_seconds 时直接关闭连接。
+    HTTP/2 关闭响应只重置对应的流，不需要读完
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self._lines = queue.SimpleQueue()
+        self._released = threading.Event()
+        # 释放后继续读取的截止时间，None 表示不再读取
+        self._drain_until = None
+        self._drain_left = POOL_CONFIG['drain_bytes']
+        self._drain = getattr(response, 'http_version', 'HTTP/1.1') != 'HTTP/2'
+        threading.Thread(target=self._run, name='llm-stream', daemon=True).start()
+
+    def _run(self):
+        try:
+            # 使用较小的块大小，避免在非 chunked 响应上等待缓冲区填满
+            for line in self.response.iter_lines(chunk_size=64, decode_unicode=True):
+                if not self._released.is_set():
+                    self._lines.put(line)
+                elif not self._keep_draining(line):
+                    break
+        except Exception as e:
+            self._lines.put(e)
+        finally:
+            # 已读完的响应在关闭时把连接放回连接池；否则关闭连接（HTTP/2 为流），丢弃剩余输出
+            self.response.close()
+            self._lines.put(_END)
+
+    def _keep_draining(self, line):
+        self._drain_left -= len(line) + 1
+        return self._drain_until is not None and self._drain_left >= 0 and time.monotonic() < self._drain_until
+
+    def lines(self, pause=None):
+        """逐行返回收到的数据，读取出错时抛出对应的异常
+
+        Args:
+            pause (float): 超过该时间（秒）没有新数据时返回一次 PAUSE，None 表示一直等待
+        """
+        while True:
+            try:
+                item = self._lines.get(timeout=pause)
+            except queue.Empty:
+                yield PAUSE
+                continue
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def release(self):
+        """不再需要剩余输出，读取线程读完后关闭响应"""
+        if self._released.is_set():
+            return
+        if self._drain:
+            self._drain_until = time.monotonic() + POOL_CONFIG['drain_seconds']
+        self._released.set()
+
+    def abort(self):
+        """立即中止读取，可从其他线程调用；等待中的 lines() 随即结束"""
+        self._drain_until = None
+        self._released.set()
+        self._lines.put(_END)
+        abort_response(self.response)
+
+
+class StreamAnswerCollector:
+    """累积流式输出的文本，答案已经确定时尽早返回"""
+
+    def __init__(self, backend, option_count):
+        self.backend = backend
+        self.option_count = option_count
+        self.text = ''
+
+    def feed(self, event):
+        """处理一个事件，答案已经确定时返回选项序号，见 early_option_index"""
+        try:
+            self.text += self.backend.parse_stream_chunk(event) or ''
+        except (KeyError, IndexError, TypeError):
+            return None
+        return early_option_index(self.text, self.option_count)
+
+    def settled(self):
+        """输出结束或停顿时判断答案是否已经确定，回复只有一个序号时返回该序号"""
+        return early_option_index(self.text, self.option_count, settled=True)
+
+    def finish(self):
+        """流结束后的完整回复"""
+        return self.text
+
+
+def stream_answer(backend, question, option_count, timeout=30, cancel_event=None):
+    """以流式方式请求模型，提前返回答案
+
+    Args:
+        backend: 模型后端，需提供 build_stream_request/parse_stream_chunk
+        question (str): 题目提示词
+        option_count (int): 选项数量
+        timeout (float): 超时时间（秒）
+        cancel_event (threading.Event): 被设置后在下一个事件到达或输出停顿时中止请求；
+            为 CancelToken 时取消后立即中止
+
+    Returns:
+        str: 提前确定答案时为选项序号字符串，否则为完整回复文本；被取消时返回 None
+    """
+    request = backend.build_stream_request(question)
+    response = llm_post(request.pop('url'), timeout=timeout, http2=getattr(backend, 'http2', False),
+                        stream=True, **request)
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    # SSE 响应通常不声明编码，按 UTF-8 解码
+    response.encoding = response.encoding or 'utf-8'
+    reader = StreamReader(response)
+    remove = None
+    if hasattr(cancel_event, 'on_cancel'):
+        remove = cancel_event.on_cancel(reader.abort)
+    try:
+        collector = StreamAnswerCollector(backend, option_count)
+        done = False
+        for line in reader.lines(pause=LLM_STREAM_PAUSE):
+            if cancel_event is not None and cancel_event.is_set():
+                reader.abort()
+                return None
+            if line is PAUSE:
+                index = None if done else collector.settled()
+                if index is not None:
+                    return str(index)
+                continue
+            event = parse_sse_line(line)
+            if event is SSE_DONE:
+                # 之后只剩响应的结尾，读完后连接已放回连接池，下一题可以直接复用
+                done = True
+            if done or event is None:
+                continue
+            index = collector.feed(event)
+            if index is not None:
+                return str(index)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        index = collector.settled()
+        return str(index) if index is not None else collector.finish()
+    except Exception:
+        reader.abort()
+        # 取消时关闭连接导致的读取错误不算请求失败
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        raise
+    finally:
+        if remove is not None:
+            remove()
+        # 提前返回时读取线程在后台读完剩余输出；已中止或已读完时不做任何事
+        reader.release()
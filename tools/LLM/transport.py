@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM HTTP 传输层
+所有模型后端共用一个按主机划分的连接池，复用 keep-alive 连接，
+避免每道题都重新进行 TCP/TLS 握手；超时和重试由 tools.resilience 的 'llm' 策略处理
+
+模型配置中开启 http2 时改用 httpx 的 HTTP/2 客户端（需要安装 h2），竞速、对冲等并发请求
+在同一个连接上多路复用，提前结束的流式请求也不会让连接失效
+"""
+
+import importlib.util
+import socket
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from tools.resilience import get_policy, httpx_timeout, translate_httpx_error
+from tools.logger import logger
+
+# 连接池配置
+POOL_CONFIG = {
+    'pool_maxsize': 4,        # 每个主机保持的最大连接数
+    'drain_bytes': 64 * 1024, # 流式回复提前得到答案后，HTTP/1.1 连接最多再读取的剩余输出（字符）
+    'drain_seconds': 5.0,     # 读取剩余输出的最长时间（秒），超过任一上限时关闭连接
+}
+
+# (scheme://host:port, 是否 HTTP/2) -> 会话
+_sessions = {}
+_lock = threading.Lock()
+_http2_warned = False
+
+
+def _host_key(url):
+    """提取 scheme://host:port 作为连接池的键"""
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+def _build_session():
+    """创建带连接池的 Session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=POOL_CONFIG['pool_maxsize']
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def http2_available():
+    """是否已安装 HTTP/2 所需的 h2"""
+    return importlib.util.find_spec('h2') is not None
+
+
+class Http2Response:
+    """httpx 响应的包装，提供模型后端和流式解析用到的 requests.Response 接口"""
+
+    def __init__(self, response, httpx):
+        self._response = response
+        self._httpx = httpx
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+        self.encoding = response.charset_encoding
+
+    def _read(self):
+        try:
+            return self._response.read()
+        except self._httpx.HTTPError as e:
+            raise translate_httpx_error(self._httpx, e) from e
+
+    @property
+    def text(self):
+        self._read()
+        return self._response.text
+
+    def json(self):
+        self._read()
+        return self._response.json()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error for url: {self.url}', response=self)
+
+    def iter_lines(self, chunk_size=None, decode_unicode=True):
+        """逐行读取响应体，始终返回 str"""
+        try:
+            yield from self._response.iter_lines()
+        except self._httpx.HTTPError as e:
+            raise translate_httpx_error(self._httpx, e) from e
+
+    def close(self):
+        """关闭响应，HTTP/2 只重置对应的流"""
+        self._response.close()
+
+
+class Http2Session:
+    """基于 httpx 的 HTTP/2 会话，提供 llm_post 和连接预热用到的 requests.Session 接口
+
+    https 地址通过 ALPN 协商，服务端不支持 HTTP/2 时回退到 HTTP/1.1；
+    http 地址直接以 HTTP/2 连接（h2c prior knowledge）
+    """
+
+    def __init__(self, url):
+        import httpx
+
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http1=urlsplit(url).scheme == 'https',
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=POOL_CONFIG['pool_maxsize'])
+        )
+
+    def request(self, method, url, timeout=None, stream=False, allow_redirects=False, **kwargs):
+        try:
+            request = self._client.build_request(
+                method, url, timeout=httpx_timeout(self._httpx, timeout), **kwargs)
+            response = self._client.send(request, stream=stream, follow_redirects=allow_redirects)
+        except self._httpx.HTTPError as e:
+            raise translate_httpx_error(self._httpx, e) from e
+        return Http2Response(response, self._httpx)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+
+def abort_response(response):
+    """从其他线程中止正在读取的流式响应，阻塞的读取随即出错返回，由读取线程关闭响应
+
+    不能直接调用 response.close()：读取线程持有缓冲区的锁，close() 会等到本次读取结束；
+    HTTP/2 的连接由多个请求共用，不能关闭套接字，读取线程收到下一块数据后自行结束
+    """
+    if isinstance(response, Http2Response):
+        return
+    # 关闭套接字的读写会唤醒阻塞在 recv 上的线程；连接已放回连接池时没有可中止的读取
+    sock = getattr(getattr(getattr(response, 'raw', None), 'connection', None), 'sock', None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def get_session(url, http2=False):
+    """获取目标主机对应的共享会话
+
+    Args:
+        url (str): 请求地址
+        http2 (bool): 是否使用 HTTP/2，未安装 h2 时回退到 HTTP/1.1
+
+    Returns:
+        requests.Session | Http2Session: 该主机的共享会话
+    """
+    global _http2_warned
+    if http2 and not http2_available():
+        if not _http2_warned:
+            _http2_warned = True
+            logger.warning('未安装 h2，模型请求改用 HTTP/1.1（pip install h2）')
+        http2 = False
+    key = (_host_key(url), http2)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = Http2Session(url) if http2 else _build_session()
+            _sessions[key] = session
+        return session
+
+
+def llm_post(url, timeout=30, http2=False, **kwargs):
+    """通过共享连接池发送 POST 请求，连接失败、超时或 5xx/429 时重试
+
+    模型接口的 POST 没有副作用，按幂等请求处理
+
+    Args:
+        url (str): 请求地址
+        timeout (float): 每次尝试的读取超时时间（秒）
+        http2 (bool): 是否使用 HTTP/2
+        **kwargs: 透传给 requests 的参数（headers、json、params、stream 等）
+
+    Returns:
+        requests.Response | Http2Response: 响应对象，重试次数用完时为最后一次的响应
+    """
+    session = get_session(url, http2)
+    return get_policy('llm').call(
+        lambda attempt_timeout: session.post(url, timeout=attempt_timeout, **kwargs),
+        read_timeout=timeout,
+        description=f'POST {url}',
+    )
+
+
+def configure(**options):
+    """更新连接池配置，已创建的连接池会被关闭并按新配置重建
+
+    Args:
+        **options: POOL_CONFIG 中的配置项
+    """
+    unknown = set(options) - set(POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"未知的连接池配置项: {', '.join(sorted(unknown))}")
+    POOL_CONFIG.update(options)
+    close_all()
+
+
+def close_all():
+    """关闭所有共享连接"""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地答案缓存
+以规范化后的题目和排序后的选项文本作为键，保存模型选出的答案，
+重启答题或重复出现的题目不必再次请求模型
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from config.config import CONFIG_DIR
+from tools.logger import logger
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """规范化文本：全角转半角，合并空白，转小写"""
+    text = unicodedata.normalize('NFKC', str(text or ''))
+    return _SPACE_RE.sub(' ', text).strip().lower()
+
+
+def question_key(question, answers):
+    """计算题目的缓存键
+
+    Args:
+        question (str): 题目
+        answers (list): 选项列表，元素为 client.senior.Answer
+
+    Returns:
+        str: sha256 十六进制字符串
+    """
+    options = sorted(normalize_text(answer.ans_text) for answer in answers)
+    raw = '\x1e'.join([normalize_text(question)] + options)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class AnswerCache:
+    """基于 SQLite 的答案缓存，支持 TTL 过期和 LRU 淘汰
+
+    缓存只是加速手段：数据库无法创建、打开或读写时记录警告，按未命中处理，不影响答题
+    """
+
+    def __init__(self, path=None, ttl=30 * 24 * 3600, max_entries=5000):
+        """
+        Args:
+            path (str): 数据库路径，默认为配置目录下的 answer_cache.db
+            ttl (float): 缓存有效期（秒）
+            max_entries (int): 最多保留的条目数，超出时淘汰最久未使用的
+        """
+        self.path = path or os.path.join(CONFIG_DIR, 'answer_cache.db')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """打开数据库并建表；目录无法创建或数据库无法打开时抛出 OSError 或 sqlite3.Error"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            try:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS answers ('
+                    ' key TEXT PRIMARY KEY,'
+                    ' ans_text TEXT NOT NULL,'
+                    ' model TEXT,'
+                    ' created_at REAL NOT NULL,'
+                    ' last_used REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers(last_used)')
+                conn.commit()
+            except sqlite3.Error:
+                # 建表失败时不保留连接，下次调用重新尝试
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def get(self, question, answers):
+        """查找缓存的答案
+
+        Args:
+            question (str): 题目
+            answers (list): 当前题目的选项列表
+
+        Returns:
+            Answer: 当前选项中与缓存答案对应的那一项，未命中时返回 None
+        """
+        key = question_key(question, answers)
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT ans_text, model, created_at FROM answers WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                ans_text, model, created_at = row
+                now = time.time()
+                if now - created_at > self.ttl:
+                    conn.execute('DELETE FROM answers WHERE key = ?', (key,))
+                    conn.commit()
+                    return None
+                conn.execute('UPDATE answers SET last_used = ? WHERE key = ?', (now, key))
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f'读取答案缓存失败: {e}')
+            return None
+
+        target = normalize_text(ans_text)
+        for answer in answers:
+            if normalize_text(answer.ans_text) == target:
+                logger.info(f'命中本地答案缓存 (来自 {model})')
+                return answer
+        return None
+
+    def put(self, question, answers, ans_text, model):
+        """保存题目的答案
+
+        Args:
+            question (str): 题目
+            answers (list): 选项列表
+            ans_text (str): 选中的选项文本
+            model (str): 给出答案的模型
+        """
+        key = question_key(question, answers)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO answers (key, ans_text, model, created_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, ans_text, model, now, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f'写入答案缓存失败: {e}')
+
+    def _evict(self, conn, now):
+        """删除过期条目，并按 LRU 淘汰超出上限的条目"""
+        conn.execute('DELETE FROM answers WHERE created_at < ?', (now - self.ttl,))
+        count = conn.execute('SELECT COUNT(*) FROM answers').fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                'DELETE FROM answers WHERE key IN ('
+                ' SELECT key FROM answers ORDER BY last_used ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """清空缓存
+
+        Returns:
+            bool: 是否已清空，数据库无法打开或写入时返回 False
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('DELETE FROM answers')
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f'清空答案缓存失败: {e}')
+            return False
+        return True
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -5,6 +5,7 @@ import hmac
 import hashlib
 import requests
 import time
+from tools.resilience import get_policy
 
 def hmac_sha256(key, message):
     """
@@ -41,5 +42,9 @@ def getTicket():
     headers = {
             'user-agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0"
         }
-    resp = requests.post(url, params=params,headers=headers).json()
+    response = get_policy('ticket').call(
+        lambda timeout: requests.post(url, params=params, headers=headers, timeout=timeout),
+        description='获取 bili_ticket')
+    response.raise_for_status()
+    resp = response.json()
     return resp.get('data').get('ticket')
\ No newline at end of file
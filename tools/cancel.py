@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+协作式取消
+CancelToken 在答题会话开始时激活，B站接口请求和模型请求在后台线程中执行并等待令牌，
+停止答题时调用方立即返回，被放弃的请求由各自的超时结束；流式请求在取消时关闭连接
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('cancel_token', default=None)
+
+
+class CancelledError(BaseException):
+    """操作已被取消
+
+    与 asyncio.CancelledError 一样继承 BaseException，不会被 except Exception 的错误处理吞掉
+    """
+
+
+class CancelToken:
+    """取消令牌，可作为流式请求的 cancel_event 使用"""
+
+    def __init__(self, parent=None):
+        """
+        Args:
+            parent (CancelToken): 父令牌被取消时该令牌同时被取消
+        """
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._detach = parent.on_cancel(self.cancel) if parent is not None else None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def is_set(self):
+        """与 threading.Event 相同的接口"""
+        return self._event.is_set()
+
+    def cancel(self):
+        """取消，并调用已注册的回调"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        # 不再需要父令牌通知
+        if self._detach is not None:
+            self._detach()
+            self._detach = None
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def set(self):
+        self.cancel()
+
+    def on_cancel(self, callback):
+        """注册取消时的回调，已取消时立即调用
+
+        Returns:
+            callable: 调用后注销回调
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError()
+
+    def sleep(self, seconds):
+        """可被取消的 sleep
+
+        Raises:
+            CancelledError: 等待期间被取消
+        """
+        if self._event.wait(seconds):
+            raise CancelledError()
+
+    def wait_event(self, event, timeout=None):
+        """等待 event 被设置，取消时立即返回
+
+        Returns:
+            bool: event 是否已被设置
+
+        Raises:
+            CancelledError: 等待期间被取消
+        """
+        remove = self.on_cancel(event.set)
+        try:
+            result = event.wait(timeout)
+        finally:
+            remove()
+        self.raise_if_cancelled()
+        return result
+
+
+def current_token():
+    """返回当前上下文激活的令牌，没有时返回 None"""
+    return _current.get()
+
+
+@contextmanager
+def activate(token):
+    """在当前上下文中激活令牌，期间的请求都可以被它取消"""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def run_cancellable(func, *args, token=None, **kwargs):
+    """执行阻塞调用，令牌被取消时立即抛出 CancelledError
+
+    没有令牌时直接在当前线程调用；否则在守护线程中执行（继承当前上下文），
+    被放弃的调用在后台运行到其自身的超时结束
+
+    Args:
+        func: 阻塞调用
+        token (CancelToken): 为 None 时使用当前上下文的令牌
+    """
+    token = token or current_token()
+    if token is None:
+        return func(*args, **kwargs)
+    token.raise_if_cancelled()
+
+    done = threading.Event()
+    outcome = {}
+    context = contextvars.copy_context()
+
+    def target():
+        try:
+            outcome['result'] = context.run(func, *args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=target, name='cancellable', daemon=True).start()
+    remove = token.on_cancel(done.set)
+    try:
+        done.wait()
+    finally:
+        remove()
+    if 'error' in outcome:
+        raise outcome['error']
+    if 'result' in outcome:
+        return outcome['result']
+    raise CancelledError()
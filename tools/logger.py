@@ -5,52 +5,136 @@ import os
 import sys
 from datetime import datetime
 from loguru import logger as loguru_logger
+from config.config import LOG_CONFIG
 
-def setup_logger(name='hardcore-freedom'):
-    """设置日志系统
-    
-    Args:
-        name (str): 日志器名称
+CONSOLE_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+# sink 名称 -> loguru 处理器 ID
+_handlers = {}
+# sink 名称 -> 当前级别
+_levels = {
+    'console': LOG_CONFIG['console_level'],
+    'file': LOG_CONFIG['file_level'],
+}
+
+def get_log_dir():
+    """返回日志目录
     
     Returns:
-        loguru.Logger: 配置好的日志器实例
+        str: 日志目录路径
     """
-    # 移除默认的处理器
-    loguru_logger.remove()
-    
-    # 创建日志目录
     if getattr(sys, 'frozen', False):
         # PyInstaller 打包后的环境
         base_dir = os.path.dirname(sys.executable)
     else:
         # 开发环境
         base_dir = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(base_dir, 'logs')
+
+def _add_console_sink(level):
+    # 只在有控制台时添加
+    if sys.stdout is None:
+        return None
+    return loguru_logger.add(
+        sys.stdout,
+        format=CONSOLE_FORMAT,
+        level=level,
+        colorize=True
+    )
+
+def _add_file_sink(level):
+    # 设置日志文件路径，日志目录由 loguru 在第一次写入时创建
+    log_file = os.path.join(get_log_dir(), f'{datetime.now().strftime("%Y-%m-%d")}.log')
     
-    log_dir = os.path.join(base_dir, 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # 设置日志文件路径
-    log_file = os.path.join(log_dir, f'{datetime.now().strftime("%Y-%m-%d")}.log')
-    
-    # 添加控制台处理器（只在有控制台时）
-    if sys.stdout is not None:
-        loguru_logger.add(
-            sys.stdout,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-            level="INFO",
-            colorize=True
-        )
-    
-    # 添加文件处理器
-    loguru_logger.add(
+    return loguru_logger.add(
         log_file,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="INFO",
+        format=FILE_FORMAT,
+        level=level,
         rotation="10 MB",  # 文件大小达到10MB时轮转
         retention="30 days",  # 保留30天的日志
         compression="zip",  # 压缩旧日志文件
-        encoding="utf-8"
+        encoding="utf-8",
+        # 第一次写入日志时才打开文件，导入时不产生文件系统操作
+        delay=True,
+        # 写文件、轮转和压缩都在后台线程中进行，不阻塞记录日志的线程
+        enqueue=True
     )
+
+_SINK_FACTORIES = {
+    'console': _add_console_sink,
+    'file': _add_file_sink,
+}
+
+def enable_sink(name, level=None):
+    """添加或重新添加一个内置 sink
+    
+    Args:
+        name (str): 'console' 或 'file'
+        level (str): 日志级别，为 None 时沿用当前级别
+    """
+    disable_sink(name)
+    if level is not None:
+        _levels[name] = level
+    handler_id = _SINK_FACTORIES[name](_levels[name])
+    if handler_id is not None:
+        _handlers[name] = handler_id
+
+def disable_sink(name):
+    """移除一个内置 sink
+    
+    Args:
+        name (str): 'console' 或 'file'
+    """
+    handler_id = _handlers.pop(name, None)
+    if handler_id is not None:
+        loguru_logger.remove(handler_id)
+
+def set_log_level(level, sink=None):
+    """运行时调整日志级别
+    
+    Args:
+        level (str): 日志级别，例如 'DEBUG'、'INFO'
+        sink (str): 'console' 或 'file'，为 None 时调整全部内置 sink
+    """
+    for name in ([sink] if sink else list(_SINK_FACTORIES)):
+        if name in _handlers:
+            enable_sink(name, level)
+        else:
+            _levels[name] = level
+
+def truncate(value, limit=None):
+    """将日志中过长的内容截断
+    
+    Args:
+        value: 任意对象
+        limit (int): 最大长度，为 None 时使用 LOG_CONFIG['debug_truncate']，0 表示不截断
+    
+    Returns:
+        str: 截断后的文本
+    """
+    text = str(value)
+    limit = LOG_CONFIG['debug_truncate'] if limit is None else limit
+    if limit and len(text) > limit:
+        return f'{text[:limit]}...(共{len(text)}字符)'
+    return text
+
+def setup_logger(name='hardcore-freedom'):
+    """设置日志系统
+    
+    Args:
+        name (str): 日志器名称
+    
+    Returns:
+        loguru.Logger: 配置好的日志器实例
+    """
+    # 移除默认的处理器
+    loguru_logger.remove()
+    _handlers.clear()
+    
+    # 添加控制台和文件处理器
+    enable_sink('console')
+    enable_sink('file')
     
     # 配置日志器名称
     loguru_logger.configure(extra={"name": name})
@@ -58,4 +142,4 @@ def setup_logger(name='hardcore-freedom'):
     return loguru_logger
 
 # 创建全局日志器实例
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
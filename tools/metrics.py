@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+答题会话的耗时统计
+按阶段记录单调时钟耗时，并统计重试、解析失败等次数，
+会话结束时汇总为直方图、总计和最慢的题目，写入日志和日志目录下的 JSON 文件
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from tools.logger import get_log_dir, logger
+
+# 直方图桶的上界（秒）
+HISTOGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, math.inf)
+
+# 汇总中保留的最慢题目数量
+SLOWEST_QUESTIONS = 5
+
+
+def percentile(values, p):
+    """计算百分位数（线性插值）
+
+    Args:
+        values (list): 样本
+        p (float): 百分位 (0-100)
+
+    Returns:
+        float: 百分位数，样本为空时返回 0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low = math.floor(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def histogram(values):
+    """按 HISTOGRAM_BUCKETS 统计样本分布，返回 {'<=0.5s': n, ...}"""
+    counts = {}
+    for bound in HISTOGRAM_BUCKETS:
+        label = f'<={bound:g}s' if bound != math.inf else f'>{HISTOGRAM_BUCKETS[-2]:g}s'
+        counts[label] = 0
+    labels = list(counts)
+    for value in values:
+        for label, bound in zip(labels, HISTOGRAM_BUCKETS):
+            if value <= bound:
+                counts[label] += 1
+                break
+    return counts
+
+
+def summarize(values):
+    """汇总一组耗时样本（秒）
+
+    Returns:
+        dict: count/total/mean/p50/p95/p99/max/histogram
+    """
+    count = len(values)
+    return {
+        'count': count,
+        'total': sum(values),
+        'mean': sum(values) / count if count else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else 0.0,
+        'histogram': histogram(values),
+    }
+
+
+class KeyedCounters:
+    """进程内按键（模型、请求类型等）累计的计数，线程安全
+
+    答题会话开始时用 totals() 取快照，结束时用 since() 取本次会话新增的次数
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, key, name, n=1):
+        with self._lock:
+            counts = self._counts.setdefault(key, {})
+            counts[name] = counts.get(name, 0) + n
+
+    def totals(self):
+        """返回各计数在所有键上的合计"""
+        totals = {}
+        with self._lock:
+            for counts in self._counts.values():
+                for name, n in counts.items():
+                    totals[name] = totals.get(name, 0) + n
+        return totals
+
+    def since(self, baseline):
+        """返回相对 totals() 快照 baseline 新增的次数"""
+        return {name: n - baseline.get(name, 0) for name, n in self.totals().items()
+                if n > baseline.get(name, 0)}
+
+
+class SessionMetrics:
+    """一次答题会话的阶段耗时和计数器
+
+    阶段名：question_get、verification、llm、question_submit、submit_wait。
+    嵌套的阶段只统计最外层，例如验证码流程中再次获取题目的耗时计入 verification
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+        self._finished = None
+        self.stages = {}
+        self.counters = {}
+        self.questions = []
+        self._current = None
+        self._active = None
+
+    @contextmanager
+    def stage(self, name):
+        """统计一个阶段的耗时"""
+        if self._active is not None:
+            yield
+            return
+        self._active = name
+        started = time.monotonic()
+        if self._current is None:
+            # 获取题目之前的阶段也计入这道题
+            self._current = self._new_question(started)
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._active = None
+            self.stages.setdefault(name, []).append(elapsed)
+            stages = self._current['stages']
+            stages[name] = stages.get(name, 0.0) + elapsed
+
+    def count(self, name, n=1):
+        """计数器加 n"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @staticmethod
+    def _new_question(started):
+        return {'number': None, 'question': None, 'stages': {}, '_started': started}
+
+    def begin_question(self, number, question):
+        """获取到题目后记录题号和题目"""
+        if self._current is None:
+            self._current = self._new_question(time.monotonic())
+        self._current['number'] = number
+        self._current['question'] = question
+
+    def end_question(self):
+        """一道题提交成功后结束统计"""
+        current = self._current
+        if current is None:
+            return
+        current['total'] = time.monotonic() - current.pop('_started')
+        self.questions.append(current)
+        self._current = None
+
+    def finish(self):
+        """会话结束"""
+        if self._finished is None:
+            self._finished = time.monotonic()
+
+    def summary(self):
+        """返回会话汇总
+
+        Returns:
+            dict: started_at、duration、answered、stages、question_total、counters、slowest
+        """
+        end = self._finished if self._finished is not None else time.monotonic()
+        slowest = sorted(self.questions, key=lambda q: q['total'], reverse=True)[:SLOWEST_QUESTIONS]
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'duration': end - self._started,
+            'answered': len(self.questions),
+            'stages': {name: summarize(values) for name, values in self.stages.items()},
+            'question_total': summarize([q['total'] for q in self.questions]),
+            'counters': dict(self.counters),
+            'slowest': slowest,
+        }
+
+    def log_summary(self, summary=None):
+        """将汇总写入日志"""
+        summary = summary or self.summary()
+        logger.info(f"答题统计: 共{summary['answered']}题，用时{summary['duration']:.1f}秒")
+        for name, s in summary['stages'].items():
+            logger.info(f"  {name}: {s['count']}次，总计{s['total']:.2f}s，"
+                        f"p50 {s['p50'] * 1000:.0f}ms，p95 {s['p95'] * 1000:.0f}ms，最大 {s['max'] * 1000:.0f}ms")
+        if summary['counters']:
+            logger.info('  计数: ' + '，'.join(f'{k}={v}' for k, v in summary['counters'].items()))
+        for q in summary['slowest']:
+            logger.info(f"  最慢: 第{q['number']}题 {q['total']:.2f}s")
+
+    def write(self, summary=None, log_dir=None):
+        """将汇总写入日志目录下的 JSON 文件
+
+        Returns:
+            str: 文件路径，写入失败时返回 None
+        """
+        summary = summary or self.summary()
+        log_dir = log_dir or get_log_dir()
+        path = os.path.join(log_dir, f"{self.started_at.strftime('%Y-%m-%d_%H%M%S')}.metrics.json")
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f'写入答题统计失败: {e}')
+            return None
+        return path
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+连接预热
+用户扫码登录或输入验证码时网络空闲，在后台提前解析域名并建立到B站答题接口和模型接口的连接，
+连接留在各自的连接池中，之后第一次获取题目和请求模型时直接复用，省去 DNS、TCP 和 TLS 握手的时间
+
+每个主机连续发送两次 HEAD 请求，两次的耗时差即为建立连接的耗时，作为首次请求节省的时间
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from config.config import PREWARM_CONFIG
+from tools.logger import logger
+
+
+def _origin(url):
+    """返回 scheme://host:port，不是 http(s) 地址时返回 None"""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+class Prewarmer:
+    """在后台线程中预热连接，并记录节省的耗时"""
+
+    def __init__(self, timeout=PREWARM_CONFIG['timeout'], max_idle=PREWARM_CONFIG['max_idle'],
+                 clock=time.monotonic):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._clock = clock
+        # origin -> (预热完成的时间, 节省的秒数)，被 take_saved() 取走前保留
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def warm(self, origin, session):
+        """向 origin 连续发送两次 HEAD 请求
+
+        Returns:
+            float: 首次请求比复用连接的请求多出的耗时（秒）
+        """
+        timings = []
+        for _ in range(2):
+            started = time.monotonic()
+            # 不读取响应体，连接在响应结束后放回连接池
+            session.head(origin, timeout=self.timeout, allow_redirects=False)
+            timings.append(time.monotonic() - started)
+        return max(timings[0] - timings[1], 0.0)
+
+    def run(self, targets):
+        """依次预热 targets 中的主机
+
+        Args:
+            targets (list): (url, requests.Session)，同一主机的同一个会话只预热一次
+        """
+        seen = set()
+        warmed = []
+        for url, session in targets:
+            origin = _origin(url)
+            if origin is None or (origin, session) in seen:
+                continue
+            seen.add((origin, session))
+            try:
+                saved = self.warm(origin, session)
+            except requests.exceptions.RequestException as e:
+                logger.debug(f'预热 {origin} 失败: {e}')
+                continue
+            with self._lock:
+                self._pending[origin] = (self._clock(), saved)
+            warmed.append(f'{urlsplit(origin).hostname} 约 {saved * 1000:.0f}ms')
+        if warmed:
+            logger.info(f"连接预热完成，首次请求预计节省: {', '.join(warmed)}")
+
+    def start(self, targets):
+        """在后台线程中预热
+
+        Returns:
+            threading.Thread: 预热线程
+        """
+        thread = threading.Thread(target=self.run, args=(list(targets),), name='prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def take_saved(self):
+        """取走已预热、尚未计入统计的连接节省的耗时（秒），超过 max_idle 的不计入"""
+        now = self._clock()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return sum(saved for warmed_at, saved in pending.values() if now - warmed_at <= self.max_idle)
+
+
+# 进程内共用
+prewarmer = Prewarmer()
+
+
+def prewarm(bili_url=None, llm_urls=()):
+    """在后台预热B站接口和模型接口的连接，未启用时返回 None
+
+    Args:
+        bili_url (str): B站接口地址，使用 tools.request_b 的连接池
+        llm_urls (list): 模型接口地址，元素也可以是 (地址, 是否 HTTP/2)，使用 tools.LLM.transport 中对应主机的连接池
+
+    Returns:
+        threading.Thread: 预热线程
+    """
+    if not PREWARM_CONFIG['enabled']:
+        return None
+    targets = []
+    if bili_url:
+        import tools.request_b
+        targets.append((bili_url, tools.request_b.session))
+    if llm_urls:
+        from tools.LLM.transport import get_session
+        for item in llm_urls:
+            url, http2 = item if isinstance(item, tuple) else (item, False)
+            if _origin(url):
+                targets.append((url, get_session(url, http2)))
+    if not targets:
+        return None
+    return prewarmer.start(targets)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步版本的B站请求工具，与 tools.request_b 共用签名、请求头和 'bili' 重试策略
+"""
+
+import urllib.parse
+import httpx
+import requests
+from tools.request_b import appsign, headers
+from tools.resilience import get_policy, httpx_timeout, translate_httpx_error
+from tools.logger import logger, truncate
+
+
+def create_client(timeout=10):
+    """创建异步 HTTP 客户端，B站和 LLM 请求共用同一个连接池
+
+    Args:
+        timeout (float): 默认超时时间（秒）
+
+    Returns:
+        httpx.AsyncClient: 异步客户端
+    """
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=4)
+    )
+
+
+def _sign(params, template):
+    return template.sign(params) if template is not None else appsign(params)
+
+
+async def get(client, url, params, template=None):
+    """发送异步GET请求
+
+    Args:
+        client (httpx.AsyncClient): 异步客户端
+        url (str): 请求URL
+        params (dict): 请求参数
+        template (ParamTemplate): 固定参数，params 只需包含变化的参数
+
+    Returns:
+        dict: 响应数据
+    """
+    return await _request(client, 'GET', url, params=_sign(params, template))
+
+
+async def post(client, url, params, template=None):
+    """发送异步POST请求
+
+    Args:
+        client (httpx.AsyncClient): 异步客户端
+        url (str): 请求URL
+        params (dict): 请求参数
+        template (ParamTemplate): 固定参数，params 只需包含变化的参数
+
+    Returns:
+        dict: 响应数据
+    """
+    return await _request(client, 'POST', url, idempotent=False, data=_sign(params, template))
+
+
+async def _send(client, method, url, timeout, kwargs):
+    try:
+        # 请求头在登录后会被更新，每次请求时读取最新值
+        return await client.request(method, url, headers=dict(headers), timeout=httpx_timeout(httpx, timeout),
+                                    **kwargs)
+    except httpx.HTTPError as e:
+        raise translate_httpx_error(httpx, e) from e
+
+
+async def _request(client, method, url, idempotent=True, **kwargs):
+    try:
+        # 未开启DEBUG级别时不格式化参数和响应
+        logger.opt(lazy=True).debug('发送{}请求: {}, 参数: {}', lambda: method, lambda: url,
+                                    lambda: truncate(kwargs))
+        response = await get_policy('bili').call_async(
+            lambda timeout: _send(client, method, url, timeout, kwargs),
+            idempotent=idempotent,
+            description=f'{method} {urllib.parse.urlsplit(url).path}',
+        )
+        response.raise_for_status()
+        data = response.json()
+        logger.opt(lazy=True).debug('请求成功: {}', lambda: truncate(data))
+        return data
+    except httpx.HTTPStatusError as e:
+        logger.error(f'HTTP错误: {e}\n响应内容: {e.response.text}')
+        raise
+    except requests.exceptions.RequestException as e:
+        logger.error(f'请求失败: {e}')
+        raise
+    except ValueError as e:
+        logger.error(f'解析响应JSON失败: {e}')
+        raise
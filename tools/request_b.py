@@ -2,23 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import hashlib
+import heapq
 import time
 import urllib.parse
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from config.config import API_CONFIG, HEADERS
-from tools.logger import logger
+from tools.cancel import run_cancellable
+from tools.logger import logger, truncate
+from tools.resilience import get_policy
 
-# 创建Session对象并配置重试策略
+# 共用的Session，超时和重试由 tools.resilience 的 'bili' 策略处理
 session = requests.Session()
-retry_strategy = Retry(
-    total=3,
-    backoff_factor=1,
-    status_forcelist=[500, 502, 503, 504]
-)
-session.mount('http://', HTTPAdapter(max_retries=retry_strategy))
-session.mount('https://', HTTPAdapter(max_retries=retry_strategy))
 
 # 使用配置文件中的值
 appkey = API_CONFIG['appkey']
@@ -46,23 +40,94 @@ def appsign(params):
         logger.error(f'生成签名失败: {str(e)}')
         raise
 
-def get(url, params):
-    """发送GET请求
+class ParamTemplate:
+    """预先排序和编码的固定参数
+
+    sign() 只编码本次变化的参数（ts 和调用方传入的参数），与已编码的固定参数按键名归并后签名，
+    结果与 appsign(固定参数 + 变化参数) 相同
+    """
+
+    def __init__(self, params):
+        """
+        Args:
+            params (dict): 每次请求都相同的参数，例如凭证和客户端信息
+        """
+        self.params = dict(params, appkey=appkey)
+        self._encoded = sorted((key, urllib.parse.urlencode({key: value})) for key, value in self.params.items())
+
+    def sign(self, params=None):
+        """合并变化的参数并签名
+
+        Args:
+            params (dict): 本次请求的参数，与固定参数同名时覆盖固定参数
+
+        Returns:
+            dict: 按键名排序并添加签名后的参数
+        """
+        dynamic = dict(params or {}, ts=str(int(time.time())))
+        if not dynamic.keys().isdisjoint(self.params):
+            return appsign(dict(self.params, **dynamic))
+        extra = sorted((key, urllib.parse.urlencode({key: value})) for key, value in dynamic.items())
+        merged = list(heapq.merge(self._encoded, extra))
+        query = '&'.join(pair for _, pair in merged)
+        signed = {key: dynamic[key] if key in dynamic else self.params[key] for key, _ in merged}
+        signed['sign'] = hashlib.md5((query + appsec).encode()).hexdigest()
+        return signed
+
+def _send(method, url, params, timeout=None):
+    """发送已签名的请求并解析响应JSON
     
     Args:
+        method (str): 'GET' 或 'POST'
         url (str): 请求URL
-        params (dict): 请求参数
+        params (dict): 已签名的请求参数
+        timeout (tuple): (连接超时, 读取超时)
     
     Returns:
         dict: 响应数据
     """
+    if method == 'GET':
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+    else:
+        response = session.post(url, data=params, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+# 实际发送请求的函数 (method, url, params, timeout) -> dict，可替换为录制或回放实现
+_transport = _send
+
+def set_transport(transport=None):
+    """替换发送请求的函数
+    
+    Args:
+        transport: (method, url, params, timeout) -> dict，为 None 时恢复默认实现
+    
+    Returns:
+        当前使用的发送函数，用于之后恢复
+    """
+    global _transport
+    previous = _transport
+    _transport = transport or _send
+    return previous
+
+def get_transport():
+    """返回当前使用的发送函数"""
+    return _transport
+
+def _request(method, url, params, cancel_token=None, idempotent=True, template=None):
     try:
-        signed_params = appsign(params)
-        logger.debug(f'发送GET请求: {url}, 参数: {signed_params}')
-        response = session.get(url, params=signed_params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f'请求成功: {data}')
+        signed_params = template.sign(params) if template is not None else appsign(params)
+        # 未开启DEBUG级别时不格式化参数和响应
+        logger.opt(lazy=True).debug('发送{}请求: {}, 参数: {}', lambda: method, lambda: url,
+                                    lambda: truncate(signed_params))
+        # 令牌被取消时立即返回，CancelledError 不经过下面的错误处理
+        data = get_policy('bili').call(
+            lambda timeout: run_cancellable(_transport, method, url, signed_params, timeout, token=cancel_token),
+            idempotent=idempotent,
+            description=f'{method} {urllib.parse.urlsplit(url).path}',
+            cancel_token=cancel_token,
+        )
+        logger.opt(lazy=True).debug('请求成功: {}', lambda: truncate(data))
         return data
     except requests.exceptions.HTTPError as e:
         logger.error(f'HTTP错误: {e}\n响应内容: {e.response.text}')
@@ -74,30 +139,39 @@ def get(url, params):
         logger.error(f'解析响应JSON失败: {e}')
         raise
 
-def post(url, params):
+def get(url, params, cancel_token=None, template=None):
+    """发送GET请求，失败时按 'bili' 策略重试
+    
+    Args:
+        url (str): 请求URL
+        params (dict): 请求参数
+        cancel_token (CancelToken): 取消令牌，为 None 时使用当前上下文激活的令牌
+        template (ParamTemplate): 固定参数，params 只需包含变化的参数
+    
+    Returns:
+        dict: 响应数据
+    
+    Raises:
+        CancelledError: 请求过程中令牌被取消
+        DeadlineExceeded: 含重试超过总时长上限
+    """
+    return _request('GET', url, params, cancel_token, template=template)
+
+def post(url, params, cancel_token=None, idempotent=False, template=None):
     """发送POST请求
     
     Args:
         url (str): 请求URL
         params (dict): 请求参数
+        cancel_token (CancelToken): 取消令牌，为 None 时使用当前上下文激活的令牌
+        idempotent (bool): 请求是否可以重复发送；为 False 时只在请求确定没有发出时重试
+        template (ParamTemplate): 固定参数，params 只需包含变化的参数
     
     Returns:
         dict: 响应数据
+    
+    Raises:
+        CancelledError: 请求过程中令牌被取消
+        DeadlineExceeded: 含重试超过总时长上限
     """
-    try:
-        signed_params = appsign(params)
-        logger.debug(f'发送POST请求: {url}, 参数: {signed_params}')
-        response = session.post(url, data=signed_params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f'请求成功: {data}')
-        return data
-    except requests.exceptions.HTTPError as e:
-        logger.error(f'HTTP错误: {e}\n响应内容: {e.response.text}')
-        raise
-    except requests.exceptions.RequestException as e:
-        logger.error(f'请求失败: {e}')
-        raise
-    except ValueError as e:
-        logger.error(f'解析响应JSON失败: {e}')
-        raise
\ No newline at end of file
+    return _request('POST', url, params, cancel_token, idempotent, template)
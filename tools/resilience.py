@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+网络请求的超时与重试
+B站接口、模型接口和 bili_ticket 的请求都经 RetryPolicy 发出：每次尝试都有连接和读取超时，
+整个调用（含重试）有总时长上限，重试间隔为带随机抖动的指数退避，服务端返回 Retry-After 时至少等待该时间；
+非幂等的请求（提交答案、提交验证码）只在请求确定没有发出，或服务端明确没有处理（429、503）时重试，避免重复提交。
+异步请求（httpx）经 call_async 使用同一套策略，httpx 的异常先转换为对应的 requests 异常。
+重试和超时次数按策略累计在 resilience_stats 中，答题会话结束时计入统计
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from urllib3.exceptions import NewConnectionError
+from config.config import RETRY_POLICIES
+from tools.cancel import current_token
+from tools.metrics import KeyedCounters
+from tools.logger import logger
+
+# 进程内共用的重试统计，按策略名累计：{name}_http_retries、{name}_http_timeouts、{name}_http_deadline_exceeded；
+# 带 http 前缀，与会话统计中模型回答无法解析时重新提问的 llm_retries 区分
+resilience_stats = KeyedCounters()
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """调用（含重试）超过总时长上限"""
+
+
+class ConnectFailed(requests.exceptions.ConnectionError):
+    """建立连接失败，请求没有发出（用于 requests 以外的传输层）"""
+
+
+def request_not_sent(error):
+    """请求是否确定没有到达服务器（连接阶段失败），这时非幂等的请求也可以安全重试"""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, ConnectFailed)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+def translate_httpx_error(httpx, error):
+    """将 httpx 的异常转换为对应的 requests 异常，调用方和重试策略只需处理 requests 的异常"""
+    message = f'{type(error).__name__}: {error}'
+    if isinstance(error, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(message)
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(message)
+    if isinstance(error, httpx.ConnectError):
+        return ConnectFailed(message)
+    if isinstance(error, httpx.TransportError):
+        return requests.exceptions.ConnectionError(message)
+    return requests.exceptions.RequestException(message)
+
+
+def httpx_timeout(httpx, timeout):
+    """将 (连接超时, 读取超时) 转换为 httpx.Timeout"""
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return httpx.Timeout(read, connect=connect)
+
+
+def _retry_after(response):
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），没有或无法解析时返回 None"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """一组请求共用的超时与重试策略"""
+
+    def __init__(self, name, attempts=3, base_delay=0.5, max_delay=4.0, connect_timeout=5.0,
+                 read_timeout=10.0, deadline=30.0, retry_statuses=(429, 500, 502, 503, 504),
+                 unprocessed_statuses=(429, 503), stats=None, rng=None):
+        """
+        Args:
+            name (str): 策略名，用于日志和计数器
+            attempts (int): 最多尝试次数（含第一次）
+            base_delay (float): 第一次重试前等待时间的上限（秒），之后每次翻倍
+            max_delay (float): 重试前等待时间的上限（秒）
+            connect_timeout (float): 建立连接的超时时间（秒）
+            read_timeout (float): 默认的读取超时时间（秒）
+            deadline (float): 单次调用含重试的总时长上限（秒），为 None 时不限制
+            retry_statuses (tuple): 幂等请求遇到这些状态码时重试
+            unprocessed_statuses (tuple): 表示服务端没有处理请求的状态码，非幂等请求遇到时也重试
+            stats (KeyedCounters): 默认使用进程内共用的 resilience_stats
+        """
+        self.name = name
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.unprocessed_statuses = frozenset(unprocessed_statuses)
+        self._stats = stats or resilience_stats
+        self._random = rng or random.Random()
+
+    @classmethod
+    def from_config(cls, name, **overrides):
+        """按 RETRY_POLICIES 中的配置创建"""
+        return cls(name, **dict(RETRY_POLICIES[name], **overrides))
+
+    def _count(self, name):
+        self._stats.count(self.name, f'{self.name}_http_{name}')
+
+    def backoff(self, attempt):
+        """第 attempt 次尝试失败后的等待时间，在 [0, min(max_delay, base_delay * 2^(attempt-1))] 内随机"""
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def timeout(self, remaining=None, read_timeout=None):
+        """单次尝试的 (连接超时, 读取超时)，不超过剩余的总时长"""
+        connect, read = self.connect_timeout, read_timeout or self.read_timeout
+        if remaining is not None:
+            connect, read = min(connect, remaining), min(read, remaining)
+        return connect, read
+
+    def retry_status(self, status, idempotent=True):
+        """响应状态码是否可以重试"""
+        return status in (self.retry_statuses if idempotent else self.unprocessed_statuses)
+
+    def retryable(self, error, idempotent=True):
+        """请求异常是否可以重试"""
+        if request_not_sent(error):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and self.retry_status(error.response.status_code, idempotent)
+        if not idempotent:
+            return False
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                                  requests.exceptions.ChunkedEncodingError))
+
+    def _next_delay(self, attempt, expires, retry_after=None):
+        """重试前的等待时间，已用完尝试次数或等待后会超过总时长时返回 None
+
+        服务端给出 Retry-After 时至少等待该时间，不受 max_delay 限制，只受总时长限制
+        """
+        if attempt >= self.attempts:
+            return None
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if expires is not None and time.monotonic() + delay >= expires:
+            return None
+        return delay
+
+    def _start(self, deadline, description):
+        deadline = self.deadline if deadline is None else deadline
+        expires = time.monotonic() + deadline if deadline else None
+        return deadline, expires, description or self.name
+
+    def _remaining(self, expires, deadline, description):
+        """剩余的总时长，已超过时抛出 DeadlineExceeded"""
+        remaining = expires - time.monotonic() if expires is not None else None
+        if remaining is not None and remaining <= 0:
+            self._count('deadline_exceeded')
+            raise DeadlineExceeded(f'{description} 超过总时长 {deadline:g}s')
+        return remaining
+
+    def _plan(self, attempt, expires, idempotent, error=None, result=None):
+        """根据一次尝试的异常或响应决定是否重试
+
+        Returns:
+            tuple: (等待时间, 原因)，不重试时等待时间为 None
+        """
+        if error is not None:
+            if isinstance(error, requests.exceptions.Timeout):
+                self._count('timeouts')
+            if not self.retryable(error, idempotent):
+                return None, None
+            retry_after = _retry_after(getattr(error, 'response', None))
+            return self._next_delay(attempt, expires, retry_after), f'{type(error).__name__}: {error}'
+        status = getattr(result, 'status_code', None)
+        if not self.retry_status(status, idempotent):
+            return None, None
+        return self._next_delay(attempt, expires, _retry_after(result)), f'HTTP {status}'
+
+    def _log_retry(self, description, reason, delay, attempt):
+        self._count('retries')
+        logger.warning(f'{description} 失败 ({reason})，{delay:.2f}s 后重试 ({attempt}/{self.attempts - 1})')
+
+    def call(self, send, idempotent=True, read_timeout=None, deadline=None, description=None,
+             cancel_token=None):
+        """按策略发送请求
+
+        Args:
+            send: send(timeout) 发送一次请求，timeout 为 (连接超时, 读取超时)；
+                返回带 status_code 的响应对象时，遇到可重试的状态码会关闭响应后重试
+            idempotent (bool): 请求是否可以重复发送
+            read_timeout (float): 覆盖策略的读取超时时间
+            deadline (float): 覆盖策略的总时长上限
+            description (str): 日志中的请求描述
+            cancel_token (CancelToken): 重试等待期间可被取消，为 None 时使用当前上下文的令牌
+
+        Returns:
+            send 的返回值；重试次数用完时返回最后一次的响应
+
+        Raises:
+            DeadlineExceeded: 超过总时长上限
+            requests.exceptions.RequestException: 不可重试或重试次数用完时的最后一个异常
+            CancelledError: 重试等待期间被取消
+        """
+        deadline, expires, description = self._start(deadline, description)
+        token = cancel_token or current_token()
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = self._remaining(expires, deadline, description)
+            try:
+                result = send(self.timeout(remaining, read_timeout))
+            except requests.exceptions.RequestException as e:
+                delay, reason = self._plan(attempt, expires, idempotent, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay, reason = self._plan(attempt, expires, idempotent, result=result)
+                if delay is None:
+                    return result
+                result.close()
+
+            self._log_retry(description, reason, delay, attempt)
+            if token is not None:
+                token.sleep(delay)
+            else:
+                time.sleep(delay)
+
+    async def call_async(self, send, idempotent=True, read_timeout=None, deadline=None, description=None):
+        """call 的异步版本，send(timeout) 为协程函数，取消由 asyncio 任务处理
+
+        send 应将 httpx 的异常经 translate_httpx_error 转换后抛出；
+        返回的异步响应在重试前通过 aclose() 关闭
+        """
+        deadline, expires, description = self._start(deadline, description)
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = self._remaining(expires, deadline, description)
+            try:
+                result = await send(self.timeout(remaining, read_timeout))
+            except requests.exceptions.RequestException as e:
+                delay, reason = self._plan(attempt, expires, idempotent, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay, reason = self._plan(attempt, expires, idempotent, result=result)
+                if delay is None:
+                    return result
+                await result.aclose()
+
+            self._log_retry(description, reason, delay, attempt)
+            await asyncio.sleep(delay)
+
+
+_policies = {}
+
+
+def get_policy(name):
+    """返回 RETRY_POLICIES 中对应的策略，进程内共用"""
+    policy = _policies.get(name)
+    if policy is None:
+        policy = _policies[name] = RetryPolicy.from_config(name)
+    return policy
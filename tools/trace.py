@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+答题会话的请求录制与回放
+TraceRecorder 将 B站接口请求和模型提问连同耗时写入 JSONL 文件（令牌和 Cookie 已脱敏），
+TraceReplayer 按原速或加速把录制内容回放给 QuizSession，用于离线复现慢速或失败的答题过程
+
+用法：
+    python -m tools.trace replay logs/2025-01-01_120000.trace.jsonl --speed 10
+    python -m tools.trace replay trace.jsonl --speed 0 --profile replay.prof
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from urllib.parse import urlsplit
+import requests
+from tools import request_b
+from tools.LLM.registry import BACKENDS, DEFAULT_CHOICE
+from tools.logger import get_log_dir, logger
+
+# 需要脱敏的字段名（小写）
+REDACT_KEYS = {
+    'access_key', 'access_token', 'refresh_token', 'csrf', 'bili_jct', 'sessdata',
+    'cookie', 'cookies', 'cookie_info', 'sign', 'bili_token', 'key', 'api_key', 'authorization',
+}
+REDACTED = '***'
+
+
+def redact(value):
+    """递归地将敏感字段替换为 ***"""
+    if isinstance(value, dict):
+        return {k: REDACTED if str(k).lower() in REDACT_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _url_path(url):
+    """去掉查询参数"""
+    return url.split('?', 1)[0]
+
+
+def _replay_key(method, url):
+    """回放时按方法和路径匹配请求，忽略主机名"""
+    return method, urlsplit(url).path
+
+
+class TracedLLM:
+    """记录 ask / ask_stream 调用的模型客户端包装"""
+
+    def __init__(self, recorder, model_type, backend):
+        self._recorder = recorder
+        self._model_type = model_type
+        self._backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def ask(self, question, timeout=30):
+        return self._recorder.record_llm(self._model_type, 'ask', question, None,
+                                         lambda: self._backend.ask(question, timeout))
+
+    def ask_stream(self, question, option_count, timeout=30, cancel_event=None):
+        return self._recorder.record_llm(
+            self._model_type, 'ask_stream', question, option_count,
+            lambda: self._backend.ask_stream(question, option_count, timeout, cancel_event))
+
+
+class TraceRecorder:
+    """将请求录制到 JSONL 文件
+
+    每行一条记录，kind 为 'bili' 或 'llm'，t 为相对会话开始的时间，duration 为耗时（秒）
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): 录制文件路径，默认为日志目录下的 <日期>_<时间>.trace.jsonl
+        """
+        self.path = path or os.path.join(
+            get_log_dir(), f"{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.trace.jsonl")
+        self._file = None
+        self._lock = threading.Lock()
+        self._started = None
+        self._previous_transport = None
+        self._session = None
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def _elapsed(self):
+        if self._started is None:
+            self._started = time.monotonic()
+        return time.monotonic() - self._started
+
+    def _record(self, record, call):
+        record['t'] = round(self._elapsed(), 6)
+        started = time.monotonic()
+        try:
+            result = call()
+        except Exception as e:
+            record['duration'] = round(time.monotonic() - started, 6)
+            record['error'] = f'{type(e).__name__}: {e}'
+            self._write(record)
+            raise
+        record['duration'] = round(time.monotonic() - started, 6)
+        record['response'] = redact(result)
+        self._write(record)
+        return result
+
+    def transport(self, send):
+        """包装 request_b 的发送函数"""
+        def traced(method, url, params, timeout=None):
+            record = {'kind': 'bili', 'method': method, 'url': _url_path(url), 'params': redact(params)}
+            return self._record(record, lambda: send(method, url, params, timeout))
+        return traced
+
+    def record_llm(self, model_type, call, question, option_count, send):
+        """记录一次模型提问"""
+        record = {'kind': 'llm', 'backend': model_type, 'call': call,
+                  'prompt': question, 'option_count': option_count}
+        return self._record(record, send)
+
+    def wrap_llm(self, model_type, client):
+        """LLMRegistry 的包装函数"""
+        return TracedLLM(self, model_type, client)
+
+    def install(self, session):
+        """开始录制 session 的请求
+
+        Args:
+            session (QuizSession): 答题会话
+
+        Returns:
+            TraceRecorder: self
+        """
+        self._session = session
+        self._previous_transport = request_b.set_transport(self.transport(request_b.get_transport()))
+        session.llm_registry.set_wrapper(self.wrap_llm)
+        logger.info(f'正在录制请求到: {self.path}')
+        return self
+
+    def uninstall(self):
+        """停止录制并关闭文件"""
+        if self._previous_transport is not None:
+            request_b.set_transport(self._previous_transport)
+            self._previous_transport = None
+        if self._session is not None:
+            self._session.llm_registry.set_wrapper(None)
+            self._session = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load_trace(path):
+    """读取录制文件
+
+    Returns:
+        list: 记录列表
+    """
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _Player:
+    """按顺序取出录制记录，并按 speed 重现耗时"""
+
+    def __init__(self, speed):
+        # speed 为 1 时按原速回放，0 或 inf 表示不等待
+        self.speed = speed
+        self._lock = threading.Lock()
+
+    def _wait(self, record):
+        if self.speed and not math.isinf(self.speed):
+            time.sleep(record.get('duration', 0) / self.speed)
+
+
+class ReplayTransport(_Player):
+    """回放 B站接口请求的发送函数，按 (method, url) 依次返回录制的响应"""
+
+    def __init__(self, records, speed=1.0):
+        super().__init__(speed)
+        self._queues = defaultdict(deque)
+        for record in records:
+            if record.get('kind') == 'bili':
+                self._queues[_replay_key(record['method'], record['url'])].append(record)
+
+    def __call__(self, method, url, params, timeout=None):
+        with self._lock:
+            queue = self._queues.get(_replay_key(method, url))
+            if not queue:
+                raise requests.exceptions.RequestException(f'回放记录中没有更多的请求: {method} {url}')
+            record = queue.popleft()
+        self._wait(record)
+        if 'error' in record:
+            raise requests.exceptions.RequestException(record['error'])
+        return record['response']
+
+
+class ReplayLLM(_Player):
+    """回放模型回答的客户端"""
+
+    api_key = 'replay'
+
+    def __init__(self, model_type, records, speed=1.0):
+        super().__init__(speed)
+        self.api_name = f'{model_type} (回放)'
+        self._records = deque(records)
+
+    def _next(self):
+        with self._lock:
+            if not self._records:
+                raise Exception('回放记录中没有更多的模型回答')
+            record = self._records.popleft()
+        self._wait(record)
+        if 'error' in record:
+            raise Exception(record['error'])
+        return record['response']
+
+    def ask(self, question, timeout=30):
+        return self._next()
+
+    def ask_stream(self, question, option_count, timeout=30, cancel_event=None):
+        return self._next()
+
+
+class ReplayRegistry:
+    """返回回放客户端的注册表，替代 LLMRegistry"""
+
+    def __init__(self, records, speed=1.0):
+        by_backend = defaultdict(list)
+        for record in records:
+            if record.get('kind') == 'llm':
+                by_backend[record['backend']].append(record)
+        self._clients = {model_type: ReplayLLM(model_type, items, speed)
+                         for model_type, items in by_backend.items()}
+
+    def get(self, choice):
+        model_type = BACKENDS.get(choice, BACKENDS[DEFAULT_CHOICE])[0]
+        if model_type not in self._clients:
+            raise ValueError(f'回放记录中没有 {model_type} 的回答')
+        return self._clients[model_type]
+
+    def invalidate(self, model_type=None):
+        pass
+
+    def set_wrapper(self, wrapper=None):
+        pass
+
+
+class TraceReplayer:
+    """将录制文件回放给答题会话，不访问网络"""
+
+    def __init__(self, path, speed=1.0):
+        """
+        Args:
+            path (str): 录制文件路径
+            speed (float): 回放速度倍数，1 为原速，0 表示不等待
+        """
+        self.records = load_trace(path)
+        self.speed = speed
+        self._previous_transport = None
+
+    def install(self, session):
+        """让 session 使用回放的接口和模型
+
+        Args:
+            session (QuizSession): 答题会话
+
+        Returns:
+            TraceReplayer: self
+        """
+        registry = ReplayRegistry(self.records, self.speed)
+        session.llm_registry = registry
+        if session.strategy is not None:
+            session.strategy.registry = registry
+        # 本地缓存命中会跳过模型请求，回放时关闭以保持请求顺序一致
+        session.answer_cache = None
+        self._previous_transport = request_b.set_transport(ReplayTransport(self.records, self.speed))
+        return self
+
+    def uninstall(self):
+        if self._previous_transport is not None:
+            request_b.set_transport(self._previous_transport)
+            self._previous_transport = None
+
+
+def main(argv=None):
+    import argparse
+    import cProfile
+    from scripts.start_senior import QuizSession
+
+    parser = argparse.ArgumentParser(description='回放录制的答题会话')
+    sub = parser.add_subparsers(dest='command', required=True)
+    replay = sub.add_parser('replay', help='回放录制文件')
+    replay.add_argument('trace', help='录制文件路径')
+    replay.add_argument('--speed', type=float, default=1.0, help='回放速度倍数，0 表示不等待')
+    replay.add_argument('--profile', help='使用 cProfile 分析并将结果写入该文件')
+    args = parser.parse_args(argv)
+
+    # 验证码流程的输入不影响回放的响应
+    session = QuizSession(input_handler=lambda kind, payload: '')
+    session.save_metrics = False
+    session.submit_interval = session.submit_interval / args.speed if args.speed else 0
+    replayer = TraceReplayer(args.trace, args.speed).install(session)
+    try:
+        if args.profile:
+            cProfile.runctx('session.start()', globals(), {'session': session}, args.profile)
+            logger.info(f'性能分析结果已写入: {args.profile}')
+        else:
+            session.start()
+    finally:
+        replayer.uninstall()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())